@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.batch_evaluation import HAVE_NUMPY, boards_to_array, evaluate_midgame_endgame_batch
+from modules.search_engine import evaluate_midgame_endgame
+from modules.minimax_opening import MiniMaxOpening
+from modules.minimax_game import MiniMaxGame
+from modules.ab_opening import ABOpening
+from modules.minimax_opening_black import MiniMaxOpeningBlack
+from modules.minimax_game_black import MiniMaxGameBlack
+
+CLASSES = {
+    cls.__name__: cls for cls in (MiniMaxOpening, MiniMaxGame, ABOpening, MiniMaxOpeningBlack, MiniMaxGameBlack)
+}
+
+
+def random_masks(count, rng):
+    """
+    Generate random midgame positions as bitmask pairs.
+
+    Parameters:
+    - count (int): The number of positions.
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - list: The (white, black) bitmask pairs, with three to nine pieces a side.
+    """
+    positions = []
+    for _ in range(count):
+        white, black = rng.randint(3, 9), rng.randint(3, 9)
+        points = rng.sample(range(23), white + black)
+        positions.append((sum(1 << point for point in points[:white]), sum(1 << point for point in points[white:])))
+    return positions
+
+
+def time_call(function, repeat):
+    """
+    Return the mean time of a call.
+
+    Parameters:
+    - function (Callable): The function to call without arguments.
+    - repeat (int): The number of calls.
+
+    Returns:
+    - float: The seconds per call.
+    """
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat
+
+
+def bench_functions(sizes, repeat, rng):
+    """
+    Time the scalar and batch mid-game/endgame evaluators on batches of each size, checking that they agree.
+
+    Parameters:
+    - sizes (list): The batch sizes.
+    - repeat (int): The number of calls timed per batch.
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - None
+    """
+    print(f"\n{'batch':>6} {'scalar (us)':>12} {'batch (us)':>12} {'speedup':>8}")
+    for size in sizes:
+        positions = random_masks(size, rng)
+        flat = [mask for masks in positions for mask in masks]
+        if evaluate_midgame_endgame_batch(boards_to_array(flat)).tolist() != [
+            evaluate_midgame_endgame(masks) for masks in positions
+        ]:
+            raise AssertionError(f"The batch evaluator disagrees with the scalar one on a batch of {size}")
+        scalar = time_call(lambda: [evaluate_midgame_endgame(masks) for masks in positions], repeat)
+        batch = time_call(lambda: evaluate_midgame_endgame_batch(boards_to_array(flat)), repeat)
+        print(f"{size:6} {scalar * 1e6:12.1f} {batch * 1e6:12.1f} {scalar / batch:7.2f}x")
+
+
+def bench_searches(classes, depth, boards, rng):
+    """
+    Search random boards with and without batch_leaves, checking that the results agree.
+
+    Parameters:
+    - classes (list): The names of the search classes.
+    - depth (int): The search depth.
+    - boards (int): The number of random boards.
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - None
+    """
+    corpus = []
+    for white, black in random_masks(boards, rng):
+        corpus.append(['W' if white >> point & 1 else 'B' if black >> point & 1 else 'x' for point in range(23)])
+
+    print(f"\n{'search':18} {'leaves plain/batch':>20} {'plain (s)':>10} {'batch (s)':>10} {'speedup':>8}")
+    for name in classes:
+        game_class = CLASSES[name]
+        leaves = {False: 0, True: 0}
+        elapsed = {False: 0.0, True: 0.0}
+        for board in corpus:
+            results = {}
+            for batch_leaves in (False, True):
+                game = game_class()
+                # Compare the searches themselves, not the tablebase or book answers
+                game.probes_tablebase = False
+                game.use_book = False
+                game.batch_leaves = batch_leaves
+                start = perf_counter()
+                results[batch_leaves] = game.play_game(list(board), depth)
+                elapsed[batch_leaves] += perf_counter() - start
+                leaves[batch_leaves] += game.stats.leaves
+            if results[False] != results[True]:
+                raise AssertionError(f"{name} finds a different result with batch_leaves on {''.join(board)}")
+        counts = f"{leaves[False]}/{leaves[True]}"
+        print(f"{name:18} {counts:>20} {elapsed[False]:10.3f} {elapsed[True]:10.3f}"
+              f" {elapsed[False] / elapsed[True]:7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the scalar and NumPy batch leaf evaluations.")
+    parser.add_argument("--sizes", default="1,8,16,32,128,1024", help="comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="calls timed per batch size")
+    parser.add_argument("--depth", type=int, default=4, help="search depth")
+    parser.add_argument("--boards", type=int, default=10, help="number of random boards searched")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random positions")
+    parser.add_argument("--classes", default=','.join(CLASSES), help="comma-separated search classes")
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        sys.exit("The batch evaluation needs NumPy 2 or later.")
+    rng = random.Random(args.seed)
+    bench_functions([int(size) for size in args.sizes.split(',')], args.repeat, rng)
+    bench_searches(args.classes.split(','), args.depth, args.boards, rng)
+
+
+if __name__ == "__main__":
+    main()
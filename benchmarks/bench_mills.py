@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.util import close_mill, count_mills, count_safe_pieces, can_be_removed, piece_mask
+from utils.bitboard import close_mill as mask_close_mill
+
+
+def legacy_close_mill(position, board):
+    """
+    The original match-based mill check, kept here as the baseline for the comparison.
+
+    Parameters:
+    - position (int): The index of the position to check.
+    - board (list): The current board configuration.
+
+    Returns:
+    - bool: True if the position is part of a mill, False otherwise.
+    """
+    match position:
+        case 0:
+            return (
+                    (board[1] == board[0] and board[2] == board[0]) or
+                    (board[3] == board[0] and board[6] == board[0]) or
+                    (board[8] == board[0] and board[20] == board[0])
+            )
+        case 1: return board[0] == board[1] and board[2] == board[1]
+        case 2:
+            return (
+                    (board[0] == board[2] and board[1] == board[2]) or
+                    (board[5] == board[2] and board[7] == board[2]) or
+                    (board[13] == board[2] and board[22] == board[2])
+            )
+        case 3:
+            return (
+                    (board[0] == board[3] and board[6] == board[3]) or
+                    (board[4] == board[3] and board[5] == board[3]) or
+                    (board[9] == board[3] and board[17] == board[3])
+            )
+        case 4: return board[3] == board[4] and board[5] == board[4]
+
+        case 5:
+            return (
+                    (board[2] == board[5] and board[7] == board[5]) or
+                    (board[3] == board[5] and board[4] == board[5]) or
+                    (board[12] == board[5] and board[19] == board[5])
+            )
+        case 6:
+            return (
+                    (board[0] == board[6] and board[3] == board[6]) or
+                    (board[10] == board[6] and board[14] == board[6])
+            )
+        case 7:
+            return (
+                    (board[2] == board[7] and board[5] == board[7]) or
+                    (board[11] == board[7] and board[16] == board[7])
+            )
+        case 8:
+            return (
+                    (board[0] == board[8] and board[20] == board[8]) or
+                    (board[9] == board[8] and board[10] == board[8])
+            )
+        case 9:
+            return (
+                    (board[8] == board[9] and board[10] == board[9]) or
+                    (board[3] == board[9] and board[17] == board[9])
+            )
+        case 10:
+            return (
+                    (board[8] == board[10] and board[9] == board[10]) or
+                    (board[6] == board[10] and board[14] == board[10])
+            )
+        case 11:
+            return (
+                    (board[7] == board[11] and board[16] == board[11]) or
+                    (board[12] == board[11] and board[13] == board[11])
+            )
+        case 12:
+            return (
+                    (board[11] == board[12] and board[13] == board[12]) or
+                    (board[5] == board[12] and board[19] == board[12])
+            )
+        case 13:
+            return (
+                    (board[11] == board[13] and board[12] == board[13]) or
+                    (board[2] == board[13] and board[22] == board[13])
+            )
+        case 14:
+            return (
+                    (board[6] == board[14] and board[10] == board[14]) or
+                    (board[15] == board[14] and board[16] == board[14]) or
+                    (board[17] == board[14] and board[20] == board[14])
+            )
+        case 15:
+            return (
+                    (board[14] == board[15] and board[16] == board[15]) or
+                    (board[18] == board[15] and board[21] == board[15])
+            )
+        case 16:
+            return (
+                    (board[14] == board[16] and board[15] == board[16]) or
+                    (board[19] == board[16] and board[22] == board[16]) or
+                    (board[7] == board[16] and board[11] == board[16])
+            )
+        case 17:
+            return (
+                    (board[3] == board[17] and board[9] == board[17]) or
+                    (board[18] == board[17] and board[19] == board[17]) or
+                    (board[14] == board[17] and board[20] == board[17])
+            )
+        case 18:
+            return (
+                    (board[15] == board[18] and board[21] == board[18]) or
+                    (board[17] == board[18] and board[19] == board[18])
+            )
+        case 19:
+            return (
+                    (board[17] == board[19] and board[18] == board[19]) or
+                    (board[5] == board[19] and board[12] == board[19]) or
+                    (board[16] == board[19] and board[22] == board[19])
+            )
+        case 20:
+            return (
+                    (board[0] == board[20] and board[8] == board[20]) or
+                    (board[21] == board[20] and board[22] == board[20]) or
+                    (board[14] == board[20] and board[17] == board[20])
+            )
+        case 21:
+            return (
+                    (board[20] == board[21] and board[22] == board[21]) or
+                    (board[15] == board[21] and board[18] == board[21])
+            )
+        case 22:
+            return (
+                    (board[20] == board[22] and board[21] == board[22]) or
+                    (board[16] == board[22] and board[19] == board[22]) or
+                    (board[2] == board[22] and board[13] == board[22])
+            )
+        case _: return False
+
+
+
+def legacy_count_mills(board, player):
+    """
+    The original count_mills, built on legacy_close_mill.
+    """
+    return sum(1 for i in range(len(board)) if board[i] == player and legacy_close_mill(i, board)) // 3
+
+
+def legacy_can_be_removed(position, board):
+    """
+    The original can_be_removed, built on legacy_close_mill.
+    """
+    player = board[position]
+    if legacy_close_mill(position, board):
+        return all(legacy_close_mill(i, board) for i, piece in enumerate(board) if piece == player)
+    return True
+
+
+def legacy_count_safe_pieces(board, player):
+    """
+    The original count_safe_pieces, built on legacy_close_mill.
+    """
+    return sum(1 for i in range(len(board)) if board[i] == player and
+               (legacy_close_mill(i, board) or not legacy_can_be_removed(i, board)))
+
+
+def random_boards(count, seed=0):
+    """
+    Generate reproducible random boards with a mix of pieces and empty points.
+
+    Parameters:
+    - count (int): The number of boards to generate.
+    - seed (int): The random seed.
+
+    Returns:
+    - list: A list of board configurations.
+    """
+    rng = random.Random(seed)
+    return [[rng.choice('WBx') for _ in range(23)] for _ in range(count)]
+
+
+def bench(label, legacy, table, repeat=5):
+    """
+    Time two implementations of the same operation and print the speedup.
+
+    Parameters:
+    - label (str): The name of the operation.
+    - legacy (Callable): The original implementation, run with no arguments.
+    - table (Callable): The table-driven implementation, run with no arguments.
+    - repeat (int): The number of timing runs; the best one is kept.
+
+    Returns:
+    - None
+    """
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=repeat))
+    table_time = min(timeit.repeat(table, number=1, repeat=repeat))
+    print(f"{label:28} {legacy_time * 1000:9.2f} ms {table_time * 1000:9.2f} ms {legacy_time / table_time:7.2f}x")
+
+
+def main():
+    boards = random_boards(2000)
+    masks = [[piece_mask(board, board[position]) for position in range(23)] for board in boards]
+
+    for board, board_masks in zip(boards, masks):
+        for position in range(23):
+            assert legacy_close_mill(position, board) == close_mill(position, board)
+            assert legacy_close_mill(position, board) == mask_close_mill(position, board_masks[position])
+            assert legacy_can_be_removed(position, board) == can_be_removed(position, board)
+        for player in 'WB':
+            assert legacy_count_mills(board, player) == count_mills(board, player)
+            assert legacy_count_safe_pieces(board, player) == count_safe_pieces(board, player)
+
+    print(f"{'operation':28} {'legacy':>12} {'table':>12} {'speedup':>8}")
+    bench("close_mill (list)",
+          lambda: [legacy_close_mill(p, b) for b in boards for p in range(23)],
+          lambda: [close_mill(p, b) for b in boards for p in range(23)])
+    bench("close_mill (mask)",
+          lambda: [legacy_close_mill(p, b) for b in boards for p in range(23)],
+          lambda: [mask_close_mill(p, m[p]) for m in masks for p in range(23)])
+    bench("count_mills",
+          lambda: [legacy_count_mills(b, pl) for b in boards for pl in 'WB'],
+          lambda: [count_mills(b, pl) for b in boards for pl in 'WB'])
+    bench("can_be_removed",
+          lambda: [legacy_can_be_removed(p, b) for b in boards for p in range(23)],
+          lambda: [can_be_removed(p, b) for b in boards for p in range(23)])
+    bench("count_safe_pieces",
+          lambda: [legacy_count_safe_pieces(b, pl) for b in boards for pl in 'WB'],
+          lambda: [count_safe_pieces(b, pl) for b in boards for pl in 'WB'])
+
+
+if __name__ == "__main__":
+    main()
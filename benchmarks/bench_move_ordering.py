@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.util import open_board
+from utils.move_ordering import MoveOrderer
+from modules.minimax_game import MiniMaxGame
+from modules.minimax_opening import MiniMaxOpening
+from modules.ab_game import ABGame
+from modules.ab_opening import ABOpening
+
+
+def load_corpus(random_boards, seed):
+    """
+    Collect the boards to measure: the test_files boards plus optional random midgame boards.
+
+    Boards that are not 23 points long (for example empty files) are skipped with a note.
+
+    Parameters:
+    - random_boards (int): The number of random midgame boards to add.
+    - seed (int): The random seed for the generated boards.
+
+    Returns:
+    - list: A list of (name, board) pairs.
+    """
+    corpus = []
+    test_files_dir = os.path.join(os.path.dirname(__file__), '..', 'test_files')
+    for path in sorted(glob.glob(os.path.join(test_files_dir, 'board*.txt'))):
+        name = os.path.basename(path)
+        try:
+            board = open_board(name)
+        except IOError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        corpus.append((name, board))
+
+    rng = random.Random(seed)
+    for index in range(random_boards):
+        board = ['x'] * 23
+        points = rng.sample(range(23), 12)
+        for point in points[:6]:
+            board[point] = 'W'
+        for point in points[6:]:
+            board[point] = 'B'
+        corpus.append((f"random{index + 1}", board))
+    return corpus
+
+
+def count_nodes(game, board, depth):
+    """
+    Run one search and return the number of positions it evaluated.
+
+    Parameters:
+    - game (Any): An instance of a search class.
+    - board (list): The board to search.
+    - depth (int): The search depth.
+
+    Returns:
+    - int: The number of positions evaluated by static estimation.
+    """
+    # The quiescence search would add leaves the MiniMax baseline does not have
+    game.quiescence = False
+    game.play_game(board, depth)
+    return game.stats.leaves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Alpha-Beta node counts with and without move ordering.")
+    parser.add_argument("--depth", type=int, default=4, help="search depth")
+    parser.add_argument("--random", type=int, default=4, help="number of random midgame boards to add")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random boards")
+    args = parser.parse_args()
+
+    pairs = (
+        ("MiniMaxGame", MiniMaxGame, ABGame),
+        ("MiniMaxOpening", MiniMaxOpening, ABOpening),
+    )
+    for baseline_name, baseline_class, ab_class in pairs:
+        print(f"\n{baseline_name} vs {ab_class.__name__} at depth {args.depth}\n")
+        print(f"{'board':12} {'minimax':>10} {'unordered':>10} {'ordered':>10} {'pruned':>8} {'gain':>7}")
+        for name, board in load_corpus(args.random, args.seed):
+            minimax = count_nodes(baseline_class(), board, args.depth)
+            unordered = count_nodes(ab_class(move_orderer=MoveOrderer(False, False, False)), board, args.depth)
+            ordered = count_nodes(ab_class(), board, args.depth)
+            pruned = 1 - ordered / minimax if minimax else 0.0
+            gain = unordered / ordered if ordered else 0.0
+            print(f"{name:12} {minimax:10} {unordered:10} {ordered:10} {pruned:8.1%} {gain:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
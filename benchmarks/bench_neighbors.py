@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.util import (
+    close_mill, count_mills, count_center_control, count_potential_mills, count_threats, piece_vulnerability,
+    piece_strength, static_estimation_opening_improved
+)
+
+
+def legacy_get_neighbors(position):
+    """
+    The original match-based neighbour lookup, building a new list on every call, kept here as the baseline
+    for the comparison.
+
+    Parameters:
+    - position (int): The index of the position whose neighbors are to be found.
+
+    Returns:
+    - list: A list of indices representing neighboring positions.
+    """
+    match position:
+        case 0: return [1, 3, 8]
+        case 1: return [0, 2, 4]
+        case 2: return [1, 5, 13]
+        case 3: return [0, 4, 6, 9]
+        case 4: return [1, 3, 5]
+        case 5: return [2, 4, 7, 12]
+        case 6: return [3, 7, 10]
+        case 7: return [5, 6, 11]
+        case 8: return [0, 9, 20]
+        case 9: return [3, 8, 10, 17]
+        case 10: return [6, 9, 14]
+        case 11: return [7, 12, 16]
+        case 12: return [5, 11, 13, 19]
+        case 13: return [2, 12, 22]
+        case 14: return [10, 15, 17]
+        case 15: return [14, 16, 18]
+        case 16: return [11, 15, 19]
+        case 17: return [9, 14, 18, 20]
+        case 18: return [15, 17, 21]
+        case 19: return [12, 16, 22]
+        case 20: return [8, 17, 21]
+        case 21: return [18, 20, 22]
+        case 22: return [13, 19, 21]
+        case _: return []
+
+
+def legacy_count_potential_mills(board, player):
+    """
+    The original count_potential_mills, built on legacy_get_neighbors.
+    """
+    return sum(1 for i in range(len(board)) if board[i] == player and
+               sum(1 for j in legacy_get_neighbors(i) if board[j] == player) == 2)
+
+
+def legacy_count_threats(board, player):
+    """
+    The original count_threats, built on legacy_get_neighbors.
+    """
+    opponent = 'B' if player == 'W' else 'W'
+    return sum(1 for i in range(len(board)) if board[i] == player and
+               any(close_mill(j, board[:i] + [opponent] + board[i+1:])
+                   for j in legacy_get_neighbors(i) if board[j] == 'x'))
+
+
+def legacy_piece_vulnerability(position, board):
+    """
+    The original piece_vulnerability, built on legacy_get_neighbors.
+    """
+    player = board[position]
+    opponent = 'B' if player == 'W' else 'W'
+    vulnerable = 1 if board[position] != 'x' and not close_mill(position, board) else 0
+    surrounded = sum(1 for neighbor in legacy_get_neighbors(position) if board[neighbor] == opponent)
+    return vulnerable * surrounded
+
+
+def legacy_piece_strength(position, board):
+    """
+    The original piece_strength, built on legacy_get_neighbors.
+    """
+    player = board[position]
+    strength = 0
+    if board[position] == player:
+        for neighbor in legacy_get_neighbors(position):
+            if board[neighbor] == player:
+                strength += 1
+    return strength
+
+
+def legacy_static_estimation_opening_improved(board):
+    """
+    The original static_estimation_opening_improved, built on the legacy helpers, for the per-node figures.
+    """
+    return (board.count('W') - board.count('B') + 2 * (count_mills(board, 'W') - count_mills(board, 'B')) +
+            (legacy_count_potential_mills(board, 'W') - legacy_count_potential_mills(board, 'B')) +
+            (count_center_control(board, 'W') - count_center_control(board, 'B')) -
+            (legacy_count_threats(board, 'W') - legacy_count_threats(board, 'B')) +
+            (sum(legacy_piece_strength(i, board) for i, piece in enumerate(board) if piece == 'W') -
+             sum(legacy_piece_strength(i, board) for i, piece in enumerate(board) if piece == 'B')))
+
+
+def random_boards(count, seed=0):
+    """
+    Generate reproducible random boards with a mix of pieces and empty points.
+
+    Parameters:
+    - count (int): The number of boards to generate.
+    - seed (int): The random seed.
+
+    Returns:
+    - list: A list of board configurations.
+    """
+    rng = random.Random(seed)
+    return [[rng.choice('WBx') for _ in range(23)] for _ in range(count)]
+
+
+def neighbor_lists(function, boards):
+    """
+    Count the neighbour lists legacy_get_neighbors builds while a function runs, one per call.
+
+    Parameters:
+    - function (Callable): The function to measure, called with one board.
+    - boards (list): The boards to call it with.
+
+    Returns:
+    - float: The mean number of lists built per call.
+    """
+    calls = 0
+    code = legacy_get_neighbors.__code__
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == 'call' and frame.f_code is code:
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        for board in boards:
+            function(board)
+    finally:
+        sys.setprofile(None)
+    return calls / len(boards)
+
+
+def bench(label, legacy, table, boards, repeat=5):
+    """
+    Time two implementations of the same operation over the boards and print the speedup and the neighbour
+    lists each builds per board.
+
+    Parameters:
+    - label (str): The name of the operation.
+    - legacy (Callable): The original implementation, called with one board.
+    - table (Callable): The table-driven implementation, called with one board.
+    - boards (list): The boards to run both on.
+    - repeat (int): The number of timing runs; the best one is kept.
+
+    Returns:
+    - None
+    """
+    legacy_time = min(timeit.repeat(lambda: [legacy(board) for board in boards], number=1, repeat=repeat))
+    table_time = min(timeit.repeat(lambda: [table(board) for board in boards], number=1, repeat=repeat))
+    legacy_lists, table_lists = neighbor_lists(legacy, boards), neighbor_lists(table, boards)
+    print(f"{label:28} {legacy_time * 1000:9.2f} ms {table_time * 1000:9.2f} ms {legacy_time / table_time:7.2f}x"
+          f" {legacy_lists:12.1f} {table_lists:12.1f}")
+
+
+def main():
+    boards = random_boards(2000)
+    for board in boards:
+        for player in 'WB':
+            assert legacy_count_potential_mills(board, player) == count_potential_mills(board, player)
+            assert legacy_count_threats(board, player) == count_threats(board, player)
+        for position in range(23):
+            assert legacy_piece_vulnerability(position, board) == piece_vulnerability(position, board)
+            assert legacy_piece_strength(position, board) == piece_strength(position, board)
+        assert legacy_static_estimation_opening_improved(board) == static_estimation_opening_improved(board)
+
+    print(f"{'operation':28} {'legacy':>12} {'table':>12} {'speedup':>8} {'legacy lists':>12} {'table lists':>12}")
+    bench("count_potential_mills",
+          lambda b: [legacy_count_potential_mills(b, player) for player in 'WB'],
+          lambda b: [count_potential_mills(b, player) for player in 'WB'], boards)
+    bench("count_threats",
+          lambda b: [legacy_count_threats(b, player) for player in 'WB'],
+          lambda b: [count_threats(b, player) for player in 'WB'], boards)
+    bench("piece_vulnerability",
+          lambda b: [legacy_piece_vulnerability(p, b) for p in range(23)],
+          lambda b: [piece_vulnerability(p, b) for p in range(23)], boards)
+    bench("piece_strength",
+          lambda b: [legacy_piece_strength(p, b) for p in range(23)],
+          lambda b: [piece_strength(p, b) for p in range(23)], boards)
+    bench("opening_improved (per node)", legacy_static_estimation_opening_improved,
+          static_estimation_opening_improved, boards)
+
+
+if __name__ == "__main__":
+    main()
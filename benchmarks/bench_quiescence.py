@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from modules.ab_game import ABGame
+from modules.ab_game_improved import ABGameImproved
+
+CLASSES = {cls.__name__: cls for cls in (ABGame, ABGameImproved)}
+
+
+def random_midgame_boards(count, seed):
+    """
+    Generate random midgame boards with seven pieces a side.
+
+    Parameters:
+    - count (int): The number of boards.
+    - seed (int): The random seed.
+
+    Returns:
+    - list: The boards.
+    """
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = ['x'] * 23
+        points = rng.sample(range(23), 14)
+        for point in points[:7]:
+            board[point] = 'W'
+        for point in points[7:]:
+            board[point] = 'B'
+        boards.append(board)
+    return boards
+
+
+def measure(game_class, board, depth, quiescence):
+    """
+    Run one search.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The search class.
+    - board (list): The board to search.
+    - depth (int): The search depth.
+    - quiescence (bool): Whether leaves are resolved by the quiescence search.
+
+    Returns:
+    - tuple: The score, the best move board, the nodes searched including quiescence nodes, and the
+      time in seconds.
+    """
+    game = game_class()
+    game.quiescence = quiescence
+    start = perf_counter()
+    score, best_move = game.play_game(list(board), depth)
+    elapsed = perf_counter() - start
+    return score, best_move, game.stats.nodes + game.stats.quiescence_nodes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the score stability and cost of quiescence search against searching a ply deeper."
+    )
+    parser.add_argument("--depth", type=int, default=2, help="nominal search depth")
+    parser.add_argument("--boards", type=int, default=12, help="number of random midgame boards")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random boards")
+    parser.add_argument("--classes", default=','.join(CLASSES), help="comma-separated search classes")
+    args = parser.parse_args()
+
+    boards = random_midgame_boards(args.boards, args.seed)
+    reference_depth = args.depth + 2
+    variants = (
+        (f"depth {args.depth}", args.depth, False),
+        (f"depth {args.depth} + quiescence", args.depth, True),
+        (f"depth {args.depth + 1}", args.depth + 1, False),
+    )
+    for name in args.classes.split(','):
+        game_class = CLASSES[name]
+        totals = {label: [0, 0, 0, 0.0] for label, _, _ in variants}
+        for board in boards:
+            reference_score, reference_move, _, _ = measure(game_class, board, reference_depth, False)
+            for label, depth, quiescence in variants:
+                score, best_move, nodes, elapsed = measure(game_class, board, depth, quiescence)
+                total = totals[label]
+                if reference_score not in (float('inf'), float('-inf')) and score not in (float('inf'), float('-inf')):
+                    total[0] += abs(score - reference_score)
+                total[1] += best_move == reference_move
+                total[2] += nodes
+                total[3] += elapsed
+
+        print(f"\n{name}: {args.boards} boards against depth {reference_depth} without quiescence\n")
+        print(f"{'search':28} {'score error':>12} {'same move':>10} {'nodes':>10} {'time (s)':>10}")
+        for label, (error, same_move, nodes, elapsed) in totals.items():
+            print(f"{label:28} {error:12} {same_move:10} {nodes:10} {elapsed:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
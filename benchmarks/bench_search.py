@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from time import perf_counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import command_mapping
+from utils.util import open_board
+
+# Pieces on the board for each generated phase: (white, black)
+PHASE_PIECES = {
+    'opening': ((2, 2), (3, 3), (4, 3)),
+    'midgame': ((6, 6), (7, 5), (5, 6)),
+    'endgame': ((3, 4), (4, 3), (3, 3)),
+}
+
+
+def load_corpus(per_phase, seed):
+    """
+    Build the fixed benchmark corpus: the test_files boards plus generated opening, midgame and endgame
+    positions.
+
+    Parameters:
+    - per_phase (int): The number of positions to generate for each phase.
+    - seed (int): The random seed for the generated positions.
+
+    Returns:
+    - list: A list of (name, phase, board) triples; the test_files boards have the phase 'file'.
+    """
+    corpus = []
+    test_files_dir = os.path.join(os.path.dirname(__file__), '..', 'test_files')
+    for path in sorted(glob.glob(os.path.join(test_files_dir, 'board*.txt'))):
+        name = os.path.basename(path)
+        try:
+            corpus.append((name, 'file', open_board(name)))
+        except IOError:
+            continue
+
+    rng = random.Random(seed)
+    for phase, pieces in PHASE_PIECES.items():
+        for index in range(per_phase):
+            white, black = pieces[index % len(pieces)]
+            board = ['x'] * 23
+            points = rng.sample(range(23), white + black)
+            for point in points[:white]:
+                board[point] = 'W'
+            for point in points[white:]:
+                board[point] = 'B'
+            corpus.append((f"{phase}{index + 1}", phase, board))
+    return corpus
+
+
+def measure(game_class, board, depth, repeat, memory):
+    """
+    Run one search and measure it.
+
+    The time is the best of several runs, each with a fresh instance of the search class. The peak
+    memory is taken in a separate run under tracemalloc, which slows the search down, and includes
+    the instance's tables. Opening books are bypassed so the search itself is measured.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The search class.
+    - board (list): The board to search.
+    - depth (int): The search depth.
+    - repeat (int): The number of timed runs.
+    - memory (bool): Whether to measure the peak memory.
+
+    Returns:
+    - dict: The score, node count, wall time in seconds, nodes per second and peak memory in KiB.
+    """
+    best_time = float('inf')
+    for _ in range(repeat):
+        game = game_class()
+        game.use_book = False
+        start = perf_counter()
+        score, _ = game.play_game(list(board), depth)
+        best_time = min(best_time, perf_counter() - start)
+    nodes = game.stats.leaves
+
+    peak_kib = None
+    if memory:
+        tracemalloc.start()
+        game = game_class()
+        game.use_book = False
+        game.play_game(list(board), depth)
+        peak_kib = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+
+    return {
+        'score': score if score not in (float('inf'), float('-inf')) else str(score),
+        'nodes': nodes,
+        'time_s': round(best_time, 6),
+        'nodes_per_sec': round(nodes / best_time) if best_time > 0 else None,
+        'peak_kib': peak_kib,
+    }
+
+
+def git_commit():
+    """
+    Return the commit the benchmark runs on, if it runs inside a git checkout.
+
+    Returns:
+    - str: The commit hash, or None.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(results):
+    """
+    Total the node counts and times for every class and depth.
+
+    Parameters:
+    - results (list): The per-position results.
+
+    Returns:
+    - list: One dictionary per class and depth with the totals and overall nodes per second.
+    """
+    totals = {}
+    for result in results:
+        entry = totals.setdefault((result['class'], result['depth']), {'nodes': 0, 'time_s': 0.0, 'peak_kib': 0})
+        entry['nodes'] += result['nodes']
+        entry['time_s'] += result['time_s']
+        if result['peak_kib'] is not None:
+            entry['peak_kib'] = max(entry['peak_kib'], result['peak_kib'])
+    summary = []
+    for (name, depth), entry in totals.items():
+        time_s = round(entry['time_s'], 6)
+        summary.append({
+            'class': name, 'depth': depth, 'nodes': entry['nodes'], 'time_s': time_s,
+            'nodes_per_sec': round(entry['nodes'] / time_s) if time_s > 0 else None,
+            'peak_kib': entry['peak_kib'],
+        })
+    return summary
+
+
+def compare(baseline, report):
+    """
+    Print the change in time and node count of every class and depth against an earlier report.
+
+    Parameters:
+    - baseline (dict): An earlier report written by this script.
+    - report (dict): The current report.
+
+    Returns:
+    - None
+    """
+    previous = {(entry['class'], entry['depth']): entry for entry in baseline['summary']}
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'baseline'}:\n")
+    print(f"{'class':24} {'depth':>5} {'speedup':>9} {'nodes':>9}")
+    for entry in report['summary']:
+        old = previous.get((entry['class'], entry['depth']))
+        if old is None:
+            continue
+        speedup = old['time_s'] / entry['time_s'] if entry['time_s'] else float('inf')
+        nodes = entry['nodes'] / old['nodes'] if old['nodes'] else float('inf')
+        print(f"{entry['class']:24} {entry['depth']:5} {speedup:8.2f}x {nodes:8.2f}x")
+    old_scores = {(result['class'], result['position'], result['depth']): result['score']
+                  for result in baseline['results']}
+    unmatched = 0
+    for result in report['results']:
+        measurement = (result['class'], result['position'], result['depth'])
+        if measurement not in old_scores:
+            unmatched += 1
+        elif old_scores[measurement] != result['score']:
+            print(f"Score changed: {measurement[0]} on {measurement[1]} at depth {measurement[2]}.")
+    if unmatched:
+        print(f"\n{unmatched} measurements have no counterpart in the baseline.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every search class over a fixed corpus of positions.")
+    parser.add_argument("--depths", default="1,2,3", help="comma-separated search depths")
+    parser.add_argument("--classes", default=None, help="comma-separated class names (default: all)")
+    parser.add_argument("--per-phase", type=int, default=3, help="generated positions per phase")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated positions")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per measurement; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory runs")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="compare against a JSON report from an earlier run")
+    args = parser.parse_args()
+
+    depths = [int(depth) for depth in args.depths.split(',')]
+    names = args.classes.split(',') if args.classes else list(command_mapping)
+    corpus = load_corpus(args.per_phase, args.seed)
+
+    results = []
+    for name in names:
+        game_class = command_mapping[name]
+        # Opening classes place pieces; the others move them
+        phases = ('file', 'opening') if 'Opening' in name else ('file', 'midgame', 'endgame')
+        for depth in depths:
+            for position, phase, board in corpus:
+                if phase not in phases:
+                    continue
+                result = {'class': name, 'position': position, 'phase': phase, 'depth': depth}
+                result.update(measure(game_class, board, depth, args.repeat, not args.no_memory))
+                results.append(result)
+        print(f"{name}: done", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'depths': depths,
+            'per_phase': args.per_phase,
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'summary': summarize(results),
+        'results': results,
+    }
+
+    print(f"\n{'class':24} {'depth':>5} {'nodes':>10} {'time (s)':>10} {'nodes/s':>10} {'peak KiB':>10}")
+    for entry in report['summary']:
+        print(f"{entry['class']:24} {entry['depth']:5} {entry['nodes']:10} {entry['time_s']:10.4f} "
+              f"{entry['nodes_per_sec'] or 0:10} {entry['peak_kib']:10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}.")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,19 @@ else:
     # If running as a script, use the original path setup
     sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from typing import Callable, Any
+import argparse
+import sqlite3
+from typing import Callable, Any, Optional
 from utils.util import (
-    get_positions_evaluated,
-    reset_positions_evaluated,
     open_board,
     write_best_move,
     display_help,
     ascii_title,
-    print_board,
+    read_ascii_board,
+    render_board,
     get_ascii_board_path
 )
+from utils.board import Move
 from modules.minimax_opening import MiniMaxOpening
 from modules.minimax_game import MiniMaxGame
 from modules.ab_opening import ABOpening
@@ -32,6 +34,13 @@ from modules.minimax_opening_improved import MiniMaxOpeningImproved
 from modules.minimax_game_improved import MiniMaxGameImproved
 from modules.ab_opening_improved import ABOpeningImproved
 from modules.ab_game_improved import ABGameImproved
+from modules.iterative_deepening import IterativeDeepening
+from modules.parallel_search import ParallelSearch, MODES
+from modules.batch_analysis import BatchAnalysis, load_jobs
+from utils.analysis_cache import AnalysisCache, DEFAULT_PATH as CACHE_PATH
+from utils.tablebase import default_tablebase
+from utils.profiling import Profiler
+from utils.batch_evaluation import HAVE_NUMPY
 
 
 # Dictionary to map commands to game classes
@@ -62,7 +71,10 @@ class_name_to_message = {
 }
 
 
-def game_main(game_class: Callable[..., Any], input_file: str, output_file: str, depth: int):
+def game_main(game_class: Callable[..., Any], input_file: str, output_file: str, depth: int,
+              time_budget_ms: Optional[float] = None, parallel_mode: Optional[str] = None, use_book: bool = True,
+              cache: Optional[AnalysisCache] = None, profile: Optional[str] = None, reuse_deeper: bool = False,
+              batch_leaves: bool = False):
     """
     Executes the main game logic using the specified game class.
 
@@ -77,6 +89,15 @@ def game_main(game_class: Callable[..., Any], input_file: str, output_file: str,
     - input_file (str): The path to the file containing the initial board state.
     - output_file (str): The path to the file where the best move will be written.
     - depth (int): The depth for the game's search algorithm.
+    - time_budget_ms (Optional[float]): If given, the depth is ignored and the game class is run with
+      iterative deepening for this many milliseconds.
+    - parallel_mode (Optional[str]): If given ('split' or 'lazy-smp'), the search runs on all CPU cores.
+    - use_book (bool): Whether an opening class may answer from its opening book instead of searching.
+    - cache (Optional[AnalysisCache]): If given, fixed depth searches are answered from and stored in this cache.
+    - profile (Optional[str]): If given, the search is profiled, bypassing the cache, and the profile is written
+      to this path with the extensions .json and .folded.
+    - reuse_deeper (bool): Whether a cached result searched deeper than the depth may answer.
+    - batch_leaves (bool): Whether the search scores the leaves below each node in one batch.
 
     Exceptions:
     - Catches and prints any exceptions that occur during the game's execution.
@@ -85,16 +106,43 @@ def game_main(game_class: Callable[..., Any], input_file: str, output_file: str,
     - None
     """
     try:
-        game = game_class()
         board = open_board(input_file)
-        ascii_board = get_ascii_board_path()
-        estimate, best_move = game.play_game(board, depth)
+        # Only fixed depth results are cached, since a time budget does not say how deep the search went
+        use_cache = cache is not None and time_budget_ms is None and profile is None
+        profiler = None
+        # Movement-phase classes answer from the tablebase whenever its file exists, which changes their results
+        use_tablebase = game_class.probes_tablebase and default_tablebase() is not None
+        cached = cache.get(board, game_class.__name__, depth, use_book, reuse_deeper,
+                           use_tablebase) if use_cache else None
+        if cached is not None:
+            game = None
+            estimate, best_move, _ = cached
+        else:
+            if time_budget_ms is not None:
+                game = IterativeDeepening(game_class)
+            elif parallel_mode is not None:
+                game = ParallelSearch(game_class, mode=parallel_mode)
+            else:
+                game = game_class()
+            # The drivers wrap an instance of the game class, which is the one that consults the book
+            getattr(game, 'game', game).use_book = use_book
+            getattr(game, 'game', game).batch_leaves = batch_leaves
+            # Worker processes of a parallel search are not profiled, only the part searched in this process
+            profiler = Profiler().install([game_class]) if profile is not None else None
+            try:
+                estimate, best_move = game.play_game(board, time_budget_ms if time_budget_ms is not None else depth)
+            finally:
+                if profiler is not None:
+                    profiler.uninstall()
+            if use_cache and best_move is not None:
+                cache.put(board, game_class.__name__, depth, estimate, best_move, use_book, use_tablebase)
 
         write_best_move(output_file, best_move)
 
         # Get the ASCII board representations
-        initial_board_str = print_board(input_file, ascii_board)
-        new_board_str = print_board(output_file, ascii_board)
+        ascii_board = read_ascii_board(get_ascii_board_path())
+        initial_board_str = render_board(board, ascii_board)
+        new_board_str = render_board(best_move, ascii_board)
 
         # Split the board strings into lines for side-by-side printing
         initial_board_lines = initial_board_str.split('\n')
@@ -107,10 +155,35 @@ def game_main(game_class: Callable[..., Any], input_file: str, output_file: str,
 
         print(f"Input position: {''.join(board)}")
         print(f"Output position: {''.join(best_move)}")
-        print(f"Positions evaluated by static estimation: {get_positions_evaluated()}.")
+        if best_move != board:
+            print(f"Best move: {Move.between(board, best_move)}.")
+        stats = game.stats if game is not None else None
+        if cached is not None:
+            print(f"Positions evaluated by static estimation: none, cached result (depth {cached[2]}).")
+        else:
+            print(f"Positions evaluated by static estimation: {stats.leaves}.")
+        if stats is not None and stats.nodes:
+            print(f"Search: {stats.nodes} nodes, {stats.cutoffs} cutoffs, {stats.researches} re-searches, "
+                  f"{stats.tt_hits} transposition table hits, branching factors {stats.branching_factors()}, "
+                  f"{stats.elapsed * 1000:.1f} ms.")
+
+        table = getattr(game, 'transposition_table', None)
+        if table is not None:
+            print(f"Transposition table: {table.hits} hits, {table.misses} misses.")
+        if time_budget_ms is not None:
+            print(f"Deepest completed depth: {game.completed_depth}.")
+        if parallel_mode is not None and game is not None:
+            print(f"Worker processes: {game.workers} ({parallel_mode}).")
+        if use_cache:
+            found = f"hit, searched to depth {cached[2]}" if cached is not None else "miss"
+            print(f"Analysis cache: {found} ({cache.hits} hits, {cache.misses} misses this session).")
+
+        if profiler is not None:
+            json_file, folded_file = profiler.write(profile)
+            print(f"Profile written to {json_file} and {folded_file}.")
 
         # Depending on the class the estimate is printed differently
-        class_name = game.__class__.__name__
+        class_name = game_class.__name__
         message = class_name_to_message.get(class_name, "MINIMAX estimate: {}.")
         print(message.format(estimate))
 
@@ -118,18 +191,57 @@ def game_main(game_class: Callable[..., Any], input_file: str, output_file: str,
         print(f"\nError: {e}")
 
 
-def main():
+def batch_leaves_error(command):
+    """
+    Explain why a command cannot score its leaves in batches.
+
+    Parameters:
+    - command (str): The name of the command.
+
+    Returns:
+    - str: The error message.
+    """
+    if not HAVE_NUMPY:
+        return "Scoring leaves in batches needs NumPy 2 or later."
+    supported = ', '.join(name for name, game_class in command_mapping.items() if game_class.supports_batch_leaves())
+    return f"{command} cannot score its leaves in batches; only {supported} can."
+
+
+def main(profile=None):
+    """
+    Runs the interactive prompt.
+
+    Parameters:
+    - profile (str): If given, every search is profiled and its profile written to this path with the
+      extensions .json and .folded, replacing the profile of the previous command.
+
+    Returns:
+    - None
+    """
     ascii_title()
     print("Instructions: \n")
     print("\t1. Enter the command followed by the input file, output file, and depth.")
     print("\t2. Input files must be in the provided test_files directory.\n")
     print("Format: \n")
-    print("\t<command> <input_file.txt> <output_file.txt> <depth>\n")
+    print("\t<command> <input_file.txt> <output_file.txt> <depth>")
+    print("\t<command> <input_file.txt> <output_file.txt> <time>ms")
+    print("\t<command> <input_file.txt> <output_file.txt> <depth> split|lazy-smp")
+    print("\t<command> <input_file.txt> <output_file.txt> <depth> nobook   (skip the opening book)")
+    print("\t<command> <input_file.txt> <output_file.txt> <depth> reusedeeper   (accept a deeper cached result)")
+    print("\t<command> <input_file.txt> <output_file.txt> <depth> batch   (score leaves in batches with NumPy)\n")
     print("Example input: \n")
-    print("\tMiniMaxOpening board1.txt board2.txt 2\n")
+    print("\tMiniMaxOpening board1.txt board2.txt 2")
+    print("\tABGame board1.txt board2.txt 500ms")
+    print("\tABGameImproved board1.txt board2.txt 6 split\n")
     print("Type 'help' for a list of acceptable commands.")
     print("Type 'exit' or 'quit' to end the program.")
 
+    try:
+        cache = AnalysisCache()
+    except sqlite3.Error as e:
+        print(f"\nThe analysis cache is unavailable ({e}); every position will be searched.")
+        cache = None
+
     while True:
         try:
             command = input("\nEnter input >>> ")
@@ -141,17 +253,38 @@ def main():
                 display_help()
                 continue
 
-            if len(parts) == 4:
+            # Trailing options, in any order
+            options = set()
+            while len(parts) > 4 and parts[-1].lower() in ("nobook", "reusedeeper", "batch"):
+                options.add(parts.pop().lower())
+            use_book = "nobook" not in options
+
+            if len(parts) in (4, 5):
                 input_file, output_file = parts[1], parts[2]
+                depth, time_budget_ms = 0, None
+                parallel_mode = parts[4].lower() if len(parts) == 5 else None
+                if parallel_mode is not None and parallel_mode not in MODES:
+                    print(f"\nError: The parallel mode must be one of: {', '.join(MODES)}.")
+                    continue
                 try:
-                    depth = int(parts[3])
+                    if parts[3].lower().endswith("ms"):
+                        time_budget_ms = float(parts[3][:-2])
+                    else:
+                        depth = int(parts[3])
                 except ValueError:
-                    print("\nError: Depth must be an integer.")
+                    print("\nError: Depth must be an integer or a time budget such as 500ms.")
+                    continue
+                if parallel_mode is not None and time_budget_ms is not None:
+                    print("\nError: A parallel search takes a depth, not a time budget.")
                     continue
 
                 if parts[0] in command_mapping:
-                    reset_positions_evaluated()
-                    game_main(command_mapping[parts[0]], input_file, output_file, depth)
+                    batch_leaves = "batch" in options
+                    if batch_leaves and not command_mapping[parts[0]].supports_batch_leaves():
+                        print(f"\nError: {batch_leaves_error(parts[0])}")
+                        continue
+                    game_main(command_mapping[parts[0]], input_file, output_file, depth, time_budget_ms,
+                              parallel_mode, use_book, cache, profile, "reusedeeper" in options, batch_leaves)
                 else:
                     raise Exception("Invalid command. Please use the correct format.")
             else:
@@ -161,5 +294,76 @@ def main():
             print(f"\nError: {e}")
 
 
+def batch_main(argv):
+    """
+    Runs one game class over a manifest or JSONL file of positions without the interactive prompt.
+
+    Parameters:
+    - argv (list): The command line arguments after the script name.
+
+    Returns:
+    - int: The exit status: 0 if every position was analysed, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Analyse many positions in one run and write one JSON result per line."
+    )
+    parser.add_argument("command", choices=sorted(command_mapping), help="the game class to run")
+    parser.add_argument("input", help="a manifest of board files, or a .jsonl file of positions")
+    parser.add_argument("output", help="the .jsonl file to write the results to")
+    parser.add_argument("--depth", type=int, default=3, help="search depth for positions that do not give one")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPU cores)")
+    parser.add_argument("--ascii", action="store_true", help="include the ascii board of each best move")
+    parser.add_argument("--no-book", action="store_true", help="search opening positions instead of using the book")
+    parser.add_argument("--cache", default=CACHE_PATH, help="the analysis cache file (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="search every position, neither reading nor "
+                                                                "writing the analysis cache")
+    parser.add_argument("--cache-size", type=int, default=100000, help="results kept in the analysis cache")
+    parser.add_argument("--reuse-deeper", action="store_true", help="also answer from results searched deeper")
+    parser.add_argument("--batch-leaves", action="store_true", help="score the leaves below each node in one "
+                                                                    "NumPy batch")
+    parser.add_argument("--profile", nargs="?", const="profile", metavar="PREFIX",
+                        help="profile the searches, bypassing the cache, and write PREFIX.json and PREFIX.folded")
+    args = parser.parse_args(argv)
+    if args.batch_leaves and not command_mapping[args.command].supports_batch_leaves():
+        print(f"Error: {batch_leaves_error(args.command)}")
+        return 1
+
+    try:
+        jobs = load_jobs(args.input, args.depth)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    cache = None
+    if not args.no_cache and args.profile is None:
+        try:
+            cache = AnalysisCache(args.cache, args.cache_size, args.reuse_deeper)
+        except sqlite3.Error as e:
+            print(f"The analysis cache is unavailable ({e}); every position will be searched.")
+    ascii_board = read_ascii_board(get_ascii_board_path()) if args.ascii else None
+    batch = BatchAnalysis(command_mapping[args.command], args.workers, ascii_board, not args.no_book, cache,
+                          args.profile is not None, args.batch_leaves)
+    analysed, failed = batch.run(jobs, args.output)
+    print(f"Analysed {analysed} positions with {args.command}; {failed} failed. Results written to {args.output}.")
+    stats = batch.stats
+    print(f"Search: {stats.nodes} nodes, {stats.leaves} positions evaluated, {stats.cutoffs} cutoffs, "
+          f"{stats.researches} re-searches, {stats.tt_hits} transposition table hits in {stats.elapsed:.2f} s.")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Analysis cache: {stats['hits']} hits ({stats['deeper_hits']} from deeper searches), "
+              f"{stats['misses']} misses, {stats['evictions']} evictions, {stats['entries']} entries.")
+        cache.close()
+    if batch.profiler is not None:
+        json_file, folded_file = batch.profiler.write(args.profile)
+        print(f"Profile written to {json_file} and {folded_file}.")
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] != "--profile":
+        sys.exit(batch_main(sys.argv[1:]))
+    # 'python main.py --profile [PREFIX]' profiles every search made at the prompt
+    profile = None
+    if len(sys.argv) > 1:
+        profile = sys.argv[2] if len(sys.argv) > 2 else "profile"
+    main(profile)
@@ -1,77 +1,57 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    static_estimation_opening_improved, generate_move, generate_hopping,
-    static_estimation_midgame_endgame_improved
-)
+from modules.search_engine import SearchEngine, evaluate_midgame_endgame_improved
+from utils.evaluation import EvaluatedPosition
+from utils.position import iter_moves_midgame_endgame, iter_captures_midgame_endgame
 
 
-class ABGameImproved:
+class ABGameImproved(SearchEngine):
     """
     This class handles the logic for the midgame and endgame phases of the Nine Men's Morris game using the
     Alpha-Beta pruning algorithm.
-    It provides methods to generate moves and evaluate the best move for these phases with optimization and
-    uses enhanced static estimation.
+    It is a configuration of SearchEngine in which white and black take turns sliding their pieces, or hopping once
+    down to three, with leaves scored by the enhanced mid-game/endgame static estimation.
+    Leaves with a mill about to close are resolved by a quiescence search of the captures.
     """
-    def __init__(self):
-        pass
+    # The position type searched, built from the board by root_position
+    position_class = EvaluatedPosition
+    # play_game answers the positions covered by the endgame tablebase without searching
+    probes_tablebase = True
+    quiescence = True
 
-    def ab_game_improved(self, board, depth, alpha, beta, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute the improved Alpha-Beta pruning algorithm for the midgame or endgame phase of the game.
+        Lazily generate the moves available at a node: the side to move sliding, or hopping with
+        three pieces.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - alpha (float): The alpha value for pruning.
-        - beta (float): The beta value for pruning.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (EvaluatedPosition): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        if depth == 0:
-            if board.count('W') > 3:
-                return static_estimation_midgame_endgame_improved(board), board
-            return static_estimation_opening_improved(board), board
+        return iter_moves_midgame_endgame(position)
 
-        possible_moves = generate_hopping(board) if board.count('W') == 3 else generate_move(board)
+    def generate_captures(self, position):
+        """
+        Lazily generate the moves of the side to move closing a mill, for the quiescence search.
 
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.ab_game_improved(move, depth - 1, alpha, beta, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-                alpha = max(alpha, eval_value)
-                if beta <= alpha:
-                    break
-            return max_eval, best_move
+        Parameters:
+        - position (Position): The current position.
 
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.ab_game_improved(move, depth - 1, alpha, beta, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-            beta = min(beta, eval_value)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
+        Returns:
+        - Iterator: The (from, to, removed) moves in generation order.
+        """
+        return iter_captures_midgame_endgame(position)
 
-    def play_game(self, board, depth):
+    def evaluate(self, position):
         """
-        Initiates the play of the midgame or endgame phase with the Alpha-Beta pruning algorithm from the current
-        board state.
+        Score a leaf for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - position (EvaluatedPosition): The leaf position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - int: The static estimation of the leaf.
         """
-        return self.ab_game_improved(board, depth, float('-inf'), float('inf'), True)
+        return evaluate_midgame_endgame_improved(position)
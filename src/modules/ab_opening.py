@@ -1,73 +1,54 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    generate_add, static_estimation_opening
-)
+from modules.search_engine import SearchEngine, evaluate_opening
+from utils.batch_evaluation import boards_to_array, static_estimation_opening_batch
+from utils.position import iter_add
+from utils.symmetry import MILL_SYMMETRIES
 
 
-class ABOpening:
+class ABOpening(SearchEngine):
     """
-    This class handles the logic for the opening phase of the Nine Men's Morris game using the
-    Alpha-Beta pruning algorithm.
-    It provides methods to generate moves and evaluate the best move for the opening phase with optimization.
+    This class handles the logic for the opening phase of the Nine Men's Morris game using the Alpha-Beta pruning
+    algorithm.
+    It is a configuration of SearchEngine in which white and black take turns adding pieces, with leaves scored by
+    the opening static estimation.
     """
-    def __init__(self):
+    # The symmetries the search cannot tell apart, under which positions share opening book records
+    book_symmetries = MILL_SYMMETRIES
 
-        pass
-
-    def ab_opening(self, board, depth, alpha, beta, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute the Alpha-Beta pruning algorithm for the opening phase of the game.
+        Lazily generate the moves available at a node: the side to move adding a piece.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - alpha (float): The alpha value for pruning.
-        - beta (float): The beta value for pruning.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (Position): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        if depth == 0:
-            return static_estimation_opening(board), board
+        return iter_add(position)
 
-        possible_moves = generate_add(board)
+    def evaluate(self, position):
+        """
+        Score a leaf for the side to move at the root.
 
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.ab_opening(move, depth - 1, alpha, beta, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-                alpha = max(alpha, eval_value)
-                if beta <= alpha:
-                    break
-            return max_eval, best_move
+        Parameters:
+        - position (Position): The leaf position.
 
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.ab_opening(move, depth - 1, alpha, beta, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-            beta = min(beta, eval_value)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
+        Returns:
+        - int: The static estimation of the leaf.
+        """
+        return evaluate_opening(position.masks())
 
-    def play_game(self, board, depth):
+    def evaluate_batch(self, boards, colour):
         """
-        Initiates the play of the opening phase with the Alpha-Beta pruning algorithm from the current board state.
+        Score many leaves for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - boards (list): The white and black masks of the leaves, flattened into one list.
+        - colour (str): The colour to move at every leaf, 'W' or 'B'.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - numpy.ndarray: The static estimations of the leaves.
         """
-        return self.ab_opening(board, depth, float('-inf'), float('inf'), True)
+        return static_estimation_opening_batch(boards_to_array(boards))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from utils.util import (
+    read_board, parse_board, render_board
+)
+from utils.search_stats import SearchStats
+from utils.tablebase import default_tablebase
+from utils.profiling import Profiler
+
+# State of a worker process, set once by _init_worker when the pool starts it
+_game_class = None
+_ascii_board = None
+_use_book = True
+_batch_leaves = False
+_game = None
+_profiler = None
+
+
+def load_jobs(input_file, default_depth):
+    """
+    Read the positions to analyse from a manifest or a JSONL file.
+
+    A file ending in .jsonl holds one JSON object per line with a "board" string or a "file" path, an
+    optional "depth" and an optional "id". Any other file is a manifest listing one board file per
+    line, optionally followed by a depth. Relative board file paths are taken from the directory of
+    the input file. Blank lines and lines starting with '#' are skipped.
+
+    Parameters:
+    - input_file (str): The path to the manifest or JSONL file.
+    - default_depth (int): The depth used when a line does not give one.
+
+    Returns:
+    - list: A list of job dictionaries with the keys id, board and depth, or id and error.
+
+    Raises:
+    - ValueError: If a line cannot be parsed.
+    """
+    base_dir = os.path.dirname(os.path.abspath(input_file))
+    is_jsonl = input_file.endswith('.jsonl')
+    jobs = []
+    with open(input_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                if is_jsonl:
+                    entry = json.loads(line)
+                    board_text, path = entry.get('board'), entry.get('file')
+                    depth = int(entry.get('depth', default_depth))
+                    job_id = entry.get('id', path if path is not None else line_number)
+                else:
+                    fields = line.split()
+                    board_text, path = None, fields[0]
+                    depth = int(fields[1]) if len(fields) > 1 else default_depth
+                    job_id = path
+            except (ValueError, AttributeError) as e:
+                raise ValueError(f"{input_file}, line {line_number}: {e}")
+            if board_text is None and path is None:
+                raise ValueError(f"{input_file}, line {line_number}: expected a 'board' or a 'file'")
+
+            job = {'id': job_id, 'depth': depth}
+            try:
+                if board_text is None:
+                    board_text = ''.join(read_board(os.path.join(base_dir, path)))
+                job['board'] = parse_board(board_text)
+            except (OSError, ValueError) as e:
+                job['error'] = str(e)
+            jobs.append(job)
+    return jobs
+
+
+def _init_worker(game_class, ascii_board, use_book, profile=False, batch_leaves=False):
+    """
+    Keep the search class, ascii template, book and batch leaf settings in the worker process, and
+    install a profiler if asked to.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The search class to run.
+    - ascii_board (str): The ascii board template, or None to skip rendering.
+    - use_book (bool): Whether opening classes may answer from their opening book.
+    - profile (bool): Whether to profile the searches.
+    - batch_leaves (bool): Whether the searches score their leaves in batches.
+
+    Returns:
+    - None
+    """
+    global _game_class, _ascii_board, _use_book, _batch_leaves, _game, _profiler
+    _game_class = game_class
+    _ascii_board = ascii_board
+    _use_book = use_book
+    _batch_leaves = batch_leaves
+    _game = None
+    _uninstall_profiler()
+    if profile:
+        _profiler = Profiler().install([game_class])
+
+
+def _uninstall_profiler():
+    """
+    Remove the profiler of this process, if there is one.
+
+    Returns:
+    - None
+    """
+    global _profiler
+    if _profiler is not None:
+        _profiler.uninstall()
+        _profiler = None
+
+
+def _analyse(job):
+    """
+    Search one position and describe the result.
+
+    One instance of the search class is kept per process. Its transposition table and move ordering
+    tables are cleared before each position so the node counts do not depend on the order of the jobs.
+
+    Parameters:
+    - job (dict): A job returned by load_jobs.
+
+    Returns:
+    - dict: The id, input position, depth, best move, score, positions evaluated, search stats and time
+      in milliseconds, plus the rendered best move if requested and the profile of the search if
+      profiling, or the id and an error. When the side to move has no move the best move and score are
+      None, since JSON has no infinite score, and the result is marked 'no_move'.
+    """
+    global _game
+    if 'error' in job:
+        return {'id': job['id'], 'error': job['error']}
+    try:
+        if _game is None:
+            _game = _game_class()
+            _game.use_book = _use_book
+            _game.batch_leaves = _batch_leaves
+        table = getattr(_game, 'transposition_table', None)
+        if table is not None:
+            table.clear()
+            _game.move_orderer.clear()
+        start = perf_counter()
+        estimate, best_move = _game.play_game(job['board'], job['depth'])
+        elapsed_ms = (perf_counter() - start) * 1000
+    except Exception as e:
+        return {'id': job['id'], 'error': str(e)}
+
+    result = {
+        'id': job['id'],
+        'input': ''.join(job['board']),
+        'depth': job['depth'],
+        'best_move': ''.join(best_move) if best_move is not None else None,
+        'score': estimate if math.isfinite(estimate) else None,
+        'nodes': _game.stats.leaves,
+        'time_ms': round(elapsed_ms, 3),
+        'stats': _game.stats
+    }
+    if best_move is None:
+        result['result'] = 'no_move'
+    if _ascii_board is not None and best_move is not None:
+        result['ascii'] = render_board(best_move, _ascii_board)
+    if _profiler is not None:
+        result['profile'] = _profiler.snapshot()
+        _profiler.reset()
+    return result
+
+
+class BatchAnalysis:
+    """
+    This class runs one search class over many positions without the interactive prompt.
+
+    The positions are shared out to a process pool and one JSON line per position is written to the
+    output file as soon as it and every position before it are finished, so results stream out in
+    input order. Positions found in the analysis cache, if one is given, are answered from it and
+    only the rest are searched. The stats of every search are added up in the stats attribute, and
+    their profiles in the profiler attribute when profiling.
+    """
+    def __init__(self, game_class, workers=None, ascii_board=None, use_book=True, cache=None, profile=False,
+                 batch_leaves=False):
+        """
+        Initializes the batch runner.
+
+        Parameters:
+        - game_class (Callable[..., Any]): The search class to run, such as ABGame.
+        - workers (int): The number of worker processes; defaults to the number of CPU cores. With one
+          worker the positions are searched in this process.
+        - ascii_board (str): The ascii board template to render each best move with, or None to skip it.
+        - use_book (bool): Whether opening classes may answer from their opening book instead of searching.
+        - cache (AnalysisCache): The cache to answer positions from and store new results in, or None.
+        - profile (bool): Whether to profile the searches, in every worker process.
+        - batch_leaves (bool): Whether the searches score their leaves in batches, which needs NumPy 2.
+        """
+        self.game_class = game_class
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.ascii_board = ascii_board
+        self.use_book = use_book
+        self.cache = cache
+        # Movement-phase classes answer from the tablebase whenever its file exists, which changes their results
+        self.use_tablebase = game_class.probes_tablebase and default_tablebase() is not None
+        self.stats = SearchStats()
+        self.profile = profile
+        self.profiler = None
+        self.batch_leaves = batch_leaves
+
+    def _cached_result(self, job):
+        """
+        Describe a job answered from the analysis cache.
+
+        Parameters:
+        - job (dict): A job returned by load_jobs.
+
+        Returns:
+        - dict: The result in the form _analyse gives, marked as cached, or None if the cache has no answer.
+        """
+        if self.cache is None or 'error' in job:
+            return None
+        cached = self.cache.get(job['board'], self.game_class.__name__, job['depth'], self.use_book,
+                                use_tablebase=self.use_tablebase)
+        if cached is None:
+            return None
+        estimate, best_move, found_depth = cached
+        result = {
+            'id': job['id'],
+            'input': ''.join(job['board']),
+            'depth': job['depth'],
+            'best_move': ''.join(best_move),
+            'score': estimate,
+            'nodes': 0,
+            'time_ms': 0.0,
+            'cached': True,
+            'cached_depth': found_depth
+        }
+        if self.ascii_board is not None:
+            result['ascii'] = render_board(best_move, self.ascii_board)
+        return result
+
+    def run(self, jobs, output_file):
+        """
+        Analyse every job and stream the results to a file.
+
+        Parameters:
+        - jobs (list): The jobs returned by load_jobs.
+        - output_file (str): The path of the JSONL file to write.
+
+        Returns:
+        - tuple: The number of positions analysed and the number that failed.
+        """
+        analysed = failed = 0
+        self.stats = SearchStats()
+        self.stats.start()
+        self.profiler = Profiler() if self.profile else None
+        cached = [self._cached_result(job) for job in jobs]
+        searched_jobs = [job for job, result in zip(jobs, cached) if result is None]
+        with open(output_file, 'w') as out:
+            if self.workers > 1 and searched_jobs:
+                executor = ProcessPoolExecutor(
+                    self.workers, initializer=_init_worker,
+                    initargs=(self.game_class, self.ascii_board, self.use_book, self.profile, self.batch_leaves)
+                )
+                searched = executor.map(
+                    _analyse, searched_jobs, chunksize=max(1, len(searched_jobs) // (self.workers * 8))
+                )
+            else:
+                executor = None
+                _init_worker(self.game_class, self.ascii_board, self.use_book, self.profile, self.batch_leaves)
+                searched = map(_analyse, searched_jobs)
+            try:
+                for result in cached:
+                    if result is None:
+                        result = next(searched)
+                        if 'stats' in result:
+                            self.stats.merge(result['stats'])
+                            result['stats'] = result['stats'].as_dict()
+                        if 'profile' in result:
+                            self.profiler.merge(result.pop('profile'))
+                        if self.cache is not None and result.get('best_move') is not None:
+                            self.cache.put(parse_board(result['input']), self.game_class.__name__, result['depth'],
+                                           result['score'], result['best_move'], self.use_book, self.use_tablebase)
+                    out.write(json.dumps(result, allow_nan=False) + '\n')
+                    out.flush()
+                    analysed += 1
+                    if 'error' in result:
+                        failed += 1
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+                else:
+                    _uninstall_profiler()
+        self.stats.stop()
+        return analysed, failed
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from time import perf_counter
+
+from utils.util import SearchTimeout
+from utils.search_stats import SearchStats
+
+
+class IterativeDeepening:
+    """
+    This class drives one of the search classes with a wall-clock budget instead of a fixed depth.
+    It searches depth 1, 2, 3, ... until the budget runs out and returns the best move of the deepest
+    iteration that finished. The transposition table is kept between iterations, so its hash moves lead
+    each iteration down the principal variation of the previous one first.
+    """
+    def __init__(self, game_class, max_depth=32):
+        """
+        Initializes the driver around a fresh instance of the search class.
+
+        Parameters:
+        - game_class (Callable[..., Any]): A search class such as ABGame or ABOpeningImproved.
+        - max_depth (int): The deepest iteration to attempt.
+        """
+        self.game = game_class()
+        self.max_depth = max_depth
+        self.transposition_table = self.game.transposition_table
+        self.completed_depth = 0
+        self.principal_variation = []
+        # The counters of every iteration of the latest search added up, including the unfinished one
+        self.stats = SearchStats()
+
+    def play_game(self, board, time_budget_ms):
+        """
+        Search the board with increasing depth until the time budget is spent.
+
+        Depth 1 is always searched to completion so a move is returned even with a tiny budget.
+
+        Parameters:
+        - board (Board | list): The current board configuration.
+        - time_budget_ms (float): The wall-clock budget in milliseconds.
+
+        Returns:
+        - tuple: A tuple containing the static evaluation and the best move Board of the
+          deepest completed iteration.
+        """
+        deadline = perf_counter() + time_budget_ms / 1000
+        position = self.game.root_position(board)
+        table = self.game.transposition_table
+        self.stats = SearchStats()
+        self.stats.start()
+
+        self.game.deadline = None
+        estimate, best_move = self.game.play_game(board, 1)
+        self.stats.merge(self.game.stats)
+        self.completed_depth = 1
+        self.principal_variation = table.principal_variation(position, 1)
+
+        for depth in range(2, self.max_depth + 1):
+            if best_move is None or perf_counter() >= deadline:
+                break
+            self.game.deadline = deadline
+            try:
+                estimate, best_move = self.game.play_game(board, depth)
+            except SearchTimeout:
+                break
+            finally:
+                self.game.deadline = None
+                self.stats.merge(self.game.stats)
+            self.completed_depth = depth
+            self.principal_variation = table.principal_variation(position, depth)
+
+        self.stats.stop()
+        return estimate, best_move
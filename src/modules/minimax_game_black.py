@@ -1,71 +1,57 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    static_estimation_opening, generate_moves_midgame_endgame,
-    static_estimation_midgame_endgame, invert_board
-)
+from modules.search_engine import SearchEngine, evaluate_midgame_endgame
+from utils.batch_evaluation import boards_to_array, evaluate_midgame_endgame_batch
+from utils.position import iter_moves_midgame_endgame
 
 
-class MiniMaxGameBlack:
+class MiniMaxGameBlack(SearchEngine):
     """
-    This class handles the logic for the midgame and endgame phases of the Nine Men's Morris game for the
-    black pieces using the Minimax algorithm.
-    It provides methods to generate moves and evaluate the best move for these phases from the perspective
-    of the black player.
+    This class handles the logic for the midgame and endgame phases of the Nine Men's Morris game for the black
+    pieces using the Minimax algorithm.
+    It is a configuration of SearchEngine with black to move at the root. The sides alternate, and leaves are
+    scored by the negated mid-game/endgame estimation of the side to move.
     """
+    side = 'B'
+    captures_both_sides = False
+    # play_game answers the positions covered by the endgame tablebase without searching
+    probes_tablebase = True
 
-    def __init__(self):
-        pass
-
-    def minimax_game_black(self, board, depth, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute the Minimax algorithm for the midgame or endgame phase of the game for the black player.
+        Lazily generate the moves available at a node: the side to move sliding, or hopping with three pieces.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (Position): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        board = invert_board(board)
-        if depth == 0:
-            if board.count('W') > 3:
-                return -static_estimation_midgame_endgame(board), board
-            return -static_estimation_opening(board), board
+        return iter_moves_midgame_endgame(position)
 
-        possible_moves = generate_moves_midgame_endgame(board)
+    def evaluate(self, position):
+        """
+        Score a leaf for the side to move at the root.
 
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.minimax_game_black(move, depth - 1, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-            return max_eval, invert_board(best_move)
+        Parameters:
+        - position (Position): The leaf position.
 
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.minimax_game_black(move, depth - 1, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-        return min_eval, invert_board(best_move)
+        Returns:
+        - int: The static estimation of the leaf.
+        """
+        return -evaluate_midgame_endgame(position.side_masks())
 
-    def play_game(self, board, depth):
+    def evaluate_batch(self, boards, colour):
         """
-        Initiates the play of the midgame or endgame phase with the Minimax algorithm from the current board state
-        for the black player.
+        Score many leaves for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - boards (list): The white and black masks of the leaves, flattened into one list.
+        - colour (str): The colour to move at every leaf, 'W' or 'B'.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - numpy.ndarray: The static estimations of the leaves.
         """
-        return self.minimax_game_black(board, depth, True)
+        boards = boards_to_array(boards)
+        # The estimation scores the side to move first
+        return -evaluate_midgame_endgame_batch(boards if colour == 'W' else boards[:, ::-1])
@@ -1,69 +1,43 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    static_estimation_opening_improved, generate_moves_midgame_endgame,
-    static_estimation_midgame_endgame_improved, reset_positions_evaluated,
-    get_positions_evaluated
-)
+from modules.search_engine import SearchEngine, evaluate_midgame_endgame_improved
+from utils.evaluation import EvaluatedPosition
+from utils.position import iter_moves_midgame_endgame
 
 
-class MiniMaxGameImproved:
+class MiniMaxGameImproved(SearchEngine):
     """
-    This class handles the logic for the opening phase of the Nine Men's Morris game using an improved version of
-    the Minimax algorithm.
-    It provides methods to generate moves and evaluate the best move for the opening phase with an enhanced
-    static evaluation.
+    This class handles the logic for the midgame and endgame phases of the Nine Men's Morris game using an improved
+    version of the Minimax algorithm.
+    It is a configuration of SearchEngine in which white and black take turns sliding their pieces, or hopping once
+    down to three, with leaves scored by the enhanced mid-game/endgame static estimation.
     """
-    def __init__(self):
-        pass
+    # The position type searched, built from the board by root_position
+    position_class = EvaluatedPosition
+    # play_game answers the positions covered by the endgame tablebase without searching
+    probes_tablebase = True
 
-    def minimax_game_improved(self, board, depth, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute an improved Minimax algorithm for the midgame or endgame phase of the game.
+        Lazily generate the moves available at a node: the side to move sliding, or hopping with
+        three pieces.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (EvaluatedPosition): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        if depth == 0:
-            if board.count('W') > 3:
-                return static_estimation_midgame_endgame_improved(board), board
-            return static_estimation_opening_improved(board), board
+        return iter_moves_midgame_endgame(position)
 
-        possible_moves = generate_moves_midgame_endgame(board)
-
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.minimax_game_improved(move, depth - 1, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-            return max_eval, best_move
-
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.minimax_game_improved(move, depth - 1, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-        return min_eval, best_move
-
-    def play_game(self, board, depth):
+    def evaluate(self, position):
         """
-        Initiates the play of the midgame or endgame phase with an improved Minimax algorithm from the current board state.
+        Score a leaf for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - position (EvaluatedPosition): The leaf position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - int: The static estimation of the leaf.
         """
-        return self.minimax_game_improved(board, depth, True)
+        return evaluate_midgame_endgame_improved(position)
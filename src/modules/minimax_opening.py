@@ -1,61 +1,53 @@
 #!/usr/bin/env python3
 
-from utils.util import generate_add, static_estimation_opening
+from modules.search_engine import SearchEngine, evaluate_opening
+from utils.batch_evaluation import boards_to_array, static_estimation_opening_batch
+from utils.position import iter_add
+from utils.symmetry import MILL_SYMMETRIES
 
 
-class MiniMaxOpening:
+class MiniMaxOpening(SearchEngine):
     """
     This class handles the logic for the opening phase of the Nine Men's Morris game using the Minimax algorithm.
-    It provides methods to generate moves and evaluate the best move for the opening phase.
+    It is a configuration of SearchEngine in which white and black take turns adding pieces, with leaves scored by
+    the opening static estimation.
     """
-    def __init__(self):
-        pass
+    # The symmetries the search cannot tell apart, under which positions share opening book records
+    book_symmetries = MILL_SYMMETRIES
 
-    def minimax_opening(self, board, depth, is_maximizing):
+    def generate_moves(self, position):
         """
-        Minimax algorithm for the opening phase.
+        Lazily generate the moves available at a node: the side to move adding a piece.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (Position): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        if depth == 0:
-            return static_estimation_opening(board), board
-
-        possible_moves = generate_add(board)
-
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.minimax_opening(move, depth - 1, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-            return max_eval, best_move
-
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.minimax_opening(move, depth - 1, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-        return min_eval, best_move
-
-    def play_game(self, board, depth):
+        return iter_add(position)
+
+    def evaluate(self, position):
+        """
+        Score a leaf for the side to move at the root.
+
+        Parameters:
+        - position (Position): The leaf position.
+
+        Returns:
+        - int: The static estimation of the leaf.
+        """
+        return evaluate_opening(position.masks())
+
+    def evaluate_batch(self, boards, colour):
         """
-        Initiates the play of the opening phase with the Minimax algorithm from the current board state.
+        Score many leaves for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - boards (list): The white and black masks of the leaves, flattened into one list.
+        - colour (str): The colour to move at every leaf, 'W' or 'B'.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - numpy.ndarray: The static estimations of the leaves.
         """
-        return self.minimax_opening(board, depth, True)
+        return static_estimation_opening_batch(boards_to_array(boards))
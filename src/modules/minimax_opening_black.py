@@ -1,68 +1,58 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    generate_add, static_estimation_opening,
-    invert_board
-)
+from modules.search_engine import SearchEngine, evaluate_opening
+from utils.batch_evaluation import boards_to_array, static_estimation_opening_batch
+from utils.position import iter_add
+from utils.symmetry import MILL_SYMMETRIES
 
 
-class MiniMaxOpeningBlack:
+class MiniMaxOpeningBlack(SearchEngine):
     """
-    This class handles the logic for the opening phase of the Nine Men's Morris game for the black pieces
-    using the Minimax algorithm.
-    It provides methods to generate moves and evaluate the best move for the opening phase from the perspective
-    of the black player.
+    This class handles the logic for the opening phase of the Nine Men's Morris game for the black pieces using the
+    Minimax algorithm.
+    It is a configuration of SearchEngine with black to move at the root. The sides alternate, and leaves are
+    scored by the negated opening estimation of the side to move.
     """
-    def __init__(self):
-        pass
+    side = 'B'
+    captures_both_sides = False
+    # The symmetries the search cannot tell apart, under which positions share opening book records
+    book_symmetries = MILL_SYMMETRIES
 
-    def minimax_opening_black(self, board, depth, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute the Minimax algorithm for the opening phase of the game for the black player.
+        Lazily generate the moves available at a node: the side to move adding a piece.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (Position): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        board = invert_board(board)
-        if depth == 0:
-            return -static_estimation_opening(board), board
+        return iter_add(position)
 
-        possible_moves = generate_add(board)
+    def evaluate(self, position):
+        """
+        Score a leaf for the side to move at the root.
 
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.minimax_opening_black(move, depth - 1, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-            return max_eval, invert_board(best_move)
+        Parameters:
+        - position (Position): The leaf position.
 
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.minimax_opening_black(move, depth - 1, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-        return min_eval, invert_board(best_move)
+        Returns:
+        - int: The static estimation of the leaf.
+        """
+        return -evaluate_opening(position.side_masks())
 
-    def play_game(self, board, depth):
+    def evaluate_batch(self, boards, colour):
         """
-        Initiates the play of the opening phase with the Minimax algorithm from the current board state for
-        the black player.
+        Score many leaves for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - boards (list): The white and black masks of the leaves, flattened into one list.
+        - colour (str): The colour to move at every leaf, 'W' or 'B'.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - numpy.ndarray: The static estimations of the leaves.
         """
-        return self.minimax_opening_black(board, depth, True)
+        boards = boards_to_array(boards)
+        # The estimation scores the side to move first
+        return -static_estimation_opening_batch(boards if colour == 'W' else boards[:, ::-1])
@@ -1,65 +1,43 @@
 #!/usr/bin/env python3
 
-from utils.util import (
-    generate_add, static_estimation_opening_improved
-)
+from modules.search_engine import SearchEngine, evaluate_opening_improved
+from utils.evaluation import EvaluatedPosition
+from utils.position import iter_add
+from utils.symmetry import BOARD_SYMMETRIES
 
 
-class MiniMaxOpeningImproved:
+class MiniMaxOpeningImproved(SearchEngine):
     """
-    This class handles the logic for the midgame and endgame phases of the Nine Men's Morris game using an improved
-    version of the Minimax algorithm.
-    It provides methods to generate moves and evaluate the best move for these phases with an enhanced
-    static evaluation.
+    This class handles the logic for the opening phase of the Nine Men's Morris game using an improved version of
+    the Minimax algorithm.
+    It is a configuration of SearchEngine in which white and black take turns adding pieces, with leaves scored by
+    the enhanced opening static estimation.
     """
-    def __init__(self):
-        pass
+    # The position type searched, built from the board by root_position
+    position_class = EvaluatedPosition
+    # The symmetries the search cannot tell apart, under which positions share opening book records
+    book_symmetries = BOARD_SYMMETRIES
 
-    def minimax_opening_improved(self, board, depth, is_maximizing):
+    def generate_moves(self, position):
         """
-        Execute an improved Minimax algorithm for the opening phase of the game.
+        Lazily generate the moves available at a node: the side to move adding a piece.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
-        - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+        - position (EvaluatedPosition): The current position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - Iterator: The (from, to, removed) moves in generation order.
         """
-        if depth == 0:
-            return static_estimation_opening_improved(board), board
+        return iter_add(position)
 
-        possible_moves = generate_add(board)
-
-        if is_maximizing:
-            max_eval = float('-inf')
-            best_move = None
-            for move in possible_moves:
-                eval_value, _ = self.minimax_opening_improved(move, depth - 1, False)
-                if eval_value > max_eval:
-                    max_eval = eval_value
-                    best_move = move
-            return max_eval, best_move
-
-        min_eval = float('inf')
-        best_move = None
-        for move in possible_moves:
-            eval_value, _ = self.minimax_opening_improved(move, depth - 1, True)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-        return min_eval, best_move
-
-    def play_game(self, board, depth):
+    def evaluate(self, position):
         """
-        Initiates the play of the opening phase with an improved Minimax algorithm from the current board state.
+        Score a leaf for the side to move at the root.
 
         Parameters:
-        - board (list): The current board configuration.
-        - depth (int): The maximum depth of the game tree to explore.
+        - position (EvaluatedPosition): The leaf position.
 
         Returns:
-        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        - int: The static estimation of the leaf.
         """
-        return self.minimax_opening_improved(board, depth, True)
+        return evaluate_opening_improved(position)
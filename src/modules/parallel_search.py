@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import RawValue, Value
+
+from utils.search_stats import SearchStats
+from utils.transposition import SharedTranspositionTable
+from utils.util import SearchTimeout
+
+# Modes accepted by ParallelSearch
+MODES = ('split', 'lazy-smp')
+
+# State of a worker process, set once by _init_worker when the pool starts it
+_shared_alpha = None
+_stop_flag = None
+_games = {}
+
+
+def _init_worker(shared_alpha, stop_flag):
+    """
+    Keep the shared alpha bound and stop flag in the worker process.
+
+    Parameters:
+    - shared_alpha (Value): The best root score found so far by any process, or None.
+    - stop_flag (RawValue): The flag telling helper searches to stop, or None.
+
+    Returns:
+    - None
+    """
+    global _shared_alpha, _stop_flag
+    _shared_alpha = shared_alpha
+    _stop_flag = stop_flag
+
+
+def _search_child(game_class, board, move, depth, batch_leaves):
+    """
+    Search one root move in a worker process with the current shared alpha bound.
+
+    The worker keeps one instance of the search class, so its transposition table and move ordering
+    tables carry over between the root moves it is given.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The search class.
+    - board (list): The root board configuration.
+    - move (tuple): The (from, to, removed) root move to search.
+    - depth (int): The search depth of the root.
+    - batch_leaves (bool): Whether the leaves are scored in batches, as in the process sharing them out.
+
+    Returns:
+    - tuple: The value of the move, the alpha bound it was searched with and the stats of the search.
+    """
+    game = _games.get(game_class)
+    if game is None:
+        game = _games[game_class] = game_class()
+    game.batch_leaves = batch_leaves
+    game.stats = SearchStats(depth)
+    position = game.root_position(board)
+    alpha = _shared_alpha.value
+    position.make_move(move)
+    value, _ = game.search(position, depth - 1, alpha, float('inf'), False)
+    if value > alpha:
+        with _shared_alpha.get_lock():
+            if value > _shared_alpha.value:
+                _shared_alpha.value = value
+    return value, alpha, game.stats
+
+
+def _search_root(game, position, moves, depth):
+    """
+    Search the root moves in the given order.
+
+    Parameters:
+    - game (Any): An instance of a search class.
+    - position (Position): The root position; it is left unchanged.
+    - moves (list): The (from, to, removed) root moves.
+    - depth (int): The search depth of the root.
+
+    Returns:
+    - tuple: The best score and the first move reaching it.
+    """
+    if game.collect_stats:
+        game.stats.depth_nodes[depth] += 1
+    alpha = best_value = float('-inf')
+    best_move = None
+    for move in moves:
+        position.make_move(move)
+        value, _ = game.search(position, depth - 1, alpha, float('inf'), False)
+        position.unmake_move(move)
+        if value > best_value:
+            best_value, best_move = value, move
+        alpha = max(alpha, value)
+    return best_value, best_move
+
+
+def _lazy_smp_search(game_class, board, moves, depth, table_name, tt_memory_mb, batch_leaves):
+    """
+    Search the whole tree in a worker process with the shared transposition table.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The search class.
+    - board (list): The root board configuration.
+    - moves (list): The (from, to, removed) root moves, in the order this worker searches them.
+    - depth (int): The search depth.
+    - table_name (str): The name of the shared transposition table.
+    - tt_memory_mb (float): The memory cap the shared table was created with.
+    - batch_leaves (bool): Whether the leaves are scored in batches, as in the process starting the workers.
+
+    Returns:
+    - tuple: The best score and move, both None if the search was stopped, and the stats of the search.
+    """
+    game = game_class()
+    game.batch_leaves = batch_leaves
+    game.stats = SearchStats(depth)
+    table = SharedTranspositionTable(tt_memory_mb, table_name)
+    game.transposition_table = table
+    game.stop_flag = _stop_flag
+    try:
+        value, move = _search_root(game, game.root_position(board), moves, depth)
+    except SearchTimeout:
+        value, move = None, None
+    finally:
+        table.close()
+    return value, move, game.stats
+
+
+class ParallelSearch:
+    """
+    This class runs one of the search classes on several CPU cores.
+
+    In 'split' mode the first root move is searched in this process to get an alpha bound, and the
+    other root moves are shared out to a process pool. Each worker starts from the best root score
+    found so far and raises it for the moves that follow. In 'lazy-smp' mode every worker searches the
+    whole tree, each starting from a different root move, and they all share one transposition table
+    in shared memory. The first worker to finish gives the result.
+
+    Both modes return the same score as the single-process search. When several moves share the best
+    score, the move chosen may differ.
+    """
+    def __init__(self, game_class, workers=None, mode='split', tt_memory_mb=16):
+        """
+        Initializes the driver around a fresh instance of the search class.
+
+        Parameters:
+        - game_class (Callable[..., Any]): A search class such as ABGameImproved.
+        - workers (int): The number of worker processes; defaults to the number of CPU cores.
+        - mode (str): 'split' or 'lazy-smp'.
+        - tt_memory_mb (float): The memory cap for each transposition table in megabytes.
+
+        Raises:
+        - ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown parallel search mode '{mode}'; expected one of {', '.join(MODES)}")
+        self.game_class = game_class
+        self.game = game_class(tt_memory_mb)
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.mode = mode
+        self.tt_memory_mb = tt_memory_mb
+        # The counters of the latest search, with those of every worker added in
+        self.stats = SearchStats()
+
+    def play_game(self, board, depth):
+        """
+        Search the board to the given depth on several processes.
+
+        Shallow searches, positions with fewer than two moves, positions covered by the endgame tablebase
+        or the opening book, and a single worker fall back to the single-process search.
+
+        Parameters:
+        - board (Board | list): The current board configuration.
+        - depth (int): The maximum depth of the game tree to explore.
+
+        Returns:
+        - tuple: A tuple containing the static evaluation and the best move Board.
+        """
+        game = self.game
+        position = game.root_position(board)
+        moves = list(game.move_orderer.order(game.generate_moves(position), depth, True))
+        if depth < 2 or len(moves) < 2 or self.workers < 2:
+            return self._play_single(board, depth)
+        if game.probe(board, depth) is not None:
+            return self._play_single(board, depth)
+
+        self.stats = SearchStats(depth)
+        self.stats.start()
+        if self.mode == 'split':
+            estimate, best_move = self._split(board, position, moves, depth)
+        else:
+            estimate, best_move = self._lazy_smp(board, moves, depth)
+        self.stats.stop()
+        position.make_move(best_move)
+        return estimate, position.to_board()
+
+    def _play_single(self, board, depth):
+        """
+        Search the board in this process only.
+
+        Parameters:
+        - board (list): The current board configuration.
+        - depth (int): The maximum depth of the game tree to explore.
+
+        Returns:
+        - tuple: A tuple containing the static evaluation and the best move board configuration.
+        """
+        result = self.game.play_game(board, depth)
+        self.stats = self.game.stats
+        return result
+
+    def _split(self, board, position, moves, depth):
+        """
+        Share the root moves out to a process pool.
+
+        Parameters:
+        - board (list): The root board configuration.
+        - position (Position): The root position; it is left unchanged.
+        - moves (list): The ordered (from, to, removed) root moves.
+        - depth (int): The search depth.
+
+        Returns:
+        - tuple: The best score and the earliest move reaching it.
+        """
+        # The search in this process counts straight into the stats of the whole search
+        self.game.stats = self.stats
+        if self.game.collect_stats:
+            self.stats.depth_nodes[depth] += 1
+        position.make_move(moves[0])
+        best_value, _ = self.game.search(position, depth - 1, float('-inf'), float('inf'), False)
+        position.unmake_move(moves[0])
+        best_move = moves[0]
+
+        shared_alpha = Value('d', best_value)
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(shared_alpha, None)) as executor:
+            futures = [
+                executor.submit(_search_child, self.game_class, board, move, depth, self.game.batch_leaves)
+                for move in moves[1:]
+            ]
+            for move, future in zip(moves[1:], futures):
+                value, alpha, stats = future.result()
+                self.stats.merge(stats)
+                # A value at or below the alpha it was searched with is only an upper bound
+                if alpha < value and value > best_value:
+                    best_value, best_move = value, move
+        return best_value, best_move
+
+    def _lazy_smp(self, board, moves, depth):
+        """
+        Search the whole tree on every worker with a shared transposition table.
+
+        Parameters:
+        - board (list): The root board configuration.
+        - moves (list): The ordered (from, to, removed) root moves.
+        - depth (int): The search depth.
+
+        Returns:
+        - tuple: The best score and move of the first worker to finish.
+        """
+        table = SharedTranspositionTable(self.tt_memory_mb)
+        stop_flag = RawValue('b', 0)
+        try:
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(None, stop_flag)) as executor:
+                futures = []
+                for index in range(self.workers):
+                    start = index % len(moves)
+                    futures.append(executor.submit(
+                        _lazy_smp_search, self.game_class, board, moves[start:] + moves[:start], depth, table.name,
+                        self.tt_memory_mb, self.game.batch_leaves
+                    ))
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                stop_flag.value = 1
+                result = None
+                for future in futures:
+                    value, move, stats = future.result()
+                    self.stats.merge(stats)
+                    if result is None and future in done:
+                        result = value, move
+        finally:
+            table.close()
+            table.unlink()
+        return result
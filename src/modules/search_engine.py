@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+
+from time import perf_counter
+
+from utils.bitboard import static_estimation_opening, static_estimation_midgame_endgame
+from utils.board import Board
+from utils.position import Position
+from utils.util import SearchTimeout
+from utils.batch_evaluation import HAVE_NUMPY
+from utils.search_stats import SearchStats
+from utils.move_ordering import MoveOrderer
+from utils.transposition import TranspositionTable, EXACT, LOWER, pack_move, unpack_move, bound_flag
+from utils.tablebase import probe_tablebase
+from utils.opening_book import probe_opening_book
+
+
+def evaluate_opening(masks):
+    """
+    Score a position with static_estimation_opening.
+
+    Parameters:
+    - masks (tuple): The (white, black) bitmask pair to score, or a (mover, opponent) pair to score the
+      position for the side to move.
+
+    Returns:
+    - int: The estimated value of the position for the pieces in the first mask.
+    """
+    return static_estimation_opening(masks)
+
+
+def evaluate_midgame_endgame(masks):
+    """
+    Score a position with static_estimation_midgame_endgame, or static_estimation_opening once the first
+    mask is down to three pieces.
+
+    Parameters:
+    - masks (tuple): The (white, black) bitmask pair to score, or a (mover, opponent) pair to score the
+      position for the side to move.
+
+    Returns:
+    - int: The estimated value of the position for the pieces in the first mask.
+    """
+    if masks[0].bit_count() > 3:
+        return static_estimation_midgame_endgame(masks)
+    return static_estimation_opening(masks)
+
+
+def evaluate_opening_improved(position):
+    """
+    Score a position with the improved opening estimation.
+
+    Parameters:
+    - position (EvaluatedPosition): The position to score.
+
+    Returns:
+    - int: The estimated value of the position for the pieces in the white mask.
+    """
+    return position.static_estimation_opening_improved()
+
+
+def evaluate_midgame_endgame_improved(position):
+    """
+    Score a position with the improved mid-game/endgame estimation, or the improved opening estimation
+    once the white mask is down to three pieces.
+
+    Parameters:
+    - position (EvaluatedPosition): The position to score.
+
+    Returns:
+    - int: The estimated value of the position for the pieces in the white mask.
+    """
+    if position.white.bit_count() > 3:
+        return position.static_estimation_midgame_endgame_improved()
+    return position.static_estimation_opening_improved()
+
+
+class SearchEngine:
+    """
+    The search behind every command: a negamax Principal Variation Search with a transposition table,
+    move ordering and aspiration windows at the root.
+
+    The first move at each node is searched with the full window and the others with a null window
+    around alpha, and only a move that beats alpha is searched again with the full window. When the
+    transposition table holds the exact value of the root one ply shallower, as it does between the
+    iterations of IterativeDeepening, the root is first searched with a window of aspiration_window
+    around that value, widened on the side that fails.
+
+    The commands are configurations of this class. They set the position class, the move generator, the
+    evaluator and the side to move at the root, and say whether play_game consults the endgame
+    tablebase or an opening book first. Scores are those of the plain minimax search of the same
+    configuration, except for configurations with quiescence on.
+
+    With quiescence on, a leaf is not scored where it stands but by a quiescence search that keeps
+    playing the moves closing a mill, for up to quiescence_plies plies, until the position is quiet. The
+    side to move may stand pat on the static score instead of capturing, and a node whose static score
+    is more than quiescence_delta below alpha is not searched further, since no single capture can make
+    up that much unless it wins the game. The quiescence search of one leaf spends at most
+    quiescence_budget nodes before standing pat everywhere, so a leaf is resolved the same way whatever
+    was searched before it, in this process or in a ParallelSearch worker.
+
+    With batch_leaves on, the leaves below a node one ply above them are not searched one by one but
+    scored together by evaluate_batch, which the configurations scored by the bitboard estimations
+    implement with NumPy. Every leaf not already exact in the transposition table is scored, even those
+    the plain search would have cut off, so it only pays where the batches are large.
+    """
+    # The position type searched, built from the board by root_position
+    position_class = Position
+    # The colour to move at the root, 'W' or 'B'
+    side = 'W'
+    # play_game answers the positions covered by the endgame tablebase without searching
+    probes_tablebase = False
+    # The symmetries the search cannot tell apart, under which positions share opening book records,
+    # and whether play_game consults the book; classes without a book leave book_symmetries at None
+    book_symmetries = None
+    use_book = True
+    # Whether captures are searched first at the nodes of both sides, or only at those of the side to
+    # move at the root, for configurations whose leaf scores do not reward the side that captures
+    captures_both_sides = True
+    # Half the width of the root aspiration window
+    aspiration_window = 50
+    # Whether leaves are resolved by a quiescence search, how deep and how many nodes per leaf it may
+    # go, and the most a capture can gain, for delta pruning; a capture is worth 1000 to the estimations
+    quiescence = False
+    quiescence_plies = 6
+    quiescence_budget = 2000
+    quiescence_delta = 1250
+    # Whether the leaves below each node are scored in one evaluate_batch call; has no effect with
+    # quiescence on, whose leaves are searched further
+    batch_leaves = False
+    # Whether the searches count nodes, leaves, cutoffs and the like; with it off the stats of a search
+    # only hold its time, and the nodes skip the counter updates
+    collect_stats = True
+
+    def __init__(self, tt_memory_mb=16, move_orderer=None):
+        """
+        Initializes the search with an empty transposition table and move ordering tables.
+
+        Parameters:
+        - tt_memory_mb (float): The memory cap for the transposition table in megabytes.
+        - move_orderer (MoveOrderer): The move ordering to use; defaults to all heuristics enabled.
+        """
+        self.transposition_table = TranspositionTable(tt_memory_mb)
+        self.move_orderer = move_orderer if move_orderer is not None else MoveOrderer()
+        # The counters of the latest search, replaced by play_game
+        self.stats = SearchStats()
+        # Set by IterativeDeepening to a perf_counter() deadline, and by ParallelSearch to a shared flag
+        # that stops helper searches
+        self.deadline = None
+        self.stop_flag = None
+        # The quiescence nodes the current leaf may still spend
+        self.quiescence_left = 0
+
+    @property
+    def stats(self):
+        """
+        Return the stats of the latest search.
+
+        Returns:
+        - SearchStats: The stats.
+        """
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats):
+        """
+        Replace the stats of the search, deciding once for the whole search whether the nodes update them.
+
+        Parameters:
+        - stats (SearchStats): The new stats.
+
+        Returns:
+        - None
+        """
+        self._stats = stats
+        # The stats the nodes update, or None when collect_stats is off
+        self._counters = stats if self.collect_stats else None
+
+    def generate_moves(self, position):
+        """
+        Lazily generate the moves of the side to move. Set by each configuration.
+
+        Parameters:
+        - position (Position): The current position.
+
+        Returns:
+        - Iterator: The (from, to, removed) moves in generation order.
+        """
+        raise NotImplementedError
+
+    def generate_captures(self, position):
+        """
+        Lazily generate the moves of the side to move that close a mill. Set by the configurations with
+        quiescence on.
+
+        Parameters:
+        - position (Position): The current position.
+
+        Returns:
+        - Iterator: The (from, to, removed) moves in generation order.
+        """
+        raise NotImplementedError
+
+    def evaluate(self, position):
+        """
+        Score a leaf for the side to move at the root. Set by each configuration.
+
+        Parameters:
+        - position (Position): The leaf position.
+
+        Returns:
+        - int: The static estimation of the leaf.
+        """
+        raise NotImplementedError
+
+    def evaluate_batch(self, boards, colour):
+        """
+        Score many leaves for the side to move at the root. Set by the configurations supporting
+        batch_leaves.
+
+        Parameters:
+        - boards (list): The white and black masks of the leaves, flattened into one list.
+        - colour (str): The colour to move at every leaf, 'W' or 'B'.
+
+        Returns:
+        - numpy.ndarray: The static estimations of the leaves.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def supports_batch_leaves(cls):
+        """
+        Check whether turning batch_leaves on changes how the configuration scores its leaves.
+
+        Returns:
+        - bool: True if NumPy 2 is installed, the configuration implements evaluate_batch and its leaves
+          are not resolved by a quiescence search.
+        """
+        return HAVE_NUMPY and cls.evaluate_batch is not SearchEngine.evaluate_batch and not cls.quiescence
+
+    def root_position(self, board):
+        """
+        Build the position to search from a board, with the configured side to move.
+
+        Parameters:
+        - board (list): The current board configuration.
+
+        Returns:
+        - Position: The root position.
+        """
+        return self.position_class.from_board(board, self.side)
+
+    def probe(self, board, depth):
+        """
+        Answer a board from the endgame tablebase or the opening book, if the configuration uses one.
+
+        Parameters:
+        - board (list): The current board configuration.
+        - depth (int): The depth the search would go to.
+
+        Returns:
+        - tuple: The score and the board after the best move, or None to search instead.
+        """
+        if self.probes_tablebase:
+            return probe_tablebase(board, self.side) if depth > 0 else None
+        if self.book_symmetries is not None:
+            return probe_opening_book(self, board, depth)
+        return None
+
+    def pvs(self, position, depth, alpha, beta, colour):
+        """
+        Execute the Principal Variation Search from a position.
+
+        Parameters:
+        - position (Position): The current position, changed in place and restored before returning.
+        - depth (int): The maximum depth of the game tree to explore.
+        - alpha (float): The alpha value for pruning.
+        - beta (float): The beta value for pruning.
+        - colour (int): 1 at the nodes of the side to move at the root, -1 at the others.
+
+        Returns:
+        - tuple: The value for the side to move at the node and the best (from, to, removed) move.
+        """
+        stats = self._counters
+        if stats is not None:
+            stats.depth_nodes[depth] += 1
+        table = self.transposition_table
+        key = position.key
+        entry = table.probe(key, depth)
+        if entry is not None:
+            if stats is not None:
+                stats.tt_hits += 1
+            flag, value, move = entry
+            if flag == EXACT:
+                return value, unpack_move(move)
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value, unpack_move(move)
+
+        if depth == 0:
+            if self.quiescence:
+                self.quiescence_left = self.quiescence_budget
+                value = self.quiesce(position, alpha, beta, colour, self.quiescence_plies)
+                table.store(key, 0, bound_flag(value, alpha, beta), value, -1)
+                return value, None
+            if stats is not None:
+                stats.leaves += 1
+            value = self.evaluate(position)
+            if colour < 0:
+                value = -value
+            table.store(key, 0, EXACT, value, -1)
+            return value, None
+
+        if self.deadline is not None and perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop_flag is not None and self.stop_flag.value:
+            raise SearchTimeout()
+
+        is_maximizing = colour > 0
+        moves = self.generate_moves(position)
+        possible_moves = self.move_orderer.order(
+            moves, depth, is_maximizing, table.hash_move(key), is_maximizing or self.captures_both_sides
+        )
+
+        alpha_orig, beta_orig = alpha, beta
+        if depth == 1 and self.batch_leaves and not self.quiescence:
+            best_value, best_move = self.search_frontier(position, possible_moves, alpha, beta, colour)
+        else:
+            best_value = float('-inf')
+            best_move = None
+            first = True
+            for move in possible_moves:
+                position.make_move(move)
+                if first:
+                    value = -self.pvs(position, depth - 1, -beta, -alpha, -colour)[0]
+                    first = False
+                else:
+                    # Scores are integers, so a window of one proves whether the move beats alpha
+                    value = -self.pvs(position, depth - 1, -alpha - 1, -alpha, -colour)[0]
+                    if alpha < value < beta:
+                        if stats is not None:
+                            stats.researches += 1
+                        value = -self.pvs(position, depth - 1, -beta, -alpha, -colour)[0]
+                position.unmake_move(move)
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.cutoffs += 1
+                    self.move_orderer.record_cutoff(move, depth, is_maximizing)
+                    break
+        table.store(key, depth, bound_flag(best_value, alpha_orig, beta_orig), best_value, pack_move(best_move))
+        return best_value, best_move
+
+    def search_frontier(self, position, moves, alpha, beta, colour):
+        """
+        Search the moves of a node one ply above the leaves, scoring the leaves in one batch.
+
+        The first move is searched by pvs, since it is the one most likely to cut the node off. Of the
+        leaves after the others, those whose exact value is in the transposition table take it from there,
+        as pvs would, and the rest are scored together by evaluate_batch and stored. The moves are then
+        gone through in order as pvs goes through them.
+
+        Parameters:
+        - position (Position): The current position, changed in place and restored before returning.
+        - moves (Iterable): The (from, to, removed) moves, ordered.
+        - alpha (float): The alpha value for pruning.
+        - beta (float): The beta value for pruning.
+        - colour (int): 1 at the nodes of the side to move at the root, -1 at the others.
+
+        Returns:
+        - tuple: The value for the side to move at the node and the best (from, to, removed) move.
+        """
+        stats = self._counters
+        table = self.transposition_table
+        moves = iter(moves)
+        best_move = next(moves, None)
+        if best_move is None:
+            return float('-inf'), None
+        position.make_move(best_move)
+        best_value = -self.pvs(position, 0, -beta, -alpha, -colour)[0]
+        position.unmake_move(best_move)
+        alpha = max(alpha, best_value)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoffs += 1
+            self.move_orderer.record_cutoff(best_move, 1, colour > 0)
+            return best_value, best_move
+
+        moves = list(moves)
+        values = [None] * len(moves)
+        pending, keys, boards = [], [], []
+        leaf_colour = None
+        for index, move in enumerate(moves):
+            position.make_move(move)
+            entry = table.probe(position.key, 0)
+            if entry is not None and entry[0] == EXACT:
+                if stats is not None:
+                    stats.tt_hits += 1
+                values[index] = -entry[1]
+            else:
+                pending.append(index)
+                keys.append(position.key)
+                boards.extend(position.masks())
+                leaf_colour = position.colour
+            position.unmake_move(move)
+        if stats is not None:
+            stats.depth_nodes[0] += len(moves)
+            stats.leaves += len(pending)
+
+        if pending:
+            scores = self.evaluate_batch(boards, leaf_colour).tolist()
+            for index, key, score in zip(pending, keys, scores):
+                # The value of the leaf for its side to move is -colour * score
+                table.store(key, 0, EXACT, -colour * score, -1)
+                values[index] = colour * score
+
+        for move, value in zip(moves, values):
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                self.move_orderer.record_cutoff(move, 1, colour > 0)
+                break
+        return best_value, best_move
+
+    def quiesce(self, position, alpha, beta, colour, plies):
+        """
+        Resolve the pending captures of a leaf.
+
+        Parameters:
+        - position (Position): The leaf position, changed in place and restored before returning.
+        - alpha (float): The alpha value for pruning.
+        - beta (float): The beta value for pruning.
+        - colour (int): 1 at the nodes of the side to move at the root, -1 at the others.
+        - plies (int): The number of capture plies still allowed.
+
+        Returns:
+        - float: The value for the side to move at the node.
+        """
+        stats = self._counters
+        if stats is not None:
+            stats.leaves += 1
+        stand_pat = self.evaluate(position)
+        if colour < 0:
+            stand_pat = -stand_pat
+        if stand_pat >= beta or plies == 0 or self.quiescence_left <= 0:
+            return stand_pat
+        # Delta pruning, unless a capture would leave the opponent two pieces and win outright
+        if stand_pat + self.quiescence_delta <= alpha and position.side_masks()[1].bit_count() > 3:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        best_value = stand_pat
+        for move in self.generate_captures(position):
+            if stats is not None:
+                stats.quiescence_nodes += 1
+            self.quiescence_left -= 1
+            position.make_move(move)
+            value = -self.quiesce(position, -beta, -alpha, -colour, plies - 1)
+            position.unmake_move(move)
+            if value > best_value:
+                best_value = value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        return best_value
+
+    def search(self, position, depth, alpha, beta, is_maximizing):
+        """
+        Search a position with a minimax window, as ParallelSearch does for the children of the root.
+
+        Parameters:
+        - position (Position): The current position, changed in place and restored before returning.
+        - depth (int): The maximum depth of the game tree to explore.
+        - alpha (float): The alpha value for pruning.
+        - beta (float): The beta value for pruning.
+        - is_maximizing (bool): True if the side to move at the root is to move; False otherwise.
+
+        Returns:
+        - tuple: The value for the side to move at the root and the best (from, to, removed) move.
+        """
+        if is_maximizing:
+            return self.pvs(position, depth, alpha, beta, 1)
+        value, move = self.pvs(position, depth, -beta, -alpha, -1)
+        return -value, move
+
+    def search_root(self, position, depth):
+        """
+        Search the root, with an aspiration window if the value one ply shallower is known.
+
+        Parameters:
+        - position (Position): The root position, changed in place and restored before returning.
+        - depth (int): The maximum depth of the game tree to explore.
+
+        Returns:
+        - tuple: The value of the root and the best (from, to, removed) move.
+        """
+        guess = self.transposition_table.exact_value(position.key, depth - 1) if depth > 1 else None
+        if guess is None or guess in (float('inf'), float('-inf')):
+            return self.pvs(position, depth, float('-inf'), float('inf'), 1)
+        alpha, beta = guess - self.aspiration_window, guess + self.aspiration_window
+        while True:
+            value, move = self.pvs(position, depth, alpha, beta, 1)
+            if value <= alpha and alpha != float('-inf'):
+                alpha = float('-inf')
+            elif value >= beta and beta != float('inf'):
+                beta = float('inf')
+            else:
+                return value, move
+            if self._counters is not None:
+                self._counters.researches += 1
+
+    def play_game(self, board, depth):
+        """
+        Search the current board state and play the best move.
+
+        A position covered by the endgame tablebase, or by the opening book unless use_book is False, is
+        answered from it without searching, if the configuration consults one.
+
+        Parameters:
+        - board (Board | list): The current board configuration.
+        - depth (int): The maximum depth of the game tree to explore.
+
+        Returns:
+        - tuple: A tuple containing the static evaluation and the best move Board, or None when there is
+          no move.
+        """
+        self.stats = SearchStats(depth)
+        answer = self.probe(board, depth)
+        if answer is not None:
+            return answer
+        position = self.root_position(board)
+        self.stats.start()
+        estimate, best_move = self.search_root(position, depth)
+        self.stats.stop()
+        if best_move is None:
+            return estimate, Board.coerce(board) if depth == 0 else None
+        position.make_move(best_move)
+        return estimate, position.to_board()
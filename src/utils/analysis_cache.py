@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+# Persistent cache of finished analyses, so a (board, command, book, tablebase, depth) key answered once
+# is not searched again by later runs. The book flag records whether the search could answer from the
+# opening book, so a search asked to skip the book is never answered by a result that came from it, and
+# the tablebase flag whether it could answer from the endgame tablebase, so results searched before the
+# tablebase was built are not mistaken for tablebase answers or the other way round. Results live in a
+# local SQLite file. Each row records when it was last used, and the least recently used rows
+# are evicted once the cache holds more than its maximum. The file records the version of the search
+# results it holds, and results of an older version are dropped when it is opened.
+
+import os
+import sqlite3
+from time import time
+
+from utils.board import Board
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'analysis_cache.sqlite'
+)
+
+# Bumped whenever the table changes or a change to the search classes changes their results
+VERSION = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    board TEXT NOT NULL,
+    command TEXT NOT NULL,
+    book INTEGER NOT NULL,
+    tablebase INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score REAL NOT NULL,
+    best_move TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (board, command, book, tablebase, depth)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class AnalysisCache:
+    """
+    A size-bounded, least recently used store of search results keyed by board, command, whether the
+    opening book and the endgame tablebase were used and depth.
+
+    A request is answered only by a result of the depth asked for, unless reuse_deeper is True for the
+    cache or the request; then the shallowest result searched at least that deep is used. Hit and miss
+    counts are kept for the session.
+    """
+    def __init__(self, path=DEFAULT_PATH, max_entries=100000, reuse_deeper=False):
+        """
+        Opens the cache file, creating it if needed.
+
+        Parameters:
+        - path (str): The path of the SQLite file.
+        - max_entries (int): The number of results kept before the least recently used are evicted.
+        - reuse_deeper (bool): Whether a deeper result may answer a shallower request.
+
+        Raises:
+        - sqlite3.Error: If the file cannot be opened as a cache.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.reuse_deeper = reuse_deeper
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != VERSION:
+            self.connection.executescript(f"DROP TABLE IF EXISTS results; PRAGMA user_version = {VERSION};")
+        self.connection.executescript(SCHEMA)
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self.hits = 0
+        self.deeper_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, board, command, depth, use_book=True, reuse_deeper=None, use_tablebase=False):
+        """
+        Look up the result of a search.
+
+        Parameters:
+        - board (list): The board searched.
+        - command (str): The name of the search class.
+        - depth (int): The depth asked for.
+        - use_book (bool): Whether the search may answer from the opening book.
+        - reuse_deeper (bool): Whether a deeper result may answer this request; defaults to the cache's setting.
+        - use_tablebase (bool): Whether the search may answer from the endgame tablebase.
+
+        Returns:
+        - tuple: The score, the best move Board and the depth it was searched to, or None on a
+          miss.
+        """
+        position, book, tablebase = ''.join(board), int(use_book), int(use_tablebase)
+        if reuse_deeper is None:
+            reuse_deeper = self.reuse_deeper
+        row = self.connection.execute(
+            "SELECT depth, score, best_move FROM results WHERE board = ? AND command = ? AND book = ? AND "
+            "tablebase = ? AND " + ("depth >= ? ORDER BY depth LIMIT 1" if reuse_deeper else "depth = ?"),
+            (position, command, book, tablebase, depth)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        found_depth, score, best_move = row
+        with self.connection:
+            self.connection.execute(
+                "UPDATE results SET last_used = ? WHERE board = ? AND command = ? AND book = ? AND tablebase = ? "
+                "AND depth = ?",
+                (time(), position, command, book, tablebase, found_depth)
+            )
+        self.hits += 1
+        if found_depth > depth:
+            self.deeper_hits += 1
+        return int(score) if score.is_integer() else score, Board.from_list(best_move), found_depth
+
+    def put(self, board, command, depth, score, best_move, use_book=True, use_tablebase=False):
+        """
+        Store the result of a search, evicting the least recently used results if the cache is full.
+
+        Parameters:
+        - board (list): The board searched.
+        - command (str): The name of the search class.
+        - depth (int): The depth searched to.
+        - score (float): The score of the search.
+        - best_move (list): The best move board configuration.
+        - use_book (bool): Whether the search could answer from the opening book.
+        - use_tablebase (bool): Whether the search could answer from the endgame tablebase.
+
+        Returns:
+        - None
+        """
+        key = (''.join(board), command, int(use_book), int(use_tablebase), depth)
+        with self.connection:
+            known = self.connection.execute(
+                "SELECT 1 FROM results WHERE board = ? AND command = ? AND book = ? AND tablebase = ? AND depth = ?",
+                key
+            ).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (score, ''.join(best_move), time())
+            )
+            if known is None:
+                self.entries += 1
+            excess = self.entries - self.max_entries
+            if excess > 0:
+                self.connection.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.entries -= excess
+                self.evictions += excess
+        self.stores += 1
+
+    def stats(self):
+        """
+        Return the cache metrics of this session.
+
+        Returns:
+        - dict: The hits (and how many of them came from deeper searches), misses, hit rate, stores,
+          evictions and current number of entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'deeper_hits': self.deeper_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': self.entries,
+        }
+
+    def close(self):
+        """
+        Close the cache file.
+
+        Returns:
+        - None
+        """
+        self.connection.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# The static estimations of bitboard.py for many positions at once. The positions are an N x 2 array
+# of (white, black) bitmasks and every count is a NumPy operation over the whole array, against
+# tables of the board's slides and mills built once at import. The results are exactly those of
+# static_estimation_opening and static_estimation_midgame_endgame, position by position.
+#
+# NumPy 2 is an optional dependency. Without it HAVE_NUMPY is False, the functions here raise
+# ImportError and the searches score their leaves one at a time as before.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from utils.bitboard import FULL_MASK
+from utils.topology import MILL_MASKS, POINT_MILL_MASKS, SLIDES
+
+HAVE_NUMPY = numpy is not None and hasattr(numpy, 'bitwise_count')
+
+if HAVE_NUMPY:
+    # Every slide along a line: its source and target bits, and the mask playing it
+    _SLIDE_LIST = [(point, target, mask) for point, slides in enumerate(SLIDES) for target, mask in slides]
+    _SLIDE_SOURCES = numpy.array([1 << point for point, _, _ in _SLIDE_LIST], dtype=numpy.uint32)
+    _SLIDE_TARGETS = numpy.array([1 << target for _, target, _ in _SLIDE_LIST], dtype=numpy.uint32)
+    _SLIDE_MASKS = numpy.array([mask for _, _, mask in _SLIDE_LIST], dtype=numpy.uint32)
+    # For each slide, the pieces besides the moving one that close each mill through its target, padded to
+    # two with a mask no board can fill
+    _NO_MILL = 1 << 31
+    _SLIDE_MILL_NEEDS = numpy.array(
+        [
+            (needs + [_NO_MILL, _NO_MILL])[:2]
+            for point, target, _ in _SLIDE_LIST
+            for needs in [[mill ^ 1 << target for mill in POINT_MILL_MASKS[target] if not mill >> point & 1]]
+        ],
+        dtype=numpy.uint32
+    ).T
+    _MILL_MASKS = numpy.array(MILL_MASKS, dtype=numpy.uint32)
+
+
+def boards_to_array(boards):
+    """
+    Pack bitmask pairs into the array taken by the batch estimations.
+
+    Parameters:
+    - boards (Iterable): The (white, black) bitmask pairs.
+
+    Returns:
+    - numpy.ndarray: An N x 2 array of uint32 masks.
+    """
+    if not HAVE_NUMPY:
+        raise ImportError("Batch evaluation needs NumPy 2 or later")
+    return numpy.array(boards, dtype=numpy.uint32).reshape(-1, 2)
+
+
+def count_black_moves_batch(boards):
+    """
+    Count the black moves scored by the static estimations, as count_black_moves does, for many
+    positions.
+
+    Parameters:
+    - boards (numpy.ndarray): An N x 2 array of (white, black) masks.
+
+    Returns:
+    - numpy.ndarray: The N move counts.
+    """
+    white, black = boards[:, 0], boards[:, 1]
+    empty = ~(white | black) & numpy.uint32(FULL_MASK)
+    # One row per position and one column per slide along a line
+    legal = ((black[:, None] & _SLIDE_SOURCES) != 0) & ((empty[:, None] & _SLIDE_TARGETS) != 0)
+    moves = legal.sum(axis=1, dtype=numpy.int64)
+
+    black_column = black[:, None]
+    needs, other_needs = _SLIDE_MILL_NEEDS
+    closing = legal & (((black_column & needs) == needs) | ((black_column & other_needs) == other_needs))
+    if closing.any():
+        # A slide closing a mill counts once per removable piece of the moved mask instead of once
+        rows, slides = numpy.nonzero(closing)
+        closed = black[rows] ^ _SLIDE_MASKS[slides]
+        full = (closed[:, None] & _MILL_MASKS) == _MILL_MASKS
+        covered = numpy.bitwise_or.reduce(numpy.where(full, _MILL_MASKS, numpy.uint32(0)), axis=1)
+        removable = numpy.bitwise_count(closed & ~covered)
+        removable = numpy.where(removable > 0, removable, numpy.bitwise_count(closed))
+        moves += numpy.bincount(rows, weights=removable - 1, minlength=len(boards)).astype(numpy.int64)
+    return moves
+
+
+def static_estimation_opening_batch(boards):
+    """
+    Estimate the value of many positions during the opening phase.
+
+    Parameters:
+    - boards (numpy.ndarray): An N x 2 array of (white, black) masks.
+
+    Returns:
+    - numpy.ndarray: The N estimated values, as int64.
+    """
+    counts = numpy.bitwise_count(boards).astype(numpy.int64)
+    return counts[:, 0] - counts[:, 1]
+
+
+def static_estimation_midgame_endgame_batch(boards):
+    """
+    Estimate the value of many positions during mid-game/endgame for white.
+
+    Parameters:
+    - boards (numpy.ndarray): An N x 2 array of (white, black) masks.
+
+    Returns:
+    - numpy.ndarray: The N estimated values, as int64.
+    """
+    counts = numpy.bitwise_count(boards).astype(numpy.int64)
+    num_white_pieces, num_black_pieces = counts[:, 0], counts[:, 1]
+    num_black_moves = count_black_moves_batch(boards).astype(numpy.int64)
+    values = 1000 * (num_white_pieces - num_black_pieces) - num_black_moves
+    values = numpy.where(num_black_moves == 0, 10000, values)
+    values = numpy.where(num_white_pieces <= 2, -10000, values)
+    return numpy.where(num_black_pieces <= 2, 10000, values)
+
+
+def evaluate_midgame_endgame_batch(boards):
+    """
+    Score many positions as evaluate_midgame_endgame does: with the mid-game/endgame estimation, or the
+    opening estimation where the first mask is down to three pieces.
+
+    Parameters:
+    - boards (numpy.ndarray): An N x 2 array of (white, black) masks, or of (mover, opponent) masks.
+
+    Returns:
+    - numpy.ndarray: The N estimated values for the pieces in the first mask, as int64.
+    """
+    values = static_estimation_midgame_endgame_batch(boards)
+    return numpy.where(numpy.bitwise_count(boards[:, 0]) > 3, values, static_estimation_opening_batch(boards))
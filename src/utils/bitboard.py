@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+
+# A bitboard position is a (white, black) pair of 23-bit integers. Bit i is set in
+# the white mask when point i holds a white piece and likewise for black, so the
+# empty points are the bits set in neither mask.
+
+from utils.topology import NUM_POINTS, NEIGHBOR_MASKS, MILL_MASKS, POINT_MILL_MASKS, mill_pieces
+
+FULL_MASK = (1 << NUM_POINTS) - 1
+
+
+def board_to_masks(board):
+    """
+    Convert a list board into a bitboard position.
+
+    Parameters:
+    - board (Board | list): The board configuration, as a Board or a list of 'W', 'B' and 'x' characters.
+
+    Returns:
+    - tuple: The (white, black) bitmask pair.
+    """
+    # A Board already holds its masks; utils.board imports this module, so it is recognised by its method
+    masks = getattr(board, 'masks', None)
+    if masks is not None:
+        return masks()
+    white = 0
+    black = 0
+    for location, piece in enumerate(board):
+        if piece == 'W':
+            white |= 1 << location
+        elif piece == 'B':
+            black |= 1 << location
+    return white, black
+
+
+def masks_to_board(board):
+    """
+    Convert a bitboard position back into a list board.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - list: The board configuration as a list of 'W', 'B' and 'x' characters.
+    """
+    white, black = board
+    return ['W' if white >> location & 1 else 'B' if black >> location & 1 else 'x'
+            for location in range(NUM_POINTS)]
+
+
+def invert_board(board):
+    """
+    Invert the board by swapping the white and black masks.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - tuple: The inverted (white, black) bitmask pair.
+    """
+    return board[1], board[0]
+
+
+def close_mill(position, mask):
+    """
+    Check if a given position is part of a mill made entirely of points in the mask.
+
+    Parameters:
+    - position (int): The index of the position to check.
+    - mask (int): The bitmask of points to test, usually one player's pieces.
+
+    Returns:
+    - bool: True if the position is part of a mill, False otherwise.
+    """
+    for mill in POINT_MILL_MASKS[position]:
+        if mask & mill == mill:
+            return True
+    return False
+
+
+def mill_analysis(board):
+    """
+    Sort the mills of a position by what occupies them, in one pass over the mill table.
+
+    A mill holding three pieces of one colour covers them: they are safe from removal unless every piece
+    of that colour is covered. A mill holding no piece at all is open, and a piece next to one of its
+    points is threatened by it.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - tuple: The white pieces covered by a white mill, the black pieces covered by a black mill and the
+      points of the empty mills, as bitmasks.
+    """
+    white, black = board
+    occupied = white | black
+    white_milled = black_milled = open_points = 0
+    for mill in MILL_MASKS:
+        if not occupied & mill:
+            open_points |= mill
+        elif white & mill == mill:
+            white_milled |= mill
+        elif black & mill == mill:
+            black_milled |= mill
+    return white_milled, black_milled, open_points
+
+
+def _oriented(positions, colour):
+    """
+    Turn (mover, opponent) mask pairs into (white, black) pairs.
+
+    Parameters:
+    - positions (list): The (mover, opponent) bitmask pairs.
+    - colour (str): The colour of the mover, 'W' or 'B'.
+
+    Returns:
+    - list: The (white, black) bitmask pairs.
+    """
+    if colour == 'W':
+        return positions
+    return [(white, black) for black, white in positions]
+
+
+def _removals(mover, opponent, L):
+    """
+    Append the positions after the mover removes one of the opponent's pieces.
+
+    Parameters:
+    - mover (int): The bitmask of the pieces of the side that closed a mill.
+    - opponent (int): The bitmask of the other side's pieces.
+    - L (list): The (mover, opponent) pairs to extend.
+
+    Returns:
+    - None
+    """
+    candidates = opponent & ~mill_pieces(opponent)
+    if not candidates:
+        candidates = opponent
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        L.append((mover, opponent ^ bit))
+
+
+def _additions(mover, opponent):
+    """
+    Generate the positions after the mover adds a piece, as (mover, opponent) pairs.
+
+    Parameters:
+    - mover (int): The bitmask of the pieces of the side to move.
+    - opponent (int): The bitmask of the other side's pieces.
+
+    Returns:
+    - list: The (mover, opponent) pairs.
+    """
+    L = []
+    empty = ~(mover | opponent) & FULL_MASK
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        added = mover | bit
+        if close_mill(bit.bit_length() - 1, added):
+            _removals(added, opponent, L)
+        else:
+            L.append((added, opponent))
+    return L
+
+
+def _relocations(mover, opponent, hopping):
+    """
+    Generate the positions after the mover moves a piece, as (mover, opponent) pairs.
+
+    Parameters:
+    - mover (int): The bitmask of the pieces of the side to move.
+    - opponent (int): The bitmask of the other side's pieces.
+    - hopping (bool): True if pieces may move to any empty point rather than a neighbouring one.
+
+    Returns:
+    - list: The (mover, opponent) pairs.
+    """
+    L = []
+    empty = ~(mover | opponent) & FULL_MASK
+    pieces = mover
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        targets = empty if hopping else NEIGHBOR_MASKS[bit.bit_length() - 1] & empty
+        while targets:
+            target = targets & -targets
+            targets ^= target
+            moved = mover ^ bit | target
+            if close_mill(target.bit_length() - 1, moved):
+                _removals(moved, opponent, L)
+            else:
+                L.append((moved, opponent))
+    return L
+
+
+def generate_remove(board, colour='W'):
+    """
+    Generate all possible positions after the given colour removes a piece of the other colour.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+    - colour (str): The colour that closed a mill, 'W' or 'B'.
+
+    Returns:
+    - list: A list of possible (white, black) positions after removal.
+    """
+    mover, opponent = board if colour == 'W' else (board[1], board[0])
+    L = []
+    _removals(mover, opponent, L)
+    return _oriented(L, colour)
+
+
+def generate_add(board, colour='W'):
+    """
+    Generate all possible positions after adding a piece of the given colour.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+    - colour (str): The colour to move, 'W' or 'B'.
+
+    Returns:
+    - list: A list of possible (white, black) positions after addition.
+    """
+    mover, opponent = board if colour == 'W' else (board[1], board[0])
+    return _oriented(_additions(mover, opponent), colour)
+
+
+def generate_move(board, colour='W'):
+    """
+    Generate all possible positions after moving a piece of the given colour to a neighbouring point.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+    - colour (str): The colour to move, 'W' or 'B'.
+
+    Returns:
+    - list: A list of possible (white, black) positions after a move.
+    """
+    mover, opponent = board if colour == 'W' else (board[1], board[0])
+    return _oriented(_relocations(mover, opponent, False), colour)
+
+
+def generate_move_black(board):
+    """
+    Generate all possible positions after moving a black piece.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - list: A list of possible (white, black) positions after a move.
+    """
+    return generate_move(board, 'B')
+
+
+def generate_hopping(board, colour='W'):
+    """
+    Generate all possible positions after hopping a piece of the given colour to any empty point.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+    - colour (str): The colour to move, 'W' or 'B'.
+
+    Returns:
+    - list: A list of possible (white, black) positions after hopping.
+    """
+    mover, opponent = board if colour == 'W' else (board[1], board[0])
+    return _oriented(_relocations(mover, opponent, True), colour)
+
+
+def generate_moves_midgame_endgame(board, colour='W'):
+    """
+    Generate possible moves for midgame and endgame for the given colour: hopping with three pieces,
+    sliding otherwise.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+    - colour (str): The colour to move, 'W' or 'B'.
+
+    Returns:
+    - list: A list of possible (white, black) positions.
+    """
+    mover, opponent = board if colour == 'W' else (board[1], board[0])
+    return _oriented(_relocations(mover, opponent, mover.bit_count() == 3), colour)
+
+
+def mobility(mover, opponent):
+    """
+    Analyse the slides of one side along the lines of the board, in one pass over its pieces.
+
+    A piece's mobility is the number of empty points next to it, and a piece is blocked when it has
+    none. The side is immobilised when every piece is blocked, that is when it has no slide at all.
+
+    Parameters:
+    - mover (int): The bitmask of the side's pieces.
+    - opponent (int): The bitmask of the other side's pieces.
+
+    Returns:
+    - tuple: The total number of slides into an empty point and the bitmask of the blocked pieces.
+    """
+    empty = ~(mover | opponent) & FULL_MASK
+    slides = 0
+    blocked = 0
+    pieces = mover
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        count = (NEIGHBOR_MASKS[bit.bit_length() - 1] & empty).bit_count()
+        if count:
+            slides += count
+        else:
+            blocked |= bit
+    return slides, blocked
+
+
+def count_black_moves(board):
+    """
+    Count the black moves scored by the static estimations.
+
+    Every black slide into an empty point counts once, except that a slide closing a black mill counts
+    once per piece removable from the black mask after the move, as the estimations have always scored
+    black's mobility. The slides come from mobility; only a slide into the empty point of a mill already
+    holding two black pieces can close one, so only those are looked at again.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - int: The number of black moves.
+    """
+    white, black = board
+    moves = mobility(black, white)[0]
+    empty = ~(white | black) & FULL_MASK
+    targets = 0
+    for mill in MILL_MASKS:
+        if (black & mill).bit_count() == 2:
+            targets |= mill & empty
+    while targets:
+        target = targets & -targets
+        targets ^= target
+        point = target.bit_length() - 1
+        sources = NEIGHBOR_MASKS[point] & black
+        while sources:
+            bit = sources & -sources
+            sources ^= bit
+            moved = black ^ bit | target
+            if close_mill(point, moved):
+                candidates = moved & ~mill_pieces(moved)
+                moves += (candidates if candidates else moved).bit_count() - 1
+    return moves
+
+
+def static_estimation_opening(board):
+    """
+    Estimate the value of a position during the opening phase.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - int: The estimated value of the position.
+    """
+    return board[0].bit_count() - board[1].bit_count()
+
+
+def static_estimation_midgame_endgame(board):
+    """
+    Estimate the value of a position during mid-game/endgame for white.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - int: The estimated value of the position.
+    """
+    num_white_pieces = board[0].bit_count()
+    num_black_pieces = board[1].bit_count()
+    num_black_moves = count_black_moves(board)
+
+    if num_black_pieces <= 2:
+        return 10000
+    elif num_white_pieces <= 2:
+        return -10000
+    elif num_black_moves == 0:
+        return 10000
+    else:
+        return 1000 * (num_white_pieces - num_black_pieces) - num_black_moves
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+# The public value types for boards and moves. A Board is an immutable pair of bitmasks and a Move the
+# points a move changes, both with __slots__, hashing and equality, so results can be stored, compared
+# and used as dictionary keys, and a Board costs two integers rather than a 23-element list.
+#
+# Boards used to be lists of 'W', 'B' and 'x' characters, and everything taking a board still accepts
+# one. A Board reads like that list: it can be indexed, iterated, measured with len, counted, joined
+# into a string and compared equal to a list of the same characters, so code that only reads the
+# boards it is given keeps working. Code that changes a board in place should call to_list, change the
+# list and turn it back with Board.from_list, or build the new board with Board.play.
+
+from utils.bitboard import FULL_MASK, board_to_masks, masks_to_board
+from utils.topology import NUM_POINTS
+
+# The letters of the points in the ASCII board, 'a' for point 0 to 'w' for point 22
+POINT_NAMES = 'abcdefghijklmnopqrstuvw'
+
+
+class Board:
+    """
+    An immutable board position held as a (white, black) pair of bitmasks.
+    """
+    __slots__ = ('white', 'black')
+
+    def __init__(self, white=0, black=0):
+        """
+        Initializes the board from a pair of masks.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Raises:
+        - ValueError: If the masks overlap or have bits beyond the 23 points.
+        """
+        if white & black or (white | black) & ~FULL_MASK:
+            raise ValueError("The white and black masks must be disjoint masks of the 23 points")
+        object.__setattr__(self, 'white', white)
+        object.__setattr__(self, 'black', black)
+
+    @classmethod
+    def from_list(cls, board):
+        """
+        Create a board from its list form.
+
+        Parameters:
+        - board (list): The board configuration as a list of 'W', 'B' and 'x' characters, or the same
+          characters as a string.
+
+        Returns:
+        - Board: The equivalent board.
+        """
+        return cls(*board_to_masks(board))
+
+    @classmethod
+    def coerce(cls, board):
+        """
+        Return a board as a Board, converting the list form and passing a Board through unchanged.
+
+        Parameters:
+        - board (Board | list | str): The board configuration.
+
+        Returns:
+        - Board: The board.
+        """
+        return board if isinstance(board, cls) else cls.from_list(board)
+
+    def masks(self):
+        """
+        Return the board as a (white, black) bitmask pair.
+
+        Returns:
+        - tuple: The (white, black) bitmask pair.
+        """
+        return self.white, self.black
+
+    def to_list(self):
+        """
+        Return the board in its list form, a new list the caller may change.
+
+        Returns:
+        - list: The board configuration as a list of 'W', 'B' and 'x' characters.
+        """
+        return masks_to_board((self.white, self.black))
+
+    def copy(self):
+        """
+        Return a copy of the board. Boards are immutable, so this is the board itself.
+
+        Returns:
+        - Board: The board.
+        """
+        return self
+
+    def play(self, move):
+        """
+        Return the board after a move.
+
+        Parameters:
+        - move (Move): The move to play.
+
+        Returns:
+        - Board: The new board.
+        """
+        mover, opponent = (self.white, self.black) if move.colour == 'W' else (self.black, self.white)
+        mover ^= 1 << move.target
+        if move.source >= 0:
+            mover ^= 1 << move.source
+        if move.removed >= 0:
+            opponent ^= 1 << move.removed
+        return Board(mover, opponent) if move.colour == 'W' else Board(opponent, mover)
+
+    def count(self, piece):
+        """
+        Count the points holding a piece, as list.count does.
+
+        Parameters:
+        - piece (str): 'W', 'B' or 'x'.
+
+        Returns:
+        - int: The number of points holding the piece.
+        """
+        if piece == 'W':
+            return self.white.bit_count()
+        if piece == 'B':
+            return self.black.bit_count()
+        if piece == 'x':
+            return NUM_POINTS - (self.white | self.black).bit_count()
+        return 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += NUM_POINTS
+        if not 0 <= index < NUM_POINTS:
+            raise IndexError("board index out of range")
+        if self.white >> index & 1:
+            return 'W'
+        return 'B' if self.black >> index & 1 else 'x'
+
+    def __iter__(self):
+        return iter(masks_to_board((self.white, self.black)))
+
+    def __len__(self):
+        return NUM_POINTS
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.white == other.white and self.black == other.black
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.white, self.black))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable")
+
+    def __reduce__(self):
+        return Board, (self.white, self.black)
+
+    def __str__(self):
+        return ''.join(masks_to_board((self.white, self.black)))
+
+    def __repr__(self):
+        return f"Board('{self}')"
+
+
+class Move:
+    """
+    An immutable move: the colour that plays it, the point a piece leaves, the point it arrives at and
+    the point of the opposing piece removed when it closes a mill.
+
+    source is -1 for a piece added during the opening and removed is -1 when no mill closes, as in the
+    (from, to, removed) tuples of the search.
+    """
+    __slots__ = ('colour', 'source', 'target', 'removed')
+
+    def __init__(self, colour, source, target, removed=-1):
+        """
+        Initializes the move.
+
+        Parameters:
+        - colour (str): The colour to move, 'W' or 'B'.
+        - source (int): The point the piece leaves, or -1 for a piece added.
+        - target (int): The point the piece arrives at.
+        - removed (int): The point of the opposing piece removed, or -1.
+        """
+        object.__setattr__(self, 'colour', colour)
+        object.__setattr__(self, 'source', source)
+        object.__setattr__(self, 'target', target)
+        object.__setattr__(self, 'removed', removed)
+
+    @classmethod
+    def between(cls, before, after):
+        """
+        Recover the move that turns one board into another.
+
+        Parameters:
+        - before (Board | list): The board before the move.
+        - after (Board | list): The board after the move.
+
+        Returns:
+        - Move: The move.
+
+        Raises:
+        - ValueError: If no single move turns the first board into the second.
+        """
+        before, after = Board.coerce(before), Board.coerce(after)
+        for colour, mover, moved, opponent, remaining in (
+            ('W', before.white, after.white, before.black, after.black),
+            ('B', before.black, after.black, before.white, after.white)
+        ):
+            arrived, left, removed = moved & ~mover, mover & ~moved, opponent & ~remaining
+            if arrived.bit_count() == 1 and left.bit_count() <= 1 and removed.bit_count() <= 1 and \
+                    not remaining & ~opponent:
+                return cls(colour, left.bit_length() - 1, arrived.bit_length() - 1, removed.bit_length() - 1)
+        raise ValueError(f"No single move turns {before} into {after}")
+
+    def as_tuple(self):
+        """
+        Return the move as the (from, to, removed) tuple the search uses.
+
+        Returns:
+        - tuple: The (from, to, removed) point indices.
+        """
+        return self.source, self.target, self.removed
+
+    def __eq__(self, other):
+        if isinstance(other, Move):
+            return (self.colour, self.source, self.target, self.removed) == \
+                (other.colour, other.source, other.target, other.removed)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.colour, self.source, self.target, self.removed))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Move is immutable")
+
+    def __reduce__(self):
+        return Move, (self.colour, self.source, self.target, self.removed)
+
+    def __str__(self):
+        text = f"{self.colour} {POINT_NAMES[self.source]}-{POINT_NAMES[self.target]}" if self.source >= 0 else \
+            f"{self.colour} +{POINT_NAMES[self.target]}"
+        return text + (f" x{POINT_NAMES[self.removed]}" if self.removed >= 0 else "")
+
+    def __repr__(self):
+        return f"Move('{self.colour}', {self.source}, {self.target}, {self.removed})"
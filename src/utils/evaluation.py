@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+
+# Incremental evaluation for the improved static estimations. An EvaluatedPosition keeps, next to
+# its masks, the number of white and black neighbours of every point, the white and black occupancy
+# of every mill and a handful of running totals derived from them. make_move and unmake_move update
+# only the points and mills a move touches, so a leaf evaluation is a few popcounts and a loop over
+# at most nine pieces instead of the per-feature board scans in utils.util. The scores are identical
+# to static_estimation_opening_improved and static_estimation_midgame_endgame_improved.
+
+from utils.bitboard import (
+    FULL_MASK, close_mill, generate_move
+)
+from utils.position import Position, removable_pieces
+from utils.topology import NUM_POINTS, NEIGHBORS, NEIGHBOR_MASKS, MILLS, MILL_MASKS, POINT_MILLS
+from utils.transposition import ZOBRIST_WHITE, ZOBRIST_BLACK, ZOBRIST_SIDE
+
+WHITE = 0
+BLACK = 1
+
+# Points counted by count_center_control
+CENTER_MASK = (1 << 4) | (1 << 10) | (1 << 13) | (1 << 19)
+
+DEGREES = tuple(len(neighbors) for neighbors in NEIGHBORS)
+
+
+class EvaluatedPosition(Position):
+    """
+    A Position that maintains the features of the improved static estimations as moves are made.
+
+    The per-point and per-mill counts are indexed by colour (WHITE or BLACK). The running totals are:
+    - edges: pairs of adjacent pieces of the same colour, so piece strength is twice this.
+    - potential: pieces with exactly two neighbours of their own colour.
+    - contacts: pairs of adjacent pieces of opposite colours.
+    - slides: (piece, empty neighbour) pairs, the sliding moves before mill captures.
+    - milled: the pieces of each colour covered by a complete mill.
+    - empty_mills: the points covered by a mill with no pieces on it.
+    - open_black: the mills holding two black pieces and an empty point, as a bitset of mill indices.
+    """
+    __slots__ = (
+        'neighbors', 'mill_counts', 'mill_cover', 'milled', 'empty_cover', 'empty_mills', 'open_black',
+        'edges', 'potential', 'contacts', 'slides'
+    )
+
+    def __init__(self, white=0, black=0, colour='W'):
+        """
+        Initializes the position and builds its evaluation state by placing each piece on an empty board.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+        - colour (str): The colour to move, 'W' or 'B'.
+        """
+        super().__init__(white, black, colour)
+        self.white = 0
+        self.black = 0
+        self.neighbors = ([0] * NUM_POINTS, [0] * NUM_POINTS)
+        self.mill_counts = ([0] * len(MILLS), [0] * len(MILLS))
+        self.mill_cover = ([0] * NUM_POINTS, [0] * NUM_POINTS)
+        self.milled = [0, 0]
+        self.empty_cover = [len(mills) for mills in POINT_MILLS]
+        self.empty_mills = FULL_MASK
+        self.open_black = 0
+        self.edges = [0, 0]
+        self.potential = [0, 0]
+        self.contacts = 0
+        self.slides = [0, 0]
+        for colour, mask in ((WHITE, white), (BLACK, black)):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                self._place(colour, bit.bit_length() - 1)
+
+    def _update_mill(self, mill, colour, count):
+        """
+        Record the new occupancy of one mill for one colour and update the mill-derived state.
+
+        Parameters:
+        - mill (int): The index of the mill in MILLS.
+        - colour (int): WHITE or BLACK.
+        - count (int): The new number of pieces of that colour on the mill.
+
+        Returns:
+        - None
+        """
+        counts = self.mill_counts[colour]
+        previous = counts[mill]
+        counts[mill] = count
+        if not self.mill_counts[1 - colour][mill] and (previous == 0 or count == 0):
+            # The mill became empty or stopped being empty
+            step = 1 if count == 0 else -1
+            cover = self.empty_cover
+            for point in MILLS[mill]:
+                cover[point] += step
+                if cover[point] == 0:
+                    self.empty_mills &= ~(1 << point)
+                elif cover[point] == 1 and step == 1:
+                    self.empty_mills |= 1 << point
+        if count == 3 or previous == 3:
+            step = 1 if count == 3 else -1
+            cover = self.mill_cover[colour]
+            for point in MILLS[mill]:
+                cover[point] += step
+                if cover[point] == 0:
+                    self.milled[colour] &= ~(1 << point)
+                elif cover[point] == 1 and step == 1:
+                    self.milled[colour] |= 1 << point
+        if self.mill_counts[BLACK][mill] == 2 and not self.mill_counts[WHITE][mill]:
+            self.open_black |= 1 << mill
+        else:
+            self.open_black &= ~(1 << mill)
+
+    def _place(self, colour, point):
+        """
+        Put a piece on an empty point and update the evaluation state.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+        - point (int): The index of the point.
+
+        Returns:
+        - None
+        """
+        if colour == WHITE:
+            pieces = self.white
+            self.white = pieces | 1 << point
+        else:
+            pieces = self.black
+            self.black = pieces | 1 << point
+        own = self.neighbors[colour]
+        same = own[point]
+        opposed = self.neighbors[1 - colour][point]
+        self.edges[colour] += same
+        self.contacts += opposed
+        self.slides[colour] += DEGREES[point] - 2 * same - opposed
+        self.slides[1 - colour] -= opposed
+        potential = 1 if same == 2 else 0
+        for neighbor in NEIGHBORS[point]:
+            count = own[neighbor] + 1
+            own[neighbor] = count
+            if pieces >> neighbor & 1:
+                if count == 2:
+                    potential += 1
+                elif count == 3:
+                    potential -= 1
+        self.potential[colour] += potential
+        counts = self.mill_counts[colour]
+        for mill in POINT_MILLS[point]:
+            self._update_mill(mill, colour, counts[mill] + 1)
+
+    def _lift(self, colour, point):
+        """
+        Take a piece off a point and update the evaluation state.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+        - point (int): The index of the point.
+
+        Returns:
+        - None
+        """
+        if colour == WHITE:
+            pieces = self.white ^ 1 << point
+            self.white = pieces
+        else:
+            pieces = self.black ^ 1 << point
+            self.black = pieces
+        own = self.neighbors[colour]
+        same = own[point]
+        opposed = self.neighbors[1 - colour][point]
+        self.edges[colour] -= same
+        self.contacts -= opposed
+        self.slides[colour] -= DEGREES[point] - 2 * same - opposed
+        self.slides[1 - colour] += opposed
+        potential = -1 if same == 2 else 0
+        for neighbor in NEIGHBORS[point]:
+            count = own[neighbor] - 1
+            own[neighbor] = count
+            if pieces >> neighbor & 1:
+                if count == 2:
+                    potential += 1
+                elif count == 1:
+                    potential -= 1
+        self.potential[colour] += potential
+        counts = self.mill_counts[colour]
+        for mill in POINT_MILLS[point]:
+            self._update_mill(mill, colour, counts[mill] - 1)
+
+    def make_move(self, move):
+        """
+        Apply a move of the side to move in place, update the evaluation state and pass the turn.
+
+        Parameters:
+        - move (tuple): The (from, to, removed) move.
+
+        Returns:
+        - None
+        """
+        source, target, removed = move
+        if self.colour == 'W':
+            mover, opponent, mover_keys, opponent_keys = WHITE, BLACK, ZOBRIST_WHITE, ZOBRIST_BLACK
+            self.colour = 'B'
+        else:
+            mover, opponent, mover_keys, opponent_keys = BLACK, WHITE, ZOBRIST_BLACK, ZOBRIST_WHITE
+            self.colour = 'W'
+        key = self.key ^ mover_keys[target] ^ ZOBRIST_SIDE
+        if source >= 0:
+            self._lift(mover, source)
+            key ^= mover_keys[source]
+        self._place(mover, target)
+        if removed >= 0:
+            self._lift(opponent, removed)
+            key ^= opponent_keys[removed]
+        self.key = key
+
+    def unmake_move(self, move):
+        """
+        Take back the move applied with make_move, giving the turn back to the side that made it.
+
+        Parameters:
+        - move (tuple): The (from, to, removed) move.
+
+        Returns:
+        - None
+        """
+        source, target, removed = move
+        if self.colour == 'B':
+            mover, opponent, mover_keys, opponent_keys = WHITE, BLACK, ZOBRIST_WHITE, ZOBRIST_BLACK
+            self.colour = 'W'
+        else:
+            mover, opponent, mover_keys, opponent_keys = BLACK, WHITE, ZOBRIST_BLACK, ZOBRIST_WHITE
+            self.colour = 'B'
+        key = self.key ^ mover_keys[target] ^ ZOBRIST_SIDE
+        if removed >= 0:
+            self._place(opponent, removed)
+            key ^= opponent_keys[removed]
+        self._lift(mover, target)
+        if source >= 0:
+            self._place(mover, source)
+            key ^= mover_keys[source]
+        self.key = key
+
+    def count_black_moves(self):
+        """
+        Count the black moves scored by the static estimations, as utils.bitboard.count_black_moves does,
+        without generating them.
+
+        Every slide into an empty point counts once, except that a slide closing a black mill counts
+        once per piece removable from the black mask after the move. Only targets of open_black mills can
+        close one.
+
+        Returns:
+        - int: The number of black moves.
+        """
+        black = self.black
+        moves = self.slides[BLACK]
+        targets = 0
+        open_mills = self.open_black
+        while open_mills:
+            bit = open_mills & -open_mills
+            open_mills ^= bit
+            targets |= MILL_MASKS[bit.bit_length() - 1] & ~black
+        while targets:
+            target_bit = targets & -targets
+            targets ^= target_bit
+            target = target_bit.bit_length() - 1
+            sources = NEIGHBOR_MASKS[target] & black
+            while sources:
+                bit = sources & -sources
+                sources ^= bit
+                moved = black ^ bit | target_bit
+                if close_mill(target, moved):
+                    moves += removable_pieces(moved).bit_count() - 1
+        return moves
+
+    def count_threats(self, colour):
+        """
+        Count the pieces of one colour next to a point covered by a mill with no pieces on it, as
+        utils.util.count_threats does.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+
+        Returns:
+        - int: The number of threatened pieces.
+        """
+        empty_mills = self.empty_mills
+        if not empty_mills:
+            return 0
+        threats = 0
+        remaining = self.white if colour == WHITE else self.black
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if NEIGHBOR_MASKS[bit.bit_length() - 1] & empty_mills:
+                threats += 1
+        return threats
+
+    def count_double_mills(self, colour):
+        """
+        Count the pieces of one colour next to two points covered by its mills, as
+        utils.util.count_double_mills does.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+
+        Returns:
+        - int: The number of double mills.
+        """
+        milled = self.milled[colour]
+        if not milled:
+            return 0
+        double_mills = 0
+        remaining = self.white if colour == WHITE else self.black
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if (NEIGHBOR_MASKS[bit.bit_length() - 1] & milled).bit_count() == 2:
+                double_mills += 1
+        return double_mills
+
+    def count_blocked_pieces(self, colour):
+        """
+        Count the pieces of one colour if it has no sliding move, as utils.util.count_blocked_pieces does.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+
+        Returns:
+        - int: All the pieces of the colour if it cannot move, otherwise 0.
+        """
+        white, black = self.white, self.black
+        if colour == WHITE and not black:
+            # A white slide closing a mill has no child without black pieces to remove
+            has_moves = bool(generate_move((white, black)))
+        else:
+            # Every other slide has at least one child, mill-closing ones included
+            has_moves = self.slides[colour] > 0
+        return 0 if has_moves else (white if colour == WHITE else black).bit_count()
+
+    def count_vulnerability(self, colour):
+        """
+        Sum the opposing neighbours of the pieces of one colour outside its mills, as the sum of
+        utils.util.piece_vulnerability over those pieces does.
+
+        Parameters:
+        - colour (int): WHITE or BLACK.
+
+        Returns:
+        - int: The vulnerability of the colour.
+        """
+        vulnerability = self.contacts
+        remaining = self.milled[colour]
+        opposed = self.neighbors[1 - colour]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            vulnerability -= opposed[bit.bit_length() - 1]
+        return vulnerability
+
+    def static_estimation_opening_improved(self):
+        """
+        Estimate the value of the position during the opening phase.
+
+        Returns:
+        - int: The same value as utils.util.static_estimation_opening_improved.
+        """
+        white, black = self.white, self.black
+        return (white.bit_count() - black.bit_count() +
+                2 * (self.milled[WHITE].bit_count() // 3 - self.milled[BLACK].bit_count() // 3) +
+                (self.potential[WHITE] - self.potential[BLACK]) +
+                ((white & CENTER_MASK).bit_count() - (black & CENTER_MASK).bit_count()) -
+                (self.count_threats(WHITE) - self.count_threats(BLACK)) +
+                2 * (self.edges[WHITE] - self.edges[BLACK]))
+
+    def static_estimation_midgame_endgame_improved(self):
+        """
+        Estimate the value of the position during mid-game/endgame for white.
+
+        Returns:
+        - int: The same value as utils.util.static_estimation_midgame_endgame_improved.
+        """
+        white, black = self.white, self.black
+        white_milled, black_milled = self.milled[WHITE].bit_count(), self.milled[BLACK].bit_count()
+        return (1000 * (white.bit_count() - black.bit_count()) - self.count_black_moves() +
+                2 * (white_milled // 3 - black_milled // 3) + (self.potential[WHITE] - self.potential[BLACK]) +
+                2 * (self.count_double_mills(WHITE) - self.count_double_mills(BLACK)) -
+                (self.count_blocked_pieces(WHITE) - self.count_blocked_pieces(BLACK)) +
+                ((white & CENTER_MASK).bit_count() - (black & CENTER_MASK).bit_count()) +
+                (white_milled - black_milled) - (self.count_threats(WHITE) - self.count_threats(BLACK)) -
+                (self.count_vulnerability(WHITE) - self.count_vulnerability(BLACK)) +
+                2 * (self.edges[WHITE] - self.edges[BLACK]))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+# Moves are (from, to, removed) tuples of the side to move, so a capture (removed >= 0) normally
+# favours the player at the node, whether it is maximizing or minimizing. The search says at which
+# nodes it does.
+
+CAPTURE_SCORE = 1 << 40
+KILLER_SCORE = 1 << 30
+
+
+class MoveOrderer:
+    """
+    This class orders the children of a node for the Alpha-Beta search classes.
+
+    The transposition table move is tried first, before any other move is generated, so a cutoff on it
+    costs no generation at all. The remaining moves are sorted by captures that favour the player at the
+    node, then killer moves that caused a cutoff at the same depth, then the history score of moves that
+    caused cutoffs for the same player anywhere in the tree. Each heuristic can be switched off; with all
+    of them off the remaining moves are passed through lazily in generation order.
+    """
+    def __init__(self, captures=True, killers=True, history=True, killers_per_depth=2):
+        """
+        Initializes empty killer and history tables.
+
+        Parameters:
+        - captures (bool): Whether mill-closing captures are searched first.
+        - killers (bool): Whether killer moves are tracked per depth.
+        - history (bool): Whether the history table is used.
+        - killers_per_depth (int): The number of killer moves kept for each depth.
+        """
+        self.use_captures = captures
+        self.use_killers = killers
+        self.use_history = history
+        self.killers_per_depth = killers_per_depth
+        self.killers = {}
+        self.history = ({}, {})
+
+    def order(self, moves, depth, is_maximizing, hash_move=None, captures=True):
+        """
+        Yield the moves in the order they should be searched.
+
+        Parameters:
+        - moves (Iterable): The (from, to, removed) moves in generation order.
+        - depth (int): The remaining search depth at the node.
+        - is_maximizing (bool): True if the node is maximizing; False if minimizing.
+        - hash_move (tuple): The best move stored in the transposition table for the node, or None.
+        - captures (bool): Whether a capture favours the player at the node, so it is searched first.
+
+        Yields:
+        - tuple: Each (from, to, removed) move.
+        """
+        if hash_move is not None:
+            yield hash_move
+
+        if not (self.use_captures or self.use_killers or self.use_history):
+            for move in moves:
+                if move != hash_move:
+                    yield move
+            return
+
+        killers = self.killers.get(depth, ()) if self.use_killers else ()
+        history = self.history[is_maximizing] if self.use_history else {}
+        capture_score = CAPTURE_SCORE if self.use_captures and captures else 0
+
+        def score(move):
+            value = history.get(move, 0)
+            if move[2] >= 0:
+                value += capture_score
+            if move in killers:
+                value += KILLER_SCORE
+            return value
+
+        remaining = [move for move in moves if move != hash_move]
+        remaining.sort(key=score, reverse=True)
+        yield from remaining
+
+    def record_cutoff(self, move, depth, is_maximizing):
+        """
+        Remember a move that caused a beta cutoff.
+
+        Parameters:
+        - move (tuple): The (from, to, removed) move that caused the cutoff.
+        - depth (int): The remaining search depth at the node.
+        - is_maximizing (bool): True if the node is maximizing; False if minimizing.
+
+        Returns:
+        - None
+        """
+        if self.use_killers:
+            killers = self.killers.setdefault(depth, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[self.killers_per_depth:]
+        if self.use_history:
+            history = self.history[is_maximizing]
+            history[move] = history.get(move, 0) + depth * depth
+
+    def clear(self):
+        """
+        Forget all killer moves and history scores.
+
+        Returns:
+        - None
+        """
+        self.killers = {}
+        self.history = ({}, {})
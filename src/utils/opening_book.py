@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+# Opening book: the results of deep searches of the first few placements, made offline once so the
+# opening classes do not redo them. There is one book per search class, since each class scores
+# positions its own way, and positions are stored once per symmetry class under the symmetries the
+# class's search does not tell apart (its book_symmetries).
+#
+# File layout (little endian): the magic b'NMOB', the version (uint16, two bytes of padding) and the
+# number of records (uint64), then the records sorted by key. A record holds the canonical key of the
+# position, the position after the best move in the same frame (white in the low 23 bits, black
+# above), the score (double) and the depth searched (uint8). Lookups binary-search the memory-mapped
+# records.
+
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.bitboard import FULL_MASK, board_to_masks, masks_to_board
+from utils.board import Board
+from utils.topology import NUM_POINTS
+
+MAGIC = b'NMOB'
+VERSION = 2
+HEADER = struct.Struct('<4sHxxQ')
+RECORD = struct.Struct('<QQdB')
+KEY = struct.Struct('<Q')
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'books')
+
+# State of a worker process, set once by _init_worker when the pool starts it
+_game = None
+_depth = None
+
+
+def book_path(name):
+    """
+    Return the default path of a search class's book.
+
+    Parameters:
+    - name (str): The name of the search class, such as ABOpening.
+
+    Returns:
+    - str: The path of the book file.
+    """
+    return os.path.join(BOOK_DIR, f"{name}.book")
+
+
+def opening_positions(plies, symmetries):
+    """
+    List the positions reached by the first placements of a game, one per symmetry class.
+
+    White and black place in turn from the empty board, so white is to move after an even number of
+    placements and black after an odd number.
+
+    Parameters:
+    - plies (int): The number of placements to go up to.
+    - symmetries (SymmetryGroup): The symmetries to reduce the positions by.
+
+    Returns:
+    - list: The canonical (white, black) masks in order of the number of pieces placed.
+    """
+    positions = [(0, 0)]
+    layer = [(0, 0)]
+    for ply in range(plies):
+        seen = set()
+        following = []
+        for white, black in layer:
+            empty = ~(white | black) & FULL_MASK
+            while empty:
+                point = empty & -empty
+                empty ^= point
+                if ply % 2 == 0:
+                    child = symmetries.canonicalize(white | point, black)
+                else:
+                    child = symmetries.canonicalize(white, black | point)
+                if child not in seen:
+                    seen.add(child)
+                    following.append(child)
+        following.sort()
+        positions.extend(following)
+        layer = following
+    return positions
+
+
+def write_opening_book(output_file, records):
+    """
+    Write records in the opening book format.
+
+    Parameters:
+    - output_file (str): The path of the file to write.
+    - records (list): (key, best move, score, depth) tuples in any order.
+
+    Returns:
+    - None
+    """
+    records = sorted(records)
+    with open(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            f.write(RECORD.pack(*record))
+
+
+def _init_worker(game_class, depth):
+    """
+    Keep an instance of the search class and the search depth in the worker process.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The opening search class.
+    - depth (int): The search depth.
+
+    Returns:
+    - None
+    """
+    global _game, _depth
+    _game = game_class()
+    _game.use_book = False
+    _depth = depth
+
+
+def _search_position(position):
+    """
+    Search one book position in a worker process.
+
+    Parameters:
+    - position (tuple): The canonical (white, black) masks.
+
+    Returns:
+    - tuple: The book record, or None if the position has no move.
+    """
+    white, black = position
+    estimate, best_move = _game.play_game(masks_to_board(position), _depth)
+    if best_move is None:
+        return None
+    moved_white, moved_black = best_move.masks()
+    return white | black << NUM_POINTS, moved_white | moved_black << NUM_POINTS, estimate, _depth
+
+
+def build_opening_book(game_class, plies, depth, output_file, workers=None, progress=print):
+    """
+    Search every position of the first placements offline and write the results as a book.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The opening search class, such as ABOpening.
+    - plies (int): The number of placements to cover.
+    - depth (int): The search depth.
+    - output_file (str): The path of the book file to write.
+    - workers (int): The number of worker processes; defaults to the number of CPU cores.
+    - progress (Callable[[str], None]): Receives progress messages.
+
+    Returns:
+    - int: The number of records written.
+
+    Raises:
+    - ValueError: If the class does not play the opening.
+    """
+    if game_class.book_symmetries is None:
+        raise ValueError(f"{game_class.__name__} does not play the opening and cannot have a book")
+    positions = opening_positions(plies, game_class.book_symmetries)
+    progress(f"{len(positions)} positions to search at depth {depth}")
+    workers = workers if workers is not None else os.cpu_count() or 1
+    records = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(game_class, depth)) as executor:
+        results = executor.map(_search_position, positions, chunksize=max(1, len(positions) // (workers * 8)))
+        for searched, record in enumerate(results, 1):
+            if record is not None:
+                records.append(record)
+            if searched % 100 == 0:
+                progress(f"{searched} of {len(positions)} positions searched")
+    write_opening_book(output_file, records)
+    return len(records)
+
+
+class OpeningBook:
+    """
+    An opening book file opened for lookups.
+
+    The file is memory-mapped and its records are found by binary search on the key.
+    """
+    def __init__(self, path):
+        """
+        Open and map an opening book file.
+
+        Parameters:
+        - path (str): The path of the book file.
+
+        Raises:
+        - ValueError: If the file is not an opening book of this version.
+        """
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+    def find(self, key):
+        """
+        Find the record of a canonical key.
+
+        Parameters:
+        - key (int): The canonical key of the position.
+
+        Returns:
+        - tuple: The (key, best move, score, depth) record, or None if the position is not in the book.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self.data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            record = RECORD.unpack_from(self.data, HEADER.size + low * RECORD.size)
+            if record[0] == key:
+                return record
+        return None
+
+    def lookup(self, board, depth, symmetries):
+        """
+        Look up a board searched at least to the given depth.
+
+        Parameters:
+        - board (list): The current board configuration.
+        - depth (int): The depth the caller would search to.
+        - symmetries (SymmetryGroup): The symmetries the book was built with.
+
+        Returns:
+        - tuple: The score and the board after the best move, or None if the book has no deep enough record.
+        """
+        white, black = board_to_masks(board)
+        number = symmetries.canonical_symmetry(white, black)
+        key = symmetries.transform(white, number) | symmetries.transform(black, number) << NUM_POINTS
+        record = self.find(key)
+        if record is None or record[3] < depth:
+            return None
+        _, moved, score, _ = record
+        best_move = (symmetries.transform(moved & FULL_MASK, number, True),
+                     symmetries.transform(moved >> NUM_POINTS, number, True))
+        return int(score) if score.is_integer() else score, Board(*best_move)
+
+    def close(self):
+        """
+        Unmap the file.
+
+        Returns:
+        - None
+        """
+        self.data.close()
+
+
+# Books opened so far by search class name; None where there is no book file
+_books = {}
+
+
+def opening_book(name):
+    """
+    Return the book of a search class, opening its default file on first use.
+
+    Parameters:
+    - name (str): The name of the search class.
+
+    Returns:
+    - OpeningBook: The book, or None if the class has no book file.
+    """
+    if name not in _books:
+        path = book_path(name)
+        _books[name] = OpeningBook(path) if os.path.exists(path) else None
+    return _books[name]
+
+
+def set_opening_book(name, book):
+    """
+    Replace the book consulted by a search class.
+
+    Parameters:
+    - name (str): The name of the search class.
+    - book (OpeningBook): The book to consult, or None to consult none.
+
+    Returns:
+    - None
+    """
+    _books[name] = book
+
+
+def probe_opening_book(game, board, depth):
+    """
+    Answer a position from the book of a search instance, unless the instance bypasses its book.
+
+    Parameters:
+    - game (Any): An instance of an opening search class.
+    - board (list): The current board configuration.
+    - depth (int): The depth the instance would search to.
+
+    Returns:
+    - tuple: The score and the board after the best move, or None to search instead.
+    """
+    if not getattr(game, 'use_book', False) or depth <= 0:
+        return None
+    book = opening_book(type(game).__name__)
+    if book is None:
+        return None
+    return book.lookup(board, depth, game.book_symmetries)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+
+# Incremental search support. A move is a (from, to, removed) tuple of point indices where from is -1
+# for a piece added during the opening and removed is -1 when the move does not close a mill. Moves
+# are made by the side to move, applied to and taken back from a single mutable Position that passes
+# the turn, and the generators below yield them one at a time so a search that cuts off stops
+# generating immediately.
+
+from utils.bitboard import FULL_MASK, board_to_masks, close_mill
+from utils.board import Board
+from utils.topology import NEIGHBOR_MASKS, mill_pieces
+from utils.transposition import ZOBRIST_WHITE, ZOBRIST_BLACK, ZOBRIST_SIDE, zobrist_key
+
+
+class Position:
+    """
+    A mutable bitboard position for make/unmake search.
+
+    It holds the white and black masks, the colour to move and the Zobrist key of the position and side
+    to move, all of which are updated in place by make_move and restored by unmake_move.
+    """
+    __slots__ = ('white', 'black', 'colour', 'key')
+
+    def __init__(self, white=0, black=0, colour='W'):
+        """
+        Initializes the position from a pair of masks and the colour to move.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+        - colour (str): The colour to move, 'W' or 'B'.
+        """
+        self.white = white
+        self.black = black
+        self.colour = colour
+        self.key = zobrist_key((white, black)) ^ (ZOBRIST_SIDE if colour == 'B' else 0)
+
+    @classmethod
+    def from_board(cls, board, colour='W'):
+        """
+        Create a position from a board.
+
+        Parameters:
+        - board (Board | list): The board configuration, as a Board or a list of 'W', 'B' and 'x' characters.
+        - colour (str): The colour to move, 'W' or 'B'.
+
+        Returns:
+        - Position: The equivalent position.
+        """
+        if isinstance(board, Board):
+            return cls(board.white, board.black, colour)
+        return cls(*board_to_masks(board), colour)
+
+    def masks(self):
+        """
+        Return the position as a (white, black) bitmask pair.
+
+        Returns:
+        - tuple: The (white, black) bitmask pair.
+        """
+        return self.white, self.black
+
+    def side_masks(self):
+        """
+        Return the masks of the side to move and of the other side.
+
+        Returns:
+        - tuple: The (mover, opponent) bitmask pair.
+        """
+        return (self.white, self.black) if self.colour == 'W' else (self.black, self.white)
+
+    def to_board(self):
+        """
+        Return the position as a Board.
+
+        Returns:
+        - Board: The board configuration.
+        """
+        return Board(self.white, self.black)
+
+    def make_move(self, move):
+        """
+        Apply a move of the side to move in place and pass the turn.
+
+        Parameters:
+        - move (tuple): The (from, to, removed) move.
+
+        Returns:
+        - None
+        """
+        source, target, removed = move
+        if self.colour == 'W':
+            key = self.key ^ ZOBRIST_WHITE[target] ^ ZOBRIST_SIDE
+            white = self.white | 1 << target
+            if source >= 0:
+                white ^= 1 << source
+                key ^= ZOBRIST_WHITE[source]
+            if removed >= 0:
+                self.black ^= 1 << removed
+                key ^= ZOBRIST_BLACK[removed]
+            self.white = white
+            self.colour = 'B'
+        else:
+            key = self.key ^ ZOBRIST_BLACK[target] ^ ZOBRIST_SIDE
+            black = self.black | 1 << target
+            if source >= 0:
+                black ^= 1 << source
+                key ^= ZOBRIST_BLACK[source]
+            if removed >= 0:
+                self.white ^= 1 << removed
+                key ^= ZOBRIST_WHITE[removed]
+            self.black = black
+            self.colour = 'W'
+        self.key = key
+
+    def unmake_move(self, move):
+        """
+        Take back the move applied with make_move, giving the turn back to the side that made it.
+
+        Parameters:
+        - move (tuple): The (from, to, removed) move.
+
+        Returns:
+        - None
+        """
+        source, target, removed = move
+        if self.colour == 'B':
+            key = self.key ^ ZOBRIST_WHITE[target] ^ ZOBRIST_SIDE
+            white = self.white ^ 1 << target
+            if source >= 0:
+                white |= 1 << source
+                key ^= ZOBRIST_WHITE[source]
+            if removed >= 0:
+                self.black |= 1 << removed
+                key ^= ZOBRIST_BLACK[removed]
+            self.white = white
+            self.colour = 'W'
+        else:
+            key = self.key ^ ZOBRIST_BLACK[target] ^ ZOBRIST_SIDE
+            black = self.black ^ 1 << target
+            if source >= 0:
+                black |= 1 << source
+                key ^= ZOBRIST_BLACK[source]
+            if removed >= 0:
+                self.white |= 1 << removed
+                key ^= ZOBRIST_WHITE[removed]
+            self.black = black
+            self.colour = 'B'
+        self.key = key
+
+
+def removable_pieces(mask):
+    """
+    Return the pieces that may be removed after a mill closes: those outside mills, or all of them
+    if every piece is in a mill.
+
+    Parameters:
+    - mask (int): The bitmask of the opponent's pieces.
+
+    Returns:
+    - int: The bitmask of removable pieces.
+    """
+    candidates = mask & ~mill_pieces(mask)
+    return candidates if candidates else mask
+
+
+def iter_add(position):
+    """
+    Lazily generate the moves adding a piece of the side to move.
+
+    Parameters:
+    - position (Position): The current position.
+
+    Yields:
+    - tuple: Each (from, to, removed) move, in the same order as generate_add.
+    """
+    mover, opponent = position.side_masks()
+    removable = None
+    empty = ~(mover | opponent) & FULL_MASK
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        target = bit.bit_length() - 1
+        if close_mill(target, mover | bit):
+            if removable is None:
+                removable = removable_pieces(opponent)
+            candidates = removable
+            while candidates:
+                victim = candidates & -candidates
+                candidates ^= victim
+                yield -1, target, victim.bit_length() - 1
+        else:
+            yield -1, target, -1
+
+
+def _iter_relocations(position, hopping, captures_only=False):
+    """
+    Lazily generate the moves relocating a piece of the side to move, either to a neighbour or anywhere.
+
+    Parameters:
+    - position (Position): The current position.
+    - hopping (bool): True if pieces may move to any empty point.
+    - captures_only (bool): True to generate only the moves closing a mill.
+
+    Yields:
+    - tuple: Each (from, to, removed) move.
+    """
+    mover, opponent = position.side_masks()
+    removable = None
+    empty = ~(mover | opponent) & FULL_MASK
+    pieces = mover
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        source = bit.bit_length() - 1
+        targets = empty if hopping else NEIGHBOR_MASKS[source] & empty
+        while targets:
+            target_bit = targets & -targets
+            targets ^= target_bit
+            target = target_bit.bit_length() - 1
+            if close_mill(target, mover ^ bit | target_bit):
+                if removable is None:
+                    removable = removable_pieces(opponent)
+                candidates = removable
+                while candidates:
+                    victim = candidates & -candidates
+                    candidates ^= victim
+                    yield source, target, victim.bit_length() - 1
+            elif not captures_only:
+                yield source, target, -1
+
+
+def iter_move(position):
+    """
+    Lazily generate the moves sliding a piece of the side to move to a neighbouring point.
+
+    Parameters:
+    - position (Position): The current position.
+
+    Yields:
+    - tuple: Each (from, to, removed) move, in the same order as generate_move.
+    """
+    return _iter_relocations(position, False)
+
+
+def iter_hopping(position):
+    """
+    Lazily generate the moves hopping a piece of the side to move to any empty point.
+
+    Parameters:
+    - position (Position): The current position.
+
+    Yields:
+    - tuple: Each (from, to, removed) move, in the same order as generate_hopping.
+    """
+    return _iter_relocations(position, True)
+
+
+def iter_moves_midgame_endgame(position):
+    """
+    Lazily generate the midgame and endgame moves of the side to move: hopping with three pieces, sliding
+    otherwise.
+
+    Parameters:
+    - position (Position): The current position.
+
+    Yields:
+    - tuple: Each (from, to, removed) move.
+    """
+    return _iter_relocations(position, position.side_masks()[0].bit_count() == 3)
+
+
+def iter_captures_midgame_endgame(position):
+    """
+    Lazily generate the midgame and endgame moves of the side to move that close a mill and remove a piece.
+
+    Parameters:
+    - position (Position): The current position.
+
+    Yields:
+    - tuple: Each (from, to, removed) move, in the order iter_moves_midgame_endgame yields it.
+    """
+    return _iter_relocations(position, position.side_masks()[0].bit_count() == 3, True)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+# Opt-in instrumentation of the search hot path. A Profiler replaces the move generators, the static
+# estimations and their feature helpers, the position updates, move ordering, transposition table and
+# the methods of the search classes with timing wrappers, in every module that refers to them, and
+# puts the originals back when it is removed. Nothing is wrapped unless a Profiler is installed, so
+# normal searches run the plain functions.
+#
+# For every function it records the calls, the time spent in it including callees (counted once for
+# recursive calls) and the time spent in its own body. The self time is also recorded per call stack,
+# which is written in the collapsed-stack format read by flamegraph.pl, speedscope and similar tools,
+# with one line per stack and the self time in microseconds as the sample count. The times include
+# the overhead of the wrappers, so they are only meaningful relative to each other.
+
+import importlib
+import inspect
+import json
+import sys
+from time import perf_counter
+
+# The functions instrumented, by group: (module, attribute) for module functions and
+# (module, class, attribute) for methods
+TARGETS = {
+    'generation': (
+        ('utils.bitboard', 'close_mill'), ('utils.bitboard', '_removals'), ('utils.bitboard', '_additions'),
+        ('utils.bitboard', '_relocations'), ('utils.bitboard', 'generate_remove'), ('utils.bitboard', 'generate_add'),
+        ('utils.bitboard', 'generate_move'), ('utils.bitboard', 'generate_move_black'),
+        ('utils.bitboard', 'generate_hopping'), ('utils.bitboard', 'generate_moves_midgame_endgame'),
+        ('utils.position', 'removable_pieces'), ('utils.position', 'iter_add'),
+        ('utils.position', '_iter_relocations'), ('utils.util', 'close_mill'),
+    ),
+    'evaluation': (
+        ('utils.bitboard', 'static_estimation_opening'), ('utils.bitboard', 'static_estimation_midgame_endgame'),
+        ('utils.bitboard', 'mobility'), ('utils.bitboard', 'count_black_moves'), ('utils.bitboard', 'mill_analysis'),
+        ('utils.batch_evaluation', 'count_black_moves_batch'),
+        ('utils.batch_evaluation', 'static_estimation_midgame_endgame_batch'),
+        ('utils.util', 'static_estimation_opening_improved'),
+        ('utils.util', 'static_estimation_midgame_endgame_improved'), ('utils.util', 'count_mills'),
+        ('utils.util', 'count_potential_mills'), ('utils.util', 'count_double_mills'),
+        ('utils.util', 'count_blocked_pieces'), ('utils.util', 'count_center_control'),
+        ('utils.util', 'can_be_removed'), ('utils.util', 'count_safe_pieces'), ('utils.util', 'count_threats'),
+        ('utils.util', 'piece_vulnerability'), ('utils.util', 'piece_strength'),
+        ('utils.evaluation', 'EvaluatedPosition', 'count_black_moves'),
+        ('utils.evaluation', 'EvaluatedPosition', 'count_threats'),
+        ('utils.evaluation', 'EvaluatedPosition', 'count_double_mills'),
+        ('utils.evaluation', 'EvaluatedPosition', 'count_blocked_pieces'),
+        ('utils.evaluation', 'EvaluatedPosition', 'count_vulnerability'),
+        ('utils.evaluation', 'EvaluatedPosition', 'static_estimation_opening_improved'),
+        ('utils.evaluation', 'EvaluatedPosition', 'static_estimation_midgame_endgame_improved'),
+    ),
+    'position': (
+        ('utils.bitboard', 'board_to_masks'), ('utils.bitboard', 'masks_to_board'),
+        ('utils.bitboard', 'invert_board'),
+        ('utils.position', 'Position', 'make_move'), ('utils.position', 'Position', 'unmake_move'),
+        ('utils.evaluation', 'EvaluatedPosition', 'make_move'),
+        ('utils.evaluation', 'EvaluatedPosition', 'unmake_move'),
+        ('utils.evaluation', 'EvaluatedPosition', '_update_mill'),
+    ),
+    'ordering': (
+        ('utils.move_ordering', 'MoveOrderer', 'order'), ('utils.move_ordering', 'MoveOrderer', 'record_cutoff'),
+    ),
+    'transposition': (
+        ('utils.transposition', 'TranspositionTable', 'probe'),
+        ('utils.transposition', 'TranspositionTable', 'hash_move'),
+        ('utils.transposition', 'TranspositionTable', 'store'),
+    ),
+}
+
+
+class Profiler:
+    """
+    Per-function call counts and times of the search hot path, gathered while installed.
+
+    The recorded data is kept in plain dictionaries so it can be sent back from a worker process and
+    added to the profile of the parent with merge.
+    """
+    def __init__(self):
+        """
+        Initializes an empty, uninstalled profile.
+        """
+        # name -> [group, calls, total seconds, self seconds]
+        self.functions = {}
+        # ';'-joined call stack -> self seconds
+        self.stacks = {}
+        self._stack = []
+        self._active = {}
+        self._patches = []
+
+    def _record(self, name, group):
+        """
+        Return the record of a function, creating it if needed.
+
+        Parameters:
+        - name (str): The name of the function.
+        - group (str): The group the function belongs to.
+
+        Returns:
+        - list: The [group, calls, total seconds, self seconds] record.
+        """
+        record = self.functions.get(name)
+        if record is None:
+            record = self.functions[name] = [group, 0, 0.0, 0.0]
+        return record
+
+    def _enter(self, name):
+        """
+        Push a call on the profiler's stack.
+
+        Parameters:
+        - name (str): The name of the function called.
+
+        Returns:
+        - list: The [stack path, child seconds] frame of the call.
+        """
+        stack = self._stack
+        frame = [stack[-1][0] + ';' + name if stack else name, 0.0]
+        stack.append(frame)
+        self._active[name] = self._active.get(name, 0) + 1
+        return frame
+
+    def _leave(self, name, record, frame, elapsed):
+        """
+        Pop a call off the profiler's stack and record its time.
+
+        Parameters:
+        - name (str): The name of the function returning.
+        - record (list): The function's record.
+        - frame (list): The frame returned by _enter.
+        - elapsed (float): The seconds the call took, including callees.
+
+        Returns:
+        - None
+        """
+        stack = self._stack
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        self_time = elapsed - frame[1]
+        record[1] += 1
+        record[3] += self_time
+        self.stacks[frame[0]] = self.stacks.get(frame[0], 0.0) + self_time
+        active = self._active[name] - 1
+        self._active[name] = active
+        if not active:
+            record[2] += elapsed
+
+    def wrap(self, name, group, function):
+        """
+        Return a timing wrapper of a function.
+
+        A generator function is timed across every resumption rather than just the call creating it,
+        and each item it produces counts as a call.
+
+        Parameters:
+        - name (str): The name to record the function under.
+        - group (str): The group the function belongs to.
+        - function (Callable): The function to wrap.
+
+        Returns:
+        - Callable: The wrapper.
+        """
+        record = self._record(name, group)
+        enter, leave = self._enter, self._leave
+
+        if inspect.isgeneratorfunction(function):
+            def wrapper(*args, **kwargs):
+                generator = function(*args, **kwargs)
+                while True:
+                    frame = enter(name)
+                    start = perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        leave(name, record, frame, perf_counter() - start)
+                    yield item
+        else:
+            def wrapper(*args, **kwargs):
+                frame = enter(name)
+                start = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    leave(name, record, frame, perf_counter() - start)
+
+        wrapper.__wrapped__ = function
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+
+    def _patch(self, owner, attribute, value):
+        """
+        Replace an attribute, remembering the original so uninstall can put it back.
+
+        Parameters:
+        - owner (Any): The module or class to change.
+        - attribute (str): The name of the attribute.
+        - value (Any): The new value.
+
+        Returns:
+        - None
+        """
+        self._patches.append((owner, attribute, owner.__dict__[attribute]))
+        setattr(owner, attribute, value)
+
+    def install(self, game_classes=()):
+        """
+        Wrap the hot path functions, and the methods of the given search classes.
+
+        Module functions are replaced in every loaded module that imported them by name.
+
+        Parameters:
+        - game_classes (Iterable): The search classes whose methods to instrument under the 'search' group.
+
+        Returns:
+        - Profiler: This profiler, for chaining.
+        """
+        if self._patches:
+            raise RuntimeError("The profiler is already installed")
+        replacements = {}
+        for group, targets in TARGETS.items():
+            for target in targets:
+                module = importlib.import_module(target[0])
+                short_name = target[0].split('.')[-1]
+                if len(target) == 3:
+                    owner = getattr(module, target[1])
+                    self._patch(owner, target[2], self.wrap(f"{target[1]}.{target[2]}", group,
+                                                            owner.__dict__[target[2]]))
+                else:
+                    function = getattr(module, target[1])
+                    replacements[id(function)] = function, self.wrap(f"{short_name}.{target[1]}", group, function)
+
+        for module_name, module in list(sys.modules.items()):
+            if module is None or not module_name.startswith(('utils.', 'modules.')):
+                continue
+            for attribute, value in list(vars(module).items()):
+                replacement = replacements.get(id(value))
+                if replacement is not None and replacement[0] is value:
+                    self._patch(module, attribute, replacement[1])
+
+        # The methods are wrapped where they are defined, so the SearchEngine methods shared by several
+        # search classes are wrapped once
+        owners = []
+        for game_class in game_classes:
+            owners.extend(owner for owner in game_class.__mro__ if owner is not object and owner not in owners)
+        for owner in owners:
+            wrappers = {}
+            for attribute, value in list(vars(owner).items()):
+                if attribute.startswith('__') or not inspect.isfunction(value):
+                    continue
+                # Aliases of one function share one wrapper
+                if id(value) not in wrappers:
+                    wrappers[id(value)] = self.wrap(f"{owner.__name__}.{value.__name__}", 'search', value)
+                self._patch(owner, attribute, wrappers[id(value)])
+        return self
+
+    def uninstall(self):
+        """
+        Put every original function back.
+
+        Returns:
+        - None
+        """
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+
+    def reset(self):
+        """
+        Clear the recorded data, keeping the profiler installed.
+
+        Returns:
+        - None
+        """
+        for record in self.functions.values():
+            record[1:] = [0, 0.0, 0.0]
+        self.stacks.clear()
+
+    def snapshot(self):
+        """
+        Return a copy of the recorded data, for sending to another process.
+
+        Returns:
+        - tuple: The function records and the stack times.
+        """
+        return {name: list(record) for name, record in self.functions.items()}, dict(self.stacks)
+
+    def merge(self, snapshot):
+        """
+        Add data recorded elsewhere, such as in a worker process, to this profile.
+
+        Parameters:
+        - snapshot (tuple): The data returned by snapshot.
+
+        Returns:
+        - Profiler: This profiler, for chaining.
+        """
+        functions, stacks = snapshot
+        for name, (group, calls, total, self_time) in functions.items():
+            record = self._record(name, group)
+            record[1] += calls
+            record[2] += total
+            record[3] += self_time
+        for path, self_time in stacks.items():
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+        return self
+
+    def as_dict(self):
+        """
+        Describe the profile for a JSON report.
+
+        Returns:
+        - dict: Per function, the group, calls and total and self time in milliseconds, busiest first,
+          and per group the calls and self time in milliseconds.
+        """
+        functions = {}
+        groups = {}
+        for name, (group, calls, total, self_time) in sorted(self.functions.items(), key=lambda item: -item[1][3]):
+            if not calls:
+                continue
+            functions[name] = {
+                'group': group,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'self_ms': round(self_time * 1000, 3)
+            }
+            summary = groups.setdefault(group, {'calls': 0, 'self_ms': 0.0})
+            summary['calls'] += calls
+            summary['self_ms'] = round(summary['self_ms'] + self_time * 1000, 3)
+        return {'functions': functions, 'groups': groups}
+
+    def write(self, prefix):
+        """
+        Write the profile as JSON to prefix.json and as collapsed stacks to prefix.folded.
+
+        Parameters:
+        - prefix (str): The path of both files without their extension.
+
+        Returns:
+        - tuple: The paths of the two files written.
+        """
+        json_file, folded_file = prefix + '.json', prefix + '.folded'
+        with open(json_file, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        with open(folded_file, 'w') as f:
+            for path, self_time in sorted(self.stacks.items()):
+                samples = round(self_time * 1e6)
+                if samples:
+                    f.write(f"{path} {samples}\n")
+        return json_file, folded_file
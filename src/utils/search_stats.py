@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Counters of one search. Every search class keeps a SearchStats in its stats attribute and starts a
+# fresh one in play_game, so searches running side by side never share counters. The search functions
+# bump plain attributes of it, at the cost of an attribute lookup rather than a function call per node.
+# Stats from several searches, such as those of worker processes, are added up with merge. A search
+# class with collect_stats set to False decides when its stats are assigned that its nodes skip these
+# updates, leaving only the time; worker processes build their own instances, so the flag is set on
+# the class to reach them.
+
+from time import perf_counter
+
+
+class SearchStats:
+    """
+    The node, leaf, cutoff, transposition table hit, re-search and quiescence node counts of a search,
+    and its time.
+
+    depth_nodes[d] counts the calls of the search function with d plies left to search, so
+    depth_nodes[0] counts the leaves reached, whether they were evaluated or answered by the
+    transposition table. The nodes of a quiescence search past the leaves are counted apart.
+    """
+    __slots__ = (
+        'depth_nodes', 'leaves', 'cutoffs', 'tt_hits', 'researches', 'quiescence_nodes', 'elapsed', '_started'
+    )
+
+    def __init__(self, depth=0):
+        """
+        Initializes all counters to zero.
+
+        Parameters:
+        - depth (int): The deepest remaining depth the search will be called with.
+        """
+        self.depth_nodes = [0] * (depth + 1)
+        self.leaves = 0
+        self.cutoffs = 0
+        self.tt_hits = 0
+        self.researches = 0
+        self.quiescence_nodes = 0
+        self.elapsed = 0.0
+        self._started = None
+
+    @property
+    def nodes(self):
+        """
+        Return the number of calls of the search function.
+
+        Returns:
+        - int: The total over all depths.
+        """
+        return sum(self.depth_nodes)
+
+    def branching_factors(self):
+        """
+        Return the effective branching factor at each depth, from the root down.
+
+        The factor at a depth is the number of nodes one ply further from the root for each node at
+        that depth.
+
+        Returns:
+        - list: The factors, rounded to two decimals, with None where no node was searched.
+        """
+        factors = []
+        for depth in range(len(self.depth_nodes) - 1, 0, -1):
+            parents = self.depth_nodes[depth]
+            factors.append(round(self.depth_nodes[depth - 1] / parents, 2) if parents else None)
+        while factors and factors[0] is None:
+            factors.pop(0)
+        return factors
+
+    def start(self):
+        """
+        Start timing the search.
+
+        Returns:
+        - None
+        """
+        self._started = perf_counter()
+
+    def stop(self):
+        """
+        Stop timing the search and add the time since start to the elapsed time.
+
+        Returns:
+        - None
+        """
+        if self._started is not None:
+            self.elapsed += perf_counter() - self._started
+            self._started = None
+
+    def merge(self, other):
+        """
+        Add the counts of another search to these.
+
+        The elapsed time is not added, since the searches merged are often run side by side in worker
+        processes; the caller times the whole of the work instead.
+
+        Parameters:
+        - other (SearchStats): The stats to add.
+
+        Returns:
+        - SearchStats: These stats, for chaining.
+        """
+        if len(other.depth_nodes) > len(self.depth_nodes):
+            self.depth_nodes.extend([0] * (len(other.depth_nodes) - len(self.depth_nodes)))
+        for depth, count in enumerate(other.depth_nodes):
+            self.depth_nodes[depth] += count
+        self.leaves += other.leaves
+        self.cutoffs += other.cutoffs
+        self.tt_hits += other.tt_hits
+        self.researches += other.researches
+        self.quiescence_nodes += other.quiescence_nodes
+        return self
+
+    def as_dict(self):
+        """
+        Describe the stats for a JSON report.
+
+        Returns:
+        - dict: The nodes, leaves (positions evaluated by static estimation), cutoffs, transposition
+          table hits, re-searches, quiescence nodes, nodes per depth from the root down, branching
+          factors and time in milliseconds.
+        """
+        depth_nodes = list(reversed(self.depth_nodes))
+        while depth_nodes and depth_nodes[0] == 0:
+            depth_nodes.pop(0)
+        return {
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'cutoffs': self.cutoffs,
+            'tt_hits': self.tt_hits,
+            'researches': self.researches,
+            'quiescence_nodes': self.quiescence_nodes,
+            'depth_nodes': depth_nodes,
+            'branching_factors': self.branching_factors(),
+            'time_ms': round(self.elapsed * 1000, 3)
+        }
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+
+# Canonical positions and dense position indices. A symmetry is a relabelling of the 23 points that
+# maps every mill onto a mill; the board's mills have four of them (the identity, the left-right
+# mirror and two that swap the inner and outer squares). Positions where a player slides also depend
+# on which points are neighbours, and the neighbour table in bitboard keeps only the identity, so the
+# mill symmetries apply to the opening and to hopping positions only. Colour swap needs no table:
+# positions indexed from the side to move, as the tablebase does, already serve both colours.
+#
+# A position with n pieces, w of them white, gets from its SymmetryGroup the dense index
+# rank(occupied) * C(n, w) + rank(white within occupied), where the occupied points are canonical
+# (the smallest mask any symmetry maps them to) and rank is the order among the canonical masks with
+# n pieces. Several symmetric positions share one index, and tables are several times smaller.
+
+import itertools
+from math import comb
+
+from utils.topology import NUM_POINTS, NEIGHBORS, MILLS, POINT_MILLS
+
+
+def _automorphisms(adjacency):
+    """
+    Find every relabelling of the points that maps mills onto mills, and optionally neighbours onto
+    neighbours.
+
+    Parameters:
+    - adjacency (tuple): The neighbours of every point, or None to ignore them.
+
+    Returns:
+    - tuple: The relabellings as tuples mapping each point to its image, the identity first.
+    """
+    mills = {frozenset(mill) for mill in MILLS}
+    # Mills whose points are all below a given point can be checked once that point is placed
+    ready = [[mill for mill in MILLS if max(mill) == point] for point in range(NUM_POINTS)]
+    found = []
+
+    def extend(image):
+        point = len(image)
+        if point == NUM_POINTS:
+            found.append(tuple(image))
+            return
+        for target in range(NUM_POINTS):
+            if target in image or len(POINT_MILLS[target]) != len(POINT_MILLS[point]):
+                continue
+            if adjacency is not None and any(
+                    (image[other] in adjacency[target]) != (other in adjacency[point]) for other in range(point)):
+                continue
+            image.append(target)
+            if all(frozenset(image[p] for p in mill) in mills for mill in ready[point]):
+                extend(image)
+            image.pop()
+
+    extend([])
+    return tuple(sorted(found))
+
+
+def _byte_images(permutation):
+    """
+    Tabulate the image of every byte of a mask under a relabelling, so a mask is mapped with three lookups.
+
+    Parameters:
+    - permutation (tuple): The image of each point.
+
+    Returns:
+    - tuple: For the low, middle and high byte of a mask, the image mask of each of the 256 values.
+    """
+    return tuple(
+        tuple(sum(1 << permutation[point] for point in range(8 * shift, min(8 * shift + 8, NUM_POINTS))
+                  if value >> (point - 8 * shift) & 1)
+              for value in range(256))
+        for shift in range(3)
+    )
+
+
+# The colex order of the k-subsets of n items, and binomial coefficients for ranking them
+_SUBSETS = {}
+_COMB = tuple(tuple(comb(items, count) for count in range(NUM_POINTS + 1)) for items in range(NUM_POINTS + 1))
+
+
+def subsets(items, count):
+    """
+    Return the subsets of a given size in colex order, the order their ranks follow.
+
+    Parameters:
+    - items (int): The number of items.
+    - count (int): The size of each subset.
+
+    Returns:
+    - list: Each subset as an increasing tuple of item positions.
+    """
+    found = _SUBSETS.get((items, count))
+    if found is None:
+        found = sorted(itertools.combinations(range(items), count), key=lambda subset: subset[::-1])
+        _SUBSETS[(items, count)] = found
+    return found
+
+
+class SymmetryGroup:
+    """
+    A group of symmetries of the board, with the canonical positions and dense indices it defines.
+
+    The canonical masks of each piece count are listed the first time they are needed and kept.
+    """
+    __slots__ = ('permutations', 'images', 'inverse_images', 'masks', 'ranks')
+
+    def __init__(self, permutations):
+        """
+        Initializes the group from its relabellings.
+
+        Parameters:
+        - permutations (tuple): The image of each point under every symmetry, the identity first.
+        """
+        self.permutations = permutations
+        # The identity is left out, so a group of one symmetry does no work
+        self.images = tuple(_byte_images(permutation) for permutation in permutations[1:])
+        self.inverse_images = tuple(
+            _byte_images(tuple(sorted(range(NUM_POINTS), key=permutation.__getitem__)))
+            for permutation in permutations[1:]
+        )
+        self.masks = {}
+        self.ranks = {}
+
+    def __len__(self):
+        """
+        Return the number of symmetries in the group.
+
+        Returns:
+        - int: The number of symmetries, the identity included.
+        """
+        return len(self.permutations)
+
+    def orbit(self, white, black):
+        """
+        Return every position a symmetry maps a position to.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Returns:
+        - set: The distinct (white, black) images, the position itself included.
+        """
+        members = {(white, black)}
+        for low, middle, high in self.images:
+            members.add((low[white & 0xFF] | middle[white >> 8 & 0xFF] | high[white >> 16],
+                         low[black & 0xFF] | middle[black >> 8 & 0xFF] | high[black >> 16]))
+        return members
+
+    def canonicalize(self, white, black):
+        """
+        Return the canonical member of a position's symmetry class.
+
+        The canonical position has the smallest occupied mask, and among those the smallest white mask.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Returns:
+        - tuple: The canonical (white, black) masks.
+        """
+        occupied = best_occupied = white | black
+        best_white = white
+        for low, middle, high in self.images:
+            image = low[occupied & 0xFF] | middle[occupied >> 8 & 0xFF] | high[occupied >> 16]
+            if image <= best_occupied:
+                image_white = low[white & 0xFF] | middle[white >> 8 & 0xFF] | high[white >> 16]
+                if image < best_occupied or image_white < best_white:
+                    best_occupied, best_white = image, image_white
+        return best_white, best_occupied ^ best_white
+
+    def canonical_symmetry(self, white, black):
+        """
+        Return the number of the symmetry that maps a position to its canonical member.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Returns:
+        - int: The number of the symmetry, 0 for the identity.
+        """
+        occupied = best_occupied = white | black
+        best_white = white
+        best = 0
+        for number, (low, middle, high) in enumerate(self.images, 1):
+            image = low[occupied & 0xFF] | middle[occupied >> 8 & 0xFF] | high[occupied >> 16]
+            if image <= best_occupied:
+                image_white = low[white & 0xFF] | middle[white >> 8 & 0xFF] | high[white >> 16]
+                if image < best_occupied or image_white < best_white:
+                    best_occupied, best_white, best = image, image_white, number
+        return best
+
+    def transform(self, mask, number, inverse=False):
+        """
+        Map a mask through one of the symmetries.
+
+        Parameters:
+        - mask (int): A bitmask of points.
+        - number (int): The number of the symmetry, 0 for the identity.
+        - inverse (bool): True to map through the inverse of the symmetry.
+
+        Returns:
+        - int: The bitmask of the image points.
+        """
+        if not number:
+            return mask
+        low, middle, high = (self.inverse_images if inverse else self.images)[number - 1]
+        return low[mask & 0xFF] | middle[mask >> 8 & 0xFF] | high[mask >> 16]
+
+    def key(self, white, black):
+        """
+        Return a key shared by every position in a symmetry class, for sparse stores such as books.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Returns:
+        - int: The canonical white mask in the low 23 bits and the canonical black mask above them.
+        """
+        white, black = self.canonicalize(white, black)
+        return white | black << NUM_POINTS
+
+    def canonical_masks(self, pieces):
+        """
+        Return the canonical occupied masks with the given number of pieces, in increasing order.
+
+        The position of a mask in this list is its rank.
+
+        Parameters:
+        - pieces (int): The number of occupied points.
+
+        Returns:
+        - list: The canonical masks.
+        """
+        masks = self.masks.get(pieces)
+        if masks is None:
+            masks = []
+            for points in itertools.combinations(range(NUM_POINTS), pieces):
+                mask = sum(1 << point for point in points)
+                if self.canonicalize(mask, 0)[0] == mask:
+                    masks.append(mask)
+            masks.sort()
+            self.masks[pieces] = masks
+            self.ranks[pieces] = {mask: rank for rank, mask in enumerate(masks)}
+        return masks
+
+    def index_size(self, whites, blacks):
+        """
+        Return the number of indices for positions with the given material.
+
+        Parameters:
+        - whites (int): The number of white pieces.
+        - blacks (int): The number of black pieces.
+
+        Returns:
+        - int: One more than the largest index.
+        """
+        return len(self.canonical_masks(whites + blacks)) * _COMB[whites + blacks][whites]
+
+    def canonical_index(self, white, black):
+        """
+        Return the dense index of a position that is already canonical.
+
+        Parameters:
+        - white (int): The canonical bitmask of white pieces.
+        - black (int): The canonical bitmask of black pieces.
+
+        Returns:
+        - int: The index of the position.
+        """
+        occupied = white | black
+        pieces = occupied.bit_count()
+        ranks = self.ranks.get(pieces)
+        if ranks is None:
+            self.canonical_masks(pieces)
+            ranks = self.ranks[pieces]
+        # Colex rank of the white pieces among the occupied points
+        rank = 0
+        chosen = 0
+        item = 0
+        remaining = occupied
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if white & bit:
+                chosen += 1
+                rank += _COMB[item][chosen]
+            item += 1
+        return ranks[occupied] * _COMB[pieces][chosen] + rank
+
+    def index(self, white, black):
+        """
+        Return the dense index of a position, shared by every position in its symmetry class.
+
+        Parameters:
+        - white (int): The bitmask of white pieces.
+        - black (int): The bitmask of black pieces.
+
+        Returns:
+        - int: The index of the position.
+        """
+        return self.canonical_index(*self.canonicalize(white, black))
+
+    def position_at(self, index, whites, blacks):
+        """
+        Return the position with a given dense index.
+
+        Parameters:
+        - index (int): The index of the position.
+        - whites (int): The number of white pieces.
+        - blacks (int): The number of black pieces.
+
+        Returns:
+        - tuple: The (white, black) masks. Indices a symmetric occupied mask leaves unused give a
+          position that is not canonical.
+        """
+        pieces = whites + blacks
+        width = _COMB[pieces][whites]
+        occupied = self.canonical_masks(pieces)[index // width]
+        points = [1 << point for point in range(NUM_POINTS) if occupied >> point & 1]
+        white = sum(points[item] for item in subsets(pieces, whites)[index % width])
+        return white, occupied ^ white
+
+
+# Symmetries valid while neither player slides, and those valid for every position
+MILL_SYMMETRIES = SymmetryGroup(_automorphisms(None))
+BOARD_SYMMETRIES = SymmetryGroup(_automorphisms(tuple(set(neighbors) for neighbors in NEIGHBORS)))
+
+
+def symmetries_for(sliding):
+    """
+    Return the symmetries that apply to a position.
+
+    Parameters:
+    - sliding (bool): True if either player moves by sliding to a neighbouring point.
+
+    Returns:
+    - SymmetryGroup: MILL_SYMMETRIES, or BOARD_SYMMETRIES if a player slides.
+    """
+    return BOARD_SYMMETRIES if sliding else MILL_SYMMETRIES
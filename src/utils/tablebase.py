@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+
+# Retrograde tablebase for the movement phase with few pieces per side. The search classes only
+# ever generate white moves, but the tablebase solves the real game: the players alternate, a player
+# with three pieces hops, a mill removes an opponent piece, and a player reduced to two pieces or
+# left without a move loses. Positions are stored from the point of view of the side to move, so one
+# table of a-vs-b material serves both colours.
+#
+# File layout (little endian): the magic b'NMTB', the version and the number of tables (two uint16),
+# then for every table its material (two uint8 and two bytes of padding) and the offset and length of
+# its data (two uint64), then the data. A table of a-vs-b material holds one byte per dense index of
+# utils.symmetry, with the side to move as white; tables where neither side slides are reduced by the
+# mill symmetries. A byte of 0 is a draw, 1-127 a win and 128-255 a loss for the side to move, with the
+# distance to the result in plies in the low seven bits.
+
+import mmap
+import os
+import struct
+from array import array
+
+from utils.bitboard import FULL_MASK, board_to_masks, masks_to_board, close_mill
+from utils.board import Board
+from utils.position import Position, removable_pieces, iter_moves_midgame_endgame
+from utils.symmetry import symmetries_for, subsets
+from utils.topology import NEIGHBOR_MASKS, MILL_MASKS
+
+MAGIC = b'NMTB'
+VERSION = 2
+HEADER = struct.Struct('<4sHH')
+TABLE_ENTRY = struct.Struct('<BBxxQQ')
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+LOSS_FLAG = 128
+MAX_DISTANCE = 127
+
+# Score returned for a won position, less one per ply to the win, matching static_estimation_midgame_endgame
+TABLEBASE_WIN = 10000
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'tablebase.bin'
+)
+
+_completions = {}
+
+
+def table_symmetries(material):
+    """
+    Return the symmetries that reduce a table: the mill symmetries while both sides hop.
+
+    Parameters:
+    - material (tuple): The (mover, opponent) piece counts.
+
+    Returns:
+    - SymmetryGroup: The symmetries from utils.symmetry.
+    """
+    return symmetries_for(max(material) > 3)
+
+
+def mill_completions(mask):
+    """
+    Return the points that would complete a mill of the mask.
+
+    Parameters:
+    - mask (int): The bitmask of one player's pieces.
+
+    Returns:
+    - int: The bitmask of empty points lying on a mill whose other two points are in the mask.
+    """
+    completions = _completions.get(mask)
+    if completions is None:
+        completions = 0
+        for mill in MILL_MASKS:
+            rest = mill & ~mask
+            if rest and not rest & (rest - 1):
+                completions |= rest
+        _completions[mask] = completions
+    return completions
+
+
+def encode_result(result, distance):
+    """
+    Encode a result and its distance as a table byte.
+
+    Parameters:
+    - result (int): WIN, DRAW or LOSS for the side to move.
+    - distance (int): The number of plies to the result.
+
+    Returns:
+    - int: The table byte.
+
+    Raises:
+    - ValueError: If the distance does not fit in seven bits.
+    """
+    if result == DRAW:
+        return 0
+    if distance > MAX_DISTANCE:
+        raise ValueError(f"Distance {distance} does not fit in the tablebase format")
+    return distance if result == WIN else LOSS_FLAG | distance
+
+
+def decode_result(value):
+    """
+    Decode a table byte.
+
+    Parameters:
+    - value (int): The table byte.
+
+    Returns:
+    - tuple: The result (WIN, DRAW or LOSS) for the side to move and the distance in plies.
+    """
+    if value == 0:
+        return DRAW, 0
+    if value & LOSS_FLAG:
+        return LOSS, value & MAX_DISTANCE
+    return WIN, value
+
+
+def _initialize(material, tables, values, counts, candidates, externals, progress):
+    """
+    Count the moves of every position of one table and settle what the already solved tables decide.
+
+    Quiet moves stay within the group being solved and are only counted. Captures lead to a solved table
+    with one piece fewer, or to a won position when the opponent is left with two pieces.
+
+    Parameters:
+    - material (tuple): The (mover, opponent) piece counts of the table.
+    - tables (dict): The solved tables by material.
+    - values (bytearray): The results of the table, filled in here where already known.
+    - counts (array): The number of moves of each position not yet known to lose, times its orbit size.
+    - candidates (bytearray): The shortest win each position has through a capture, or 0.
+    - externals (bytearray): The longest loss each position has through a capture, or 0.
+    - progress (Callable[[str], None]): Receives progress messages.
+
+    Returns:
+    - int: The largest distance scheduled.
+    """
+    movers, opponents = material
+    hopping = movers == 3
+    symmetries = table_symmetries(material)
+    capture_table = tables.get((opponents - 1, movers))
+    capture_symmetries = table_symmetries((opponents - 1, movers))
+    width = len(subsets(movers + opponents, movers))
+    furthest = 0
+    for occupied_rank, occupied in enumerate(symmetries.canonical_masks(movers + opponents)):
+        points = [1 << point for point in range(occupied.bit_length()) if occupied >> point & 1]
+        for chosen_rank, chosen in enumerate(subsets(movers + opponents, movers)):
+            mover = sum(points[item] for item in chosen)
+            opponent = occupied ^ mover
+            if symmetries.canonicalize(mover, opponent) != (mover, opponent):
+                # A symmetric occupied mask leaves this index unused
+                continue
+            index = occupied_rank * width + chosen_rank
+            empty = ~(mover | opponent) & FULL_MASK
+            total = 0
+            shortest_win = 0
+            longest_loss = 0
+            removable = None
+            pieces = mover
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                rest = mover ^ bit
+                targets = empty if hopping else NEIGHBOR_MASKS[bit.bit_length() - 1] & empty
+                closing = targets & mill_completions(rest)
+                total += (targets ^ closing).bit_count()
+                while closing:
+                    target = closing & -closing
+                    closing ^= target
+                    if removable is None:
+                        removable = removable_pieces(opponent)
+                    if opponents == 3:
+                        # The opponent is left with two pieces
+                        shortest_win = 1
+                        break
+                    moved = rest | target
+                    victims = removable
+                    while victims:
+                        victim = victims & -victims
+                        victims ^= victim
+                        total += 1
+                        value = capture_table[capture_symmetries.index(opponent ^ victim, moved)]
+                        if not value:
+                            continue
+                        if value & LOSS_FLAG:
+                            distance = (value & MAX_DISTANCE) + 1
+                            if not shortest_win or distance < shortest_win:
+                                shortest_win = distance
+                        else:
+                            total -= 1
+                            longest_loss = max(longest_loss, value)
+                if shortest_win == 1:
+                    break
+            if shortest_win == 1:
+                values[index] = 1
+                furthest = max(furthest, 1)
+            elif total == 0:
+                values[index] = encode_result(LOSS, longest_loss + 1 if longest_loss else 0)
+                furthest = max(furthest, values[index] & MAX_DISTANCE)
+            else:
+                counts[index] = total * len(symmetries.orbit(mover, opponent))
+                externals[index] = longest_loss
+                if shortest_win:
+                    candidates[index] = shortest_win
+                    furthest = max(furthest, shortest_win)
+    progress(f"{movers}v{opponents}: moves counted")
+    return furthest
+
+
+def _solve_group(group, tables, progress):
+    """
+    Solve the tables of one total piece count together by retrograde analysis.
+
+    Positions are settled in order of distance. A position lost in d plies makes every predecessor
+    a win in d + 1; a position won in d plies uses up one move of each predecessor, and a predecessor
+    with no moves left is lost. Positions never settled are draws. Only one member of each symmetry
+    class is stored, so a move count is kept times the size of the position's class, and each class
+    won uses up the size of its own class from every predecessor it is reached from.
+
+    Parameters:
+    - group (list): The materials to solve; quiet moves only lead from one to another.
+    - tables (dict): The solved tables with one piece fewer, by material.
+    - progress (Callable[[str], None]): Receives progress messages.
+
+    Returns:
+    - dict: The new tables by material.
+    """
+    values, counts, candidates, externals = {}, {}, {}, {}
+    furthest = 0
+    for material in group:
+        size = table_symmetries(material).index_size(*material)
+        values[material] = bytearray(size)
+        counts[material] = array('H', bytes(2 * size))
+        candidates[material] = bytearray(size)
+        externals[material] = bytearray(size)
+        furthest = max(furthest, _initialize(
+            material, tables, values[material], counts[material], candidates[material], externals[material],
+            progress
+        ))
+
+    distance = 0
+    while distance <= furthest:
+        settled = 0
+        for material in group:
+            table_values = values[material]
+            table_candidates = candidates[material]
+            index = table_candidates.find(distance) if distance else -1
+            while index != -1:
+                if not table_values[index]:
+                    table_values[index] = distance
+                index = table_candidates.find(distance, index + 1)
+
+        for material in group:
+            movers, opponents = material
+            symmetries = table_symmetries(material)
+            # Predecessors have the opponent to move and the colours of this table swapped
+            predecessor_values = values[(opponents, movers)]
+            predecessor_counts = counts[(opponents, movers)]
+            predecessor_externals = externals[(opponents, movers)]
+            hopping = opponents == 3
+            for code in ((distance, LOSS_FLAG | distance) if distance else (LOSS_FLAG,)):
+                lost = bool(code & LOSS_FLAG)
+                table_values = values[material]
+                index = table_values.find(code)
+                while index != -1:
+                    settled += 1
+                    mover, opponent = symmetries.position_at(index, movers, opponents)
+                    # Counts are scaled by orbit sizes, so each class is reached from its own members only
+                    weight = len(symmetries.orbit(mover, opponent))
+                    empty = ~(mover | opponent) & FULL_MASK
+                    pieces = opponent
+                    while pieces:
+                        bit = pieces & -pieces
+                        pieces ^= bit
+                        target = bit.bit_length() - 1
+                        if close_mill(target, opponent):
+                            # The move into this point closed a mill, so it was a capture
+                            continue
+                        rest = opponent ^ bit
+                        sources = empty if hopping else NEIGHBOR_MASKS[target] & empty
+                        while sources:
+                            source = sources & -sources
+                            sources ^= source
+                            predecessor = symmetries.index(rest | source, mover)
+                            if predecessor_values[predecessor]:
+                                continue
+                            if lost:
+                                predecessor_values[predecessor] = encode_result(WIN, distance + 1)
+                                furthest = max(furthest, distance + 1)
+                            else:
+                                remaining = predecessor_counts[predecessor] - weight
+                                predecessor_counts[predecessor] = remaining
+                                if not remaining:
+                                    loss = max(distance, predecessor_externals[predecessor]) + 1
+                                    predecessor_values[predecessor] = encode_result(LOSS, loss)
+                                    furthest = max(furthest, loss)
+                    index = table_values.find(code, index + 1)
+        names = ', '.join(f'{a}v{b}' for a, b in group)
+        progress(f"{names}: {settled} positions settled at distance {distance}")
+        distance += 1
+    return values
+
+
+def build_tablebase(materials, output_file, progress=print):
+    """
+    Solve the tables for the given materials and write them to a file.
+
+    Each material is solved for both sides to move. The tables one piece smaller that captures lead to
+    must be requested too, down to three pieces per side.
+
+    Parameters:
+    - materials (list): (a, b) piece counts such as (3, 3) and (3, 4).
+    - output_file (str): The path of the tablebase file to write.
+    - progress (Callable[[str], None]): Receives progress messages.
+
+    Returns:
+    - dict: The solved tables by material.
+
+    Raises:
+    - ValueError: If a material has fewer than three pieces a side or a table it depends on is missing.
+    """
+    wanted = set()
+    for a, b in materials:
+        if a < 3 or b < 3:
+            raise ValueError(f"{a}v{b}: both sides need at least three pieces")
+        wanted.update(((a, b), (b, a)))
+    for a, b in wanted:
+        if b - 1 >= 3 and (b - 1, a) not in wanted:
+            raise ValueError(f"{a}v{b} needs the {b - 1}v{a} table")
+
+    tables = {}
+    for total in sorted({a + b for a, b in wanted}):
+        group = sorted(material for material in wanted if sum(material) == total)
+        tables.update(_solve_group(group, tables, progress))
+    write_tablebase(output_file, tables)
+    return tables
+
+
+def write_tablebase(output_file, tables):
+    """
+    Write solved tables in the tablebase file format.
+
+    Parameters:
+    - output_file (str): The path of the file to write.
+    - tables (dict): The table data by material.
+
+    Returns:
+    - None
+    """
+    materials = sorted(tables)
+    offset = HEADER.size + TABLE_ENTRY.size * len(materials)
+    with open(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(materials)))
+        for material in materials:
+            f.write(TABLE_ENTRY.pack(material[0], material[1], offset, len(tables[material])))
+            offset += len(tables[material])
+        for material in materials:
+            f.write(tables[material])
+
+
+class Tablebase:
+    """
+    A tablebase file opened for probing.
+
+    The file is memory-mapped, so only the pages actually probed are read from disk.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Open and map a tablebase file.
+
+        Parameters:
+        - path (str): The path of the tablebase file.
+
+        Raises:
+        - ValueError: If the file is not a tablebase of this version.
+        """
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self.tables = {}
+        for entry in range(count):
+            movers, opponents, offset, _ = TABLE_ENTRY.unpack_from(
+                self.data, HEADER.size + entry * TABLE_ENTRY.size
+            )
+            self.tables[(movers, opponents)] = offset
+
+    def covers(self, mover, opponent):
+        """
+        Check whether a position's material is in the tablebase.
+
+        Parameters:
+        - mover (int): The bitmask of the pieces of the side to move.
+        - opponent (int): The bitmask of the opponent's pieces.
+
+        Returns:
+        - bool: True if the position can be probed.
+        """
+        return (mover.bit_count(), opponent.bit_count()) in self.tables
+
+    def probe(self, mover, opponent):
+        """
+        Look up the result of a position.
+
+        Parameters:
+        - mover (int): The bitmask of the pieces of the side to move.
+        - opponent (int): The bitmask of the opponent's pieces.
+
+        Returns:
+        - tuple: The result (WIN, DRAW or LOSS) for the side to move and the distance in plies, or None if
+          the material is not in the tablebase.
+        """
+        offset = self.tables.get((mover.bit_count(), opponent.bit_count()))
+        if offset is None:
+            return None
+        symmetries = table_symmetries((mover.bit_count(), opponent.bit_count()))
+        return decode_result(self.data[offset + symmetries.index(mover, opponent)])
+
+    def best_move(self, mover, opponent):
+        """
+        Find the best move of the side to move: the fastest win, else a draw, else the slowest loss.
+
+        Parameters:
+        - mover (int): The bitmask of the pieces of the side to move.
+        - opponent (int): The bitmask of the opponent's pieces.
+
+        Returns:
+        - tuple: The result, distance and (from, to, removed) move, or None if the material is not in the
+          tablebase or the side to move has no move.
+        """
+        if not self.covers(mover, opponent):
+            return None
+        best = None
+        for move in iter_moves_midgame_endgame(Position(mover, opponent)):
+            source, target, removed = move
+            moved = mover ^ 1 << source | 1 << target
+            remaining = opponent ^ 1 << removed if removed >= 0 else opponent
+            if remaining.bit_count() < 3:
+                result, distance = WIN, 1
+            else:
+                reply = self.probe(remaining, moved)
+                if reply is None:
+                    return None
+                result, distance = -reply[0], reply[1] + 1
+            # Prefer the better result, then the shorter win or the longer loss
+            rank = (result, -distance if result == WIN else distance)
+            if best is None or rank > best[0]:
+                best = rank, result, distance, move
+        if best is None:
+            return None
+        return best[1:]
+
+    def close(self):
+        """
+        Unmap the file.
+
+        Returns:
+        - None
+        """
+        self.data.close()
+
+
+_default_tablebase = None
+_default_loaded = False
+
+
+def default_tablebase():
+    """
+    Return the tablebase probed by the search classes, opening DEFAULT_PATH on first use.
+
+    Returns:
+    - Tablebase: The tablebase, or None if there is no tablebase file.
+    """
+    global _default_tablebase, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        if os.path.exists(DEFAULT_PATH):
+            _default_tablebase = Tablebase(DEFAULT_PATH)
+    return _default_tablebase
+
+
+def set_tablebase(tablebase):
+    """
+    Replace the tablebase probed by the search classes.
+
+    Parameters:
+    - tablebase (Tablebase): The tablebase to probe, or None to stop probing.
+
+    Returns:
+    - None
+    """
+    global _default_tablebase, _default_loaded
+    _default_tablebase = tablebase
+    _default_loaded = True
+
+
+def probe_tablebase(board, colour='W'):
+    """
+    Answer a movement-phase position from the tablebase instead of searching it.
+
+    Parameters:
+    - board (list): The current board configuration.
+    - colour (str): The colour to move, 'W' or 'B'.
+
+    Returns:
+    - tuple: The score for the side to move (TABLEBASE_WIN less the distance for a win, its negation for a
+      loss, 0 for a draw) and the board after the best move, or None if the tablebase does not cover
+      the position.
+    """
+    tablebase = default_tablebase()
+    if tablebase is None:
+        return None
+    white, black = board_to_masks(board)
+    mover, opponent = (white, black) if colour == 'W' else (black, white)
+    found = tablebase.best_move(mover, opponent)
+    if found is None:
+        return None
+    result, distance, (source, target, removed) = found
+    mover = mover ^ 1 << source | 1 << target
+    if removed >= 0:
+        opponent ^= 1 << removed
+    score = result * (TABLEBASE_WIN - distance) if result != DRAW else 0
+    return score, Board(mover, opponent) if colour == 'W' else Board(opponent, mover)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Static tables describing the lines and mills of the board. Points are numbered 0-22 as
+# in position_mapping ('a' is 0, 'w' is 22). Everything here is computed once at import
+# so adjacency and mill detection become a table lookup or a mask test instead of a
+# chain of comparisons, and nothing is allocated when they are read.
+
+NUM_POINTS = 23
+
+# Neighbouring points of every point, and the same adjacency as bitmasks
+NEIGHBORS = (
+    (1, 3, 8), (0, 2, 4), (1, 5, 13), (0, 4, 6, 9), (1, 3, 5), (2, 4, 7, 12),
+    (3, 7, 10), (5, 6, 11), (0, 9, 20), (3, 8, 10, 17), (6, 9, 14), (7, 12, 16),
+    (5, 11, 13, 19), (2, 12, 22), (10, 15, 17), (14, 16, 18), (11, 15, 19),
+    (9, 14, 18, 20), (15, 17, 21), (12, 16, 22), (8, 17, 21), (18, 20, 22), (13, 19, 21)
+)
+NEIGHBOR_MASKS = tuple(sum(1 << neighbor for neighbor in neighbors) for neighbors in NEIGHBORS)
+
+# For each point, the slides of a piece standing on it as (target, mask) pairs, where the mask has
+# the source and target bits set, so XOR-ing it into a player's mask plays the slide
+SLIDES = tuple(
+    tuple((neighbor, 1 << point | 1 << neighbor) for neighbor in neighbors)
+    for point, neighbors in enumerate(NEIGHBORS)
+)
+
+# Every mill on the board as a triple of point indices
+MILLS = (
+    (0, 1, 2), (0, 3, 6), (0, 8, 20), (2, 5, 7), (2, 13, 22), (3, 4, 5),
+    (3, 9, 17), (5, 12, 19), (6, 10, 14), (7, 11, 16), (8, 9, 10), (11, 12, 13),
+    (14, 15, 16), (14, 17, 20), (15, 18, 21), (16, 19, 22), (17, 18, 19), (20, 21, 22)
+)
+
+# Bitmask of every mill
+MILL_MASKS = tuple((1 << a) | (1 << b) | (1 << c) for a, b, c in MILLS)
+
+# For each point, the indices into MILLS of the mills running through it
+POINT_MILLS = tuple(
+    tuple(index for index, mill in enumerate(MILLS) if point in mill)
+    for point in range(NUM_POINTS)
+)
+
+# For each point, the masks of the mills running through it
+POINT_MILL_MASKS = tuple(
+    tuple(MILL_MASKS[index] for index in mills) for mills in POINT_MILLS
+)
+
+# For each point, the two other points of every mill running through it
+MILL_PARTNERS = tuple(
+    tuple(tuple(other for other in MILLS[index] if other != point) for index in mills)
+    for point, mills in enumerate(POINT_MILLS)
+)
+
+
+def mill_pieces(mask):
+    """
+    Return the points of the mask that are part of a mill lying entirely inside the mask.
+
+    Parameters:
+    - mask (int): The bitmask of points to test, usually one player's pieces.
+
+    Returns:
+    - int: The bitmask of points covered by a complete mill.
+    """
+    covered = 0
+    for mill in MILL_MASKS:
+        if mask & mill == mill:
+            covered |= mill
+    return covered
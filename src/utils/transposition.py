@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+
+import random
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+from utils.topology import NUM_POINTS
+
+
+# Bound types stored with every entry; 0 marks an empty slot
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# Bytes used by one slot across the key, value, move, depth and flag arrays
+ENTRY_BYTES = 8 + 8 + 8 + 1 + 1
+
+KEY_MASK = (1 << 64) - 1
+
+# Zobrist keys for a piece of each colour on every point, plus one for the side to move.
+# The seed is fixed so keys are identical across runs and processes.
+_zobrist_random = random.Random(0x9E3779B97F4A7C15)
+ZOBRIST_WHITE = tuple(_zobrist_random.getrandbits(64) for _ in range(NUM_POINTS))
+ZOBRIST_BLACK = tuple(_zobrist_random.getrandbits(64) for _ in range(NUM_POINTS))
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+
+
+def zobrist_key(board):
+    """
+    Compute the Zobrist key of a position from scratch, with the maximizing side to move.
+
+    Search positions keep their key up to date incrementally as moves are made and taken back.
+
+    Parameters:
+    - board (tuple): The (white, black) bitmask pair.
+
+    Returns:
+    - int: The 64-bit Zobrist key of the position.
+    """
+    key = 0
+    for location in range(NUM_POINTS):
+        if board[0] >> location & 1:
+            key ^= ZOBRIST_WHITE[location]
+        elif board[1] >> location & 1:
+            key ^= ZOBRIST_BLACK[location]
+    return key
+
+
+def pack_move(move):
+    """
+    Pack a (from, to, removed) move into a single integer for storage.
+
+    Parameters:
+    - move (tuple): The (from, to, removed) move, or None.
+
+    Returns:
+    - int: The packed move, or -1 for None.
+    """
+    if move is None:
+        return -1
+    return (move[0] + 1) | (move[1] + 1) << 5 | (move[2] + 1) << 10
+
+
+def unpack_move(packed):
+    """
+    Unpack a move stored with pack_move.
+
+    Parameters:
+    - packed (int): The packed move.
+
+    Returns:
+    - tuple: The (from, to, removed) move, or None if nothing was stored.
+    """
+    if packed < 0:
+        return None
+    return (packed & 31) - 1, (packed >> 5 & 31) - 1, (packed >> 10 & 31) - 1
+
+
+def bound_flag(value, alpha, beta):
+    """
+    Classify a fail-soft alpha-beta result against the window it was searched with.
+
+    Parameters:
+    - value (float): The value returned by the search.
+    - alpha (float): The alpha value the node was entered with.
+    - beta (float): The beta value the node was entered with.
+
+    Returns:
+    - int: UPPER if the search failed low, LOWER if it failed high, EXACT otherwise.
+    """
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
+
+
+def table_size(memory_mb):
+    """
+    Return the number of slots a table may use under a memory cap, rounded down to a power of two.
+
+    Parameters:
+    - memory_mb (float): The memory cap for the table in megabytes.
+
+    Returns:
+    - int: The number of slots.
+    """
+    slots = max(2, int(memory_mb * 1024 * 1024) // ENTRY_BYTES)
+    return 1 << (slots.bit_length() - 1)
+
+
+class TranspositionTable:
+    """
+    A fixed-size transposition table shared by the Alpha-Beta search classes.
+
+    Slots are kept in flat typed arrays sized from a memory cap. Each key maps to a bucket of two slots:
+    the first keeps the deepest result seen for the bucket and the second always takes the newest one.
+    An entry is only used for a node searched to exactly the same depth, so a search with the table
+    returns the same value as the search without it.
+    """
+    def __init__(self, memory_mb=16):
+        """
+        Allocate the table.
+
+        Parameters:
+        - memory_mb (float): The memory cap for the table in megabytes.
+        """
+        self.size = table_size(memory_mb)
+        self.bucket_mask = (self.size >> 1) - 1
+        self._allocate()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _allocate(self):
+        """
+        Create the slot arrays.
+
+        Returns:
+        - None
+        """
+        self.keys = array('Q', bytes(8 * self.size))
+        self.values = array('d', bytes(8 * self.size))
+        self.moves = array('q', bytes(8 * self.size))
+        self.depths = array('b', bytes(self.size))
+        self.flags = array('b', bytes(self.size))
+
+    def probe(self, key, depth):
+        """
+        Look up a position searched to the given depth.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+
+        Returns:
+        - tuple: The (flag, value, packed best move) of the entry, or None on a miss.
+        """
+        slot = self.find(key, depth)
+        if slot < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value = self.values[slot]
+        # Scores are integers apart from the infinities of positions without moves
+        if value.is_integer():
+            value = int(value)
+        return self.flags[slot], value, self.moves[slot]
+
+    def find(self, key, depth):
+        """
+        Locate the slot holding a position searched to the given depth without touching the statistics.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+
+        Returns:
+        - int: The slot index, or -1 if the position is not stored.
+        """
+        index = (key & self.bucket_mask) << 1
+        for slot in (index, index + 1):
+            if self.flags[slot] and self.keys[slot] == key and self.depths[slot] == depth:
+                return slot
+        return -1
+
+    def exact_value(self, key, depth):
+        """
+        Return the exact value stored for a position searched to the given depth, without touching the
+        statistics.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+
+        Returns:
+        - float: The value, or None if the position is not stored with an exact value.
+        """
+        slot = self.find(key, depth)
+        if slot < 0 or self.flags[slot] != EXACT:
+            return None
+        value = self.values[slot]
+        return int(value) if value.is_integer() else value
+
+    def hash_move(self, key):
+        """
+        Return the best move stored for a position at any depth, preferring the deepest search.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+
+        Returns:
+        - tuple: The stored (from, to, removed) best move, or None.
+        """
+        index = (key & self.bucket_mask) << 1
+        move, move_depth = -1, -1
+        for slot in (index, index + 1):
+            if (self.flags[slot] and self.keys[slot] == key and self.moves[slot] >= 0
+                    and self.depths[slot] > move_depth):
+                move, move_depth = self.moves[slot], self.depths[slot]
+        return unpack_move(move)
+
+    def principal_variation(self, position, depth):
+        """
+        Follow the stored best moves from a position to recover the principal variation.
+
+        Parameters:
+        - position (Position): The position at the start of the line; it is left unchanged.
+        - depth (int): The depth the position was searched to.
+
+        Returns:
+        - list: The (from, to, removed) moves along the principal variation, one per ply.
+        """
+        line = []
+        while depth > 0:
+            slot = self.find(position.key, depth)
+            if slot < 0 or self.moves[slot] < 0:
+                break
+            move = unpack_move(self.moves[slot])
+            line.append(move)
+            position.make_move(move)
+            depth -= 1
+        for move in reversed(line):
+            position.unmake_move(move)
+        return line
+
+    def store(self, key, depth, flag, value, move):
+        """
+        Store a search result, replacing older entries in the key's bucket.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+        - flag (int): EXACT, LOWER or UPPER.
+        - value (float): The value returned by the search.
+        - move (int): The packed best move, or -1.
+
+        Returns:
+        - None
+        """
+        slot = (key & self.bucket_mask) << 1
+        if self.flags[slot] and self.keys[slot] != key and depth < self.depths[slot]:
+            slot += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.moves[slot] = move
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.stores += 1
+
+    def clear(self):
+        """
+        Empty the table and reset its statistics.
+
+        Returns:
+        - None
+        """
+        self.flags[:] = array('b', bytes(self.size))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    A transposition table kept in a shared memory block so that several processes search with it at once.
+
+    Processes store entries without locking, so a slot can be read while another process is half way
+    through writing it. Every slot therefore holds its key XORed with a checksum of the rest of the
+    entry, and a slot whose checksum does not match is treated as empty. The process that creates the
+    table must call unlink once every process has called close.
+    """
+    def __init__(self, memory_mb=16, name=None):
+        """
+        Create a new shared table or attach to an existing one.
+
+        Parameters:
+        - memory_mb (float): The memory cap for the table in megabytes; must match the creator's.
+        - name (str): The name of the shared memory block to attach to, or None to create one.
+        """
+        size = table_size(memory_mb) * ENTRY_BYTES
+        if name is None:
+            self.shared_memory = SharedMemory(create=True, size=size)
+        else:
+            self.shared_memory = SharedMemory(name=name)
+        self.name = self.shared_memory.name
+        super().__init__(memory_mb)
+
+    def _allocate(self):
+        """
+        Lay the slot arrays out over the shared memory block.
+
+        Returns:
+        - None
+        """
+        buffer = self.shared_memory.buf
+        size = self.size
+        self.keys = buffer[:8 * size].cast('Q')
+        self.values = buffer[8 * size:16 * size].cast('d')
+        self.moves = buffer[16 * size:24 * size].cast('q')
+        self.depths = buffer[24 * size:25 * size].cast('b')
+        self.flags = buffer[25 * size:26 * size].cast('b')
+
+    def _entry(self, slot):
+        """
+        Read a slot once and check that it was not torn by a concurrent store.
+
+        Parameters:
+        - slot (int): The slot index.
+
+        Returns:
+        - tuple: The (key, flag, value, packed move, depth) of the slot, or None if it is empty or torn.
+        """
+        flag = self.flags[slot]
+        if not flag:
+            return None
+        value, move, depth = self.values[slot], self.moves[slot], self.depths[slot]
+        key = self.keys[slot] ^ hash((value, move, depth, flag)) & KEY_MASK
+        return key, flag, value, move, depth
+
+    def probe(self, key, depth):
+        """
+        Look up a position searched to the given depth.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+
+        Returns:
+        - tuple: The (flag, value, packed best move) of the entry, or None on a miss.
+        """
+        index = (key & self.bucket_mask) << 1
+        for slot in (index, index + 1):
+            entry = self._entry(slot)
+            if entry is not None and entry[0] == key and entry[4] == depth:
+                self.hits += 1
+                value = entry[2]
+                if value.is_integer():
+                    value = int(value)
+                return entry[1], value, entry[3]
+        self.misses += 1
+        return None
+
+    def find(self, key, depth):
+        """
+        Locate the slot holding a position searched to the given depth without touching the statistics.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+
+        Returns:
+        - int: The slot index, or -1 if the position is not stored.
+        """
+        index = (key & self.bucket_mask) << 1
+        for slot in (index, index + 1):
+            entry = self._entry(slot)
+            if entry is not None and entry[0] == key and entry[4] == depth:
+                return slot
+        return -1
+
+    def hash_move(self, key):
+        """
+        Return the best move stored for a position at any depth, preferring the deepest search.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+
+        Returns:
+        - tuple: The stored (from, to, removed) best move, or None.
+        """
+        index = (key & self.bucket_mask) << 1
+        move, move_depth = -1, -1
+        for slot in (index, index + 1):
+            entry = self._entry(slot)
+            if entry is not None and entry[0] == key and entry[3] >= 0 and entry[4] > move_depth:
+                move, move_depth = entry[3], entry[4]
+        return unpack_move(move)
+
+    def store(self, key, depth, flag, value, move):
+        """
+        Store a search result, replacing older entries in the key's bucket.
+
+        Parameters:
+        - key (int): The Zobrist key of the position.
+        - depth (int): The remaining search depth at the node.
+        - flag (int): EXACT, LOWER or UPPER.
+        - value (float): The value returned by the search.
+        - move (int): The packed best move, or -1.
+
+        Returns:
+        - None
+        """
+        value = float(value)
+        slot = (key & self.bucket_mask) << 1
+        entry = self._entry(slot)
+        if entry is not None and entry[0] != key and depth < entry[4]:
+            slot += 1
+        self.flags[slot] = 0
+        self.values[slot] = value
+        self.moves[slot] = move
+        self.depths[slot] = depth
+        self.keys[slot] = key ^ hash((value, move, depth, flag)) & KEY_MASK
+        self.flags[slot] = flag
+        self.stores += 1
+
+    def close(self):
+        """
+        Detach this process from the shared memory block.
+
+        Returns:
+        - None
+        """
+        for view in (self.keys, self.values, self.moves, self.depths, self.flags):
+            view.release()
+        self.shared_memory.close()
+
+    def unlink(self):
+        """
+        Free the shared memory block; only the creating process should call this.
+
+        Returns:
+        - None
+        """
+        self.shared_memory.unlink()
@@ -2,9 +2,18 @@
 
 import os
 
+from utils import bitboard
+from utils.bitboard import (
+    board_to_masks, masks_to_board
+)
+from utils.board import Board
+from utils.topology import NUM_POINTS, NEIGHBORS, NEIGHBOR_MASKS, MILL_PARTNERS, mill_pieces
 
-# Global variable to keep track of positions evaluated
-positions_evaluated = 0
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time budget runs out.
+    """
 
 
 def print_board(input_file, ascii_board_file):
@@ -12,19 +21,41 @@ def print_board(input_file, ascii_board_file):
     Prints the game board of the current board positions from a string to an ascii representation.
 
     Parameters:
-    - input_file (str): The path to the file containing the initial board state.
+    - input_file (str | Board): The path to the file containing the initial board state, or the board itself.
     - ascii_board_file (str): The path to the file containing the ascii representation of the board.
 
     Returns:
     - ascii_board (str): The ascii representation of the board.
     """
-    # Read the ASCII board from the file
+    board = input_file if isinstance(input_file, Board) else open_board(input_file)
+    return render_board(board, read_ascii_board(ascii_board_file))
+
+
+def read_ascii_board(ascii_board_file):
+    """
+    Reads the ascii board template.
+
+    Parameters:
+    - ascii_board_file (str): The path to the file containing the ascii representation of the board.
+
+    Returns:
+    - str: The template with the letters 'a' to 'w' marking the board positions.
+    """
     with open(ascii_board_file, 'r') as file:
-        ascii_board = file.read()
+        return file.read()
+
 
-    # Use the open_board function to read the board state from the input file
-    board_state = open_board(input_file)
+def render_board(board, ascii_board):
+    """
+    Fills the ascii board template with the pieces of a board.
+
+    Parameters:
+    - board (Board | list): The board configuration.
+    - ascii_board (str): The ascii board template returned by read_ascii_board.
 
+    Returns:
+    - str: The ascii representation of the board.
+    """
     # Define the mapping of board positions to indices in the board state
     position_mapping = {
         'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5,
@@ -35,13 +66,12 @@ def print_board(input_file, ascii_board_file):
 
     # Replace the positions in the ASCII board with pieces from the board state
     for position, index in position_mapping.items():
-        if board_state[index] == 'x':
+        if board[index] == 'x':
             star = '•'
             ascii_board = ascii_board.replace(position, star)
         else:
-            ascii_board = ascii_board.replace(position, board_state[index])
+            ascii_board = ascii_board.replace(position, board[index])
 
-    # Print the modified board
     return ascii_board
 
 
@@ -76,7 +106,7 @@ def open_board(input_file):
     - input_file (str): The path to the file containing the initial board state.
 
     Returns:
-    - list: The board state as a list of characters.
+    - Board: The board state.
 
     Raises:
     - ValueError: If the file extension is not .txt.
@@ -98,10 +128,7 @@ def open_board(input_file):
         if not input_file.endswith('.txt'):
             raise ValueError("Input file must be a .txt file")
 
-        with open(full_path, 'r') as f:
-            board = list(f.readline().strip())
-
-        return board
+        return read_board(full_path)
     except FileNotFoundError:
         # Handle file not found error
         raise FileNotFoundError(f"The file '{input_file}' was not found in the test_files directory")
@@ -110,13 +137,49 @@ def open_board(input_file):
         raise IOError(f"{e}")
 
 
+def read_board(path):
+    """
+    Reads a board state from the first line of a file anywhere on disk.
+
+    Parameters:
+    - path (str): The path to the board file.
+
+    Returns:
+    - Board: The board state.
+
+    Raises:
+    - ValueError: If the first line is not a valid board.
+    """
+    with open(path, 'r') as f:
+        return parse_board(f.readline())
+
+
+def parse_board(text):
+    """
+    Parses and checks a board state written as a string.
+
+    Parameters:
+    - text (str): The 23 characters of the board, each 'W', 'B' or 'x'.
+
+    Returns:
+    - Board: The board state.
+
+    Raises:
+    - ValueError: If the string is not a valid board.
+    """
+    board = text.strip()
+    if len(board) != NUM_POINTS or any(piece not in 'WBx' for piece in board):
+        raise ValueError(f"'{board}' is not a board of 23 'W', 'B' or 'x' characters")
+    return Board.from_list(board)
+
+
 def write_best_move(output_file, best_move):
     """
     Writes the best move to an output file.
 
     Parameters:
     - output_file (str): The name of the file (without path) where the best move will be written.
-    - best_move (list): The best move determined by the game algorithm.
+    - best_move (Board | list): The best move determined by the game algorithm.
 
     Returns:
     - None
@@ -171,6 +234,26 @@ def display_help():
     for cmd in commands:
         print(f"{cmd}")
 
+    print("\nEvery command also accepts a time budget in place of the depth, e.g. 'ABGame in.txt out.txt 500ms',")
+    print("which searches with iterative deepening and keeps the deepest result that finished in time.")
+    print("\nEvery command also accepts 'split' or 'lazy-smp' after the depth, e.g. 'ABGame in.txt out.txt 6 split',")
+    print("which searches on all CPU cores by sharing out the root moves or by sharing a transposition table.")
+    print("\nOpening commands answer positions in their opening book without searching; add 'nobook' at the end,")
+    print("e.g. 'ABOpening in.txt out.txt 4 nobook', to search anyway.")
+
+    print("\nFixed depth results are kept in an analysis cache, so a position searched before with the same command")
+    print("and depth is answered at once. Add 'reusedeeper' at the end, e.g. 'ABGame in.txt out.txt 4 reusedeeper',")
+    print("to also accept a result searched deeper.")
+
+    print("\nWith NumPy 2 installed, the unimproved commands other than ABGame also accept 'batch' at the end,")
+    print("e.g. 'MiniMaxOpening in.txt out.txt 4 batch', which scores the leaves below each node in one batch.")
+
+    print("\nStart the program with 'python main.py --profile [PREFIX]' to write the call counts and times of every")
+    print("search to PREFIX.json and PREFIX.folded (a collapsed-stack file for flame graphs).")
+
+    print("\nTo analyse many positions at once, run 'python main.py <command> <manifest> <results.jsonl> --depth 4'")
+    print("from the shell; see 'python main.py --help' for the options.")
+
     print("\nOther Commands:\n")
     print("Type 'help' to display this help information.")
     print("Type 'exit' to exit the program.")
@@ -190,163 +273,40 @@ def ascii_title():
     print("██      ██   ██  ██████   █████  ███████  ██████    ██        ███████\n")
 
 
-def reset_positions_evaluated():
-    """
-    Reset the global counter for positions evaluated.
-    """
-    global positions_evaluated
-    positions_evaluated = 0
-
-
-def increment_positions_evaluated():
-    """
-    Increment the global counter for positions evaluated.
+def close_mill(position, board):
     """
-    global positions_evaluated
-    positions_evaluated += 1
-
+    Check if a given position on the board is part of a mill.
 
-def get_positions_evaluated():
-    """
-    Return the number of positions evaluated.
+    Parameters:
+    - position (int): The index of the position to check.
+    - board (list): The current board configuration.
 
     Returns:
-    - int: The current count of positions evaluated.
+    - bool: True if the position is part of a mill, False otherwise.
     """
-    return positions_evaluated
+    piece = board[position]
+    for first, second in MILL_PARTNERS[position]:
+        if board[first] == piece and board[second] == piece:
+            return True
+    return False
 
 
-def close_mill(position, board):
+def piece_mask(board, piece):
     """
-    Check if a given position on the board is part of a mill.
+    Return the bitmask of the positions holding a given piece.
 
     Parameters:
-    - position (int): The index of the position to check.
     - board (list): The current board configuration.
+    - piece (str): The piece to look for ('W', 'B' or 'x').
 
     Returns:
-    - bool: True if the position is part of a mill, False otherwise.
+    - int: The bitmask with bit i set when board[i] equals the piece.
     """
-    match position:
-        case 0:
-            return (
-                    (board[1] == board[0] and board[2] == board[0]) or
-                    (board[3] == board[0] and board[6] == board[0]) or
-                    (board[8] == board[0] and board[20] == board[0])
-            )
-        case 1: return board[0] == board[1] and board[2] == board[1]
-        case 2:
-            return (
-                    (board[0] == board[2] and board[1] == board[2]) or
-                    (board[5] == board[2] and board[7] == board[2]) or
-                    (board[13] == board[2] and board[22] == board[2])
-            )
-        case 3:
-            return (
-                    (board[0] == board[3] and board[6] == board[3]) or
-                    (board[4] == board[3] and board[5] == board[3]) or
-                    (board[9] == board[3] and board[17] == board[3])
-            )
-        case 4: return board[3] == board[4] and board[5] == board[4]
-
-        case 5:
-            return (
-                    (board[2] == board[5] and board[7] == board[5]) or
-                    (board[3] == board[5] and board[4] == board[5]) or
-                    (board[12] == board[5] and board[19] == board[5])
-            )
-        case 6:
-            return (
-                    (board[0] == board[6] and board[3] == board[6]) or
-                    (board[10] == board[6] and board[14] == board[6])
-            )
-        case 7:
-            return (
-                    (board[2] == board[7] and board[5] == board[7]) or
-                    (board[11] == board[7] and board[16] == board[7])
-            )
-        case 8:
-            return (
-                    (board[0] == board[8] and board[20] == board[8]) or
-                    (board[9] == board[8] and board[10] == board[8])
-            )
-        case 9:
-            return (
-                    (board[8] == board[9] and board[10] == board[9]) or
-                    (board[3] == board[9] and board[17] == board[9])
-            )
-        case 10:
-            return (
-                    (board[8] == board[10] and board[9] == board[10]) or
-                    (board[6] == board[10] and board[14] == board[10])
-            )
-        case 11:
-            return (
-                    (board[7] == board[11] and board[16] == board[11]) or
-                    (board[12] == board[11] and board[13] == board[11])
-            )
-        case 12:
-            return (
-                    (board[11] == board[12] and board[13] == board[12]) or
-                    (board[5] == board[12] and board[19] == board[12])
-            )
-        case 13:
-            return (
-                    (board[11] == board[13] and board[12] == board[13]) or
-                    (board[2] == board[13] and board[22] == board[13])
-            )
-        case 14:
-            return (
-                    (board[6] == board[14] and board[10] == board[14]) or
-                    (board[15] == board[14] and board[16] == board[14]) or
-                    (board[17] == board[14] and board[20] == board[14])
-            )
-        case 15:
-            return (
-                    (board[14] == board[15] and board[16] == board[15]) or
-                    (board[18] == board[15] and board[21] == board[15])
-            )
-        case 16:
-            return (
-                    (board[14] == board[16] and board[15] == board[16]) or
-                    (board[19] == board[16] and board[22] == board[16]) or
-                    (board[7] == board[16] and board[11] == board[16])
-            )
-        case 17:
-            return (
-                    (board[3] == board[17] and board[9] == board[17]) or
-                    (board[18] == board[17] and board[19] == board[17]) or
-                    (board[14] == board[17] and board[20] == board[17])
-            )
-        case 18:
-            return (
-                    (board[15] == board[18] and board[21] == board[18]) or
-                    (board[17] == board[18] and board[19] == board[18])
-            )
-        case 19:
-            return (
-                    (board[17] == board[19] and board[18] == board[19]) or
-                    (board[5] == board[19] and board[12] == board[19]) or
-                    (board[16] == board[19] and board[22] == board[19])
-            )
-        case 20:
-            return (
-                    (board[0] == board[20] and board[8] == board[20]) or
-                    (board[21] == board[20] and board[22] == board[20]) or
-                    (board[14] == board[20] and board[17] == board[20])
-            )
-        case 21:
-            return (
-                    (board[20] == board[21] and board[22] == board[21]) or
-                    (board[15] == board[21] and board[18] == board[21])
-            )
-        case 22:
-            return (
-                    (board[20] == board[22] and board[21] == board[22]) or
-                    (board[16] == board[22] and board[19] == board[22]) or
-                    (board[2] == board[22] and board[13] == board[22])
-            )
-        case _: return False
+    mask = 0
+    for location, value in enumerate(board):
+        if value == piece:
+            mask |= 1 << location
+    return mask
 
 
 def get_neighbors(position):
@@ -357,33 +317,10 @@ def get_neighbors(position):
     - position (int): The index of the position whose neighbors are to be found.
 
     Returns:
-    - list: A list of indices representing neighboring positions.
-    """
-    match position:
-        case 0: return [1, 3, 8]
-        case 1: return [0, 2, 4]
-        case 2: return [1, 5, 13]
-        case 3: return [0, 4, 6, 9]
-        case 4: return [1, 3, 5]
-        case 5: return [2, 4, 7, 12]
-        case 6: return [3, 7, 10]
-        case 7: return [5, 6, 11]
-        case 8: return [0, 9, 20]
-        case 9: return [3, 8, 10, 17]
-        case 10: return [6, 9, 14]
-        case 11: return [7, 12, 16]
-        case 12: return [5, 11, 13, 19]
-        case 13: return [2, 12, 22]
-        case 14: return [10, 15, 17]
-        case 15: return [14, 16, 18]
-        case 16: return [11, 15, 19]
-        case 17: return [9, 14, 18, 20]
-        case 18: return [15, 17, 21]
-        case 19: return [12, 16, 22]
-        case 20: return [8, 17, 21]
-        case 21: return [18, 20, 22]
-        case 22: return [13, 19, 21]
-        case _: return []
+    - tuple: The indices of the neighboring positions from the shared NEIGHBORS table, or an empty tuple
+      for an index off the board.
+    """
+    return NEIGHBORS[position] if 0 <= position < NUM_POINTS else ()
 
 
 def invert_board(board):
@@ -399,77 +336,46 @@ def invert_board(board):
     return ['W' if x == 'B' else 'B' if x == 'W' else x for x in board]
 
 
-def generate_remove(board):
+def generate_remove(board, colour='W'):
     """
-    Generate all possible board configurations after removing a black piece.
+    Generate all possible board configurations after the given colour removes a piece of the other colour.
 
     Parameters:
     - board (list): The current board configuration.
+    - colour (str): The colour that closed a mill, 'W' or 'B'.
 
     Returns:
     - list: A list of possible board configurations after removal.
     """
-    L = []
-    for location in range(len(board)):
-        if board[location] == 'B' and not close_mill(location, board):
-            b = board.copy()
-            b[location] = 'x'
-            L.append(b)
-    if not L:
-        for location in range(len(board)):
-            if board[location] == 'B':
-                b = board.copy()
-                b[location] = 'x'
-                L.append(b)
-    return L
+    return [masks_to_board(b) for b in bitboard.generate_remove(board_to_masks(board), colour)]
 
 
-def generate_add(board):
+def generate_add(board, colour='W'):
     """
-    Generate all possible board configurations after adding a white piece.
+    Generate all possible board configurations after adding a piece of the given colour.
 
     Parameters:
     - board (list): The current board configuration.
+    - colour (str): The colour to move, 'W' or 'B'.
 
     Returns:
     - list: A list of possible board configurations after addition.
     """
-    L = []
-    for location in range(len(board)):
-        if board[location] == 'x':
-            b = board.copy()
-            b[location] = 'W'
-            if close_mill(location, b):
-                L.extend(generate_remove(b))
-            else:
-                L.append(b)
-    return L
+    return [masks_to_board(b) for b in bitboard.generate_add(board_to_masks(board), colour)]
 
 
-def generate_move(board):
+def generate_move(board, colour='W'):
     """
-    Generate all possible board configurations after moving a white piece.
+    Generate all possible board configurations after moving a piece of the given colour.
 
     Parameters:
     - board (list): The current board configuration.
+    - colour (str): The colour to move, 'W' or 'B'.
 
     Returns:
     - list: A list of possible board configurations after a move.
     """
-    L = []
-    for location in range(len(board)):
-        if board[location] == 'W':
-            neighbors = get_neighbors(location)
-            for j in neighbors:
-                if board[j] == 'x':
-                    b = board.copy()
-                    b[location] = 'x'
-                    b[j] = 'W'
-                    if close_mill(j, b):
-                        L.extend(generate_remove(b))
-                    else:
-                        L.append(b)
-    return L
+    return [masks_to_board(b) for b in bitboard.generate_move(board_to_masks(board), colour)]
 
 
 def generate_move_black(board):
@@ -482,45 +388,21 @@ def generate_move_black(board):
     Returns:
     - list: A list of possible board configurations after a move.
     """
-    L = []
-    for location in range(len(board)):
-        if board[location] == 'B':
-            neighbors = get_neighbors(location)
-            for j in neighbors:
-                if board[j] == 'x':
-                    b = board.copy()
-                    b[location] = 'x'
-                    b[j] = 'B'
-                    if close_mill(j, b):
-                        L.extend(generate_remove(b))
-                    else:
-                        L.append(b)
-    return L
+    return [masks_to_board(b) for b in bitboard.generate_move_black(board_to_masks(board))]
 
 
-def generate_hopping(board):
+def generate_hopping(board, colour='W'):
     """
-    Generate all possible board configurations after hopping a white piece.
+    Generate all possible board configurations after hopping a piece of the given colour.
 
     Parameters:
     - board (list): The current board configuration.
+    - colour (str): The colour to move, 'W' or 'B'.
 
     Returns:
     - list: A list of possible board configurations after hopping.
     """
-    L = []
-    for i in range(len(board)):
-        if board[i] == 'W':
-            for j in range(len(board)):
-                if board[j] == 'x':
-                    b = board.copy()
-                    b[i] = 'x'
-                    b[j] = 'W'
-                    if close_mill(j, b):
-                        L.extend(generate_remove(b))
-                    else:
-                        L.append(b)
-    return L
+    return [masks_to_board(b) for b in bitboard.generate_hopping(board_to_masks(board), colour)]
 
 
 def static_estimation_opening(board):
@@ -533,9 +415,7 @@ def static_estimation_opening(board):
     Returns:
     - int: The estimated value of the board configuration.
     """
-    # Increment the counter for positions evaluated
-    increment_positions_evaluated()
-    return board.count('W') - board.count('B')
+    return bitboard.static_estimation_opening(board_to_masks(board))
 
 
 def static_estimation_midgame_endgame(board):
@@ -548,38 +428,21 @@ def static_estimation_midgame_endgame(board):
     Returns:
     - int: The estimated value of the board configuration.
     """
-    # Increment the counter for positions evaluated
-    increment_positions_evaluated()
-    num_white_pieces = board.count('W')
-    num_black_pieces = board.count('B')
-    num_black_moves = len((generate_move_black(board)))
-
-    if num_black_pieces <= 2:
-        return 10000
-    elif num_white_pieces <= 2:
-        return -10000
-    elif num_black_moves == 0:
-        return 10000
-    else:
-        return 1000 * (num_white_pieces - num_black_pieces) - num_black_moves
+    return bitboard.static_estimation_midgame_endgame(board_to_masks(board))
 
 
-def generate_moves_midgame_endgame(board):
+def generate_moves_midgame_endgame(board, colour='W'):
     """
-    Generate possible moves for midgame and endgame for white pieces.
+    Generate possible moves for midgame and endgame for the given colour.
 
     Parameters:
     - board (list): The current board configuration.
+    - colour (str): The colour to move, 'W' or 'B'.
 
     Returns:
-    - list: A list of possible moves for white pieces.
+    - list: A list of possible board configurations.
     """
-    if board.count('W') == 3:
-        possible_moves = generate_hopping(board)
-    else:
-        possible_moves = generate_move(board)
-
-    return possible_moves
+    return [masks_to_board(b) for b in bitboard.generate_moves_midgame_endgame(board_to_masks(board), colour)]
 
 
 def count_mills(board, player):
@@ -594,7 +457,7 @@ def count_mills(board, player):
     Returns:
     - int: The number of mills the player has.
     """
-    return sum(1 for i in range(len(board)) if board[i] == player and close_mill(i, board)) // 3
+    return mill_pieces(piece_mask(board, player)).bit_count() // 3
 
 
 def count_potential_mills(board, player):
@@ -608,8 +471,9 @@ def count_potential_mills(board, player):
     Returns:
     - int: The number of potential mills the player has.
     """
+    pieces = piece_mask(board, player)
     return sum(1 for i in range(len(board)) if board[i] == player and
-               sum(1 for j in get_neighbors(i) if board[j] == player) == 2)
+               (NEIGHBOR_MASKS[i] & pieces).bit_count() == 2)
 
 
 def count_double_mills(board, player):
@@ -623,15 +487,18 @@ def count_double_mills(board, player):
     Returns:
     - int: The number of pieces that are part of two mills.
     """
+    milled = mill_pieces(piece_mask(board, player))
     return sum(1 for i in range(len(board)) if board[i] == player and
-               sum(1 for j in get_neighbors(i) if board[j] == player and
-                   close_mill(j, board)) == 2)
+               (NEIGHBOR_MASKS[i] & milled).bit_count() == 2)
 
 
 def count_blocked_pieces(board, player):
     """
     Count the number of pieces that have no legal moves.
 
+    The estimations have always counted a player's pieces as blocked together: all of them when the player
+    has no move, and none otherwise. One pass of bitboard.mobility tells which.
+
     Parameters:
     - board (list): The current board configuration.
     - player (str): The player to check for blocked pieces ('W' for white, 'B' for black).
@@ -639,16 +506,14 @@ def count_blocked_pieces(board, player):
     Returns:
     - int: The number of blocked pieces the player has.
     """
-    blocked_pieces = 0
-    for i in range(len(board)):
-        if board[i] == player:
-            if player == 'W':
-                moves = generate_move(board)
-            else:
-                moves = generate_move_black(board)
-            if not moves:
-                blocked_pieces += 1
-    return blocked_pieces
+    pieces = piece_mask(board, player)
+    opponent = piece_mask(board, 'B' if player == 'W' else 'W')
+    if player == 'W' and not opponent:
+        # A white mill with no black piece to remove leaves no move behind
+        has_moves = bool(bitboard.generate_move((pieces, opponent)))
+    else:
+        has_moves = bitboard.mobility(pieces, opponent)[0] > 0
+    return 0 if has_moves else pieces.bit_count()
 
 
 def count_center_control(board, player):
@@ -666,7 +531,25 @@ def count_center_control(board, player):
     return sum(1 for pos in central_positions if board[pos] == player)
 
 
-def can_be_removed(position, board):
+def mill_occupancy(board, piece, analysis=None):
+    """
+    Return the points holding a piece and those of them covered by a mill of that piece.
+
+    Parameters:
+    - board (list): The current board configuration.
+    - piece (str): The piece to look for ('W', 'B' or 'x').
+    - analysis (tuple): The bitboard.mill_analysis of the board, if already computed.
+
+    Returns:
+    - tuple: The bitmask of the points holding the piece and the bitmask of those covered by a mill.
+    """
+    pieces = piece_mask(board, piece)
+    if analysis is None:
+        return pieces, mill_pieces(pieces)
+    return pieces, analysis['WBx'.index(piece)]
+
+
+def can_be_removed(position, board, analysis=None):
     """
     Determine if a piece at a given position can be removed from the board.
 
@@ -675,46 +558,51 @@ def can_be_removed(position, board):
     Parameters:
     - position (int): The position of the piece on the board.
     - board (list): The current board configuration.
+    - analysis (tuple): The bitboard.mill_analysis of the board, if already computed.
 
     Returns:
     - bool: True if the piece can be removed, False otherwise.
     """
-    player = board[position]
-    if close_mill(position, board):
-        return all(close_mill(i, board) for i, piece in enumerate(board) if piece == player)
-    return True
+    if not close_mill(position, board):
+        return True
+    pieces, milled = mill_occupancy(board, board[position], analysis)
+    return milled == pieces
 
 
-def count_safe_pieces(board, player):
+def count_safe_pieces(board, player, analysis=None):
     """
     Count the number of pieces that are part of a mill or cannot be removed.
 
     Parameters:
     - board (list): The current board configuration.
     - player (str): The player to check for safe pieces ('W' for white, 'B' for black).
+    - analysis (tuple): The bitboard.mill_analysis of the board, if already computed.
 
     Returns:
     - int: The number of safe pieces the player has.
     """
-    return sum(1 for i in range(len(board)) if board[i] == player and
-               (close_mill(i, board) or not can_be_removed(i, board)))
+    # A piece that cannot be removed is always part of a mill, so this is the mill coverage
+    return mill_occupancy(board, player, analysis)[1].bit_count()
 
 
-def count_threats(board, player):
+def count_threats(board, player, analysis=None):
     """
     Count the number of pieces that are threatened to be part of an opponent's mill in the next move.
 
+    A piece counts when it stands next to a point of a mill that is still entirely empty.
+
     Parameters:
     - board (list): The current board configuration.
     - player (str): The player to check for threats against ('W' for white, 'B' for black).
+    - analysis (tuple): The bitboard.mill_analysis of the board, if already computed.
 
     Returns:
     - int: The number of threats against the player's pieces.
     """
-    opponent = 'B' if player == 'W' else 'W'
-    return sum(1 for i in range(len(board)) if board[i] == player and
-               any(close_mill(j, board[:i] + [opponent] + board[i+1:])
-                   for j in get_neighbors(i) if board[j] == 'x'))
+    if analysis is None:
+        analysis = bitboard.mill_analysis(board_to_masks(board))
+    open_points = analysis[2]
+    return sum(1 for i in range(len(board)) if board[i] == player and NEIGHBOR_MASKS[i] & open_points)
 
 
 def piece_vulnerability(position, board):
@@ -731,7 +619,7 @@ def piece_vulnerability(position, board):
     player = board[position]
     opponent = 'B' if player == 'W' else 'W'
     vulnerable = 1 if board[position] != 'x' and not close_mill(position, board) else 0
-    surrounded = sum(1 for neighbor in get_neighbors(position) if board[neighbor] == opponent)
+    surrounded = sum(1 for neighbor in NEIGHBORS[position] if board[neighbor] == opponent)
     return vulnerable * surrounded
 
 
@@ -749,7 +637,7 @@ def piece_strength(position, board):
     player = board[position]
     strength = 0
     if board[position] == player:
-        for neighbor in get_neighbors(position):
+        for neighbor in NEIGHBORS[position]:
             if board[neighbor] == player:
                 strength += 1
     return strength
@@ -773,9 +661,6 @@ def static_estimation_opening_improved(board):
     - int: The estimated value of the board configuration.
     """
 
-    # Increment the counter for positions evaluated
-    increment_positions_evaluated()
-
     piece_diff = board.count('W') - board.count('B')
 
     white_mills = count_mills(board, 'W')
@@ -786,8 +671,10 @@ def static_estimation_opening_improved(board):
     white_center_control = count_center_control(board, 'W')
     black_center_control = count_center_control(board, 'B')
 
-    white_threats = count_threats(board, 'W')
-    black_threats = count_threats(board, 'B')
+    # One pass over the mills gives the threats of both players
+    analysis = bitboard.mill_analysis(board_to_masks(board))
+    white_threats = count_threats(board, 'W', analysis)
+    black_threats = count_threats(board, 'B', analysis)
 
     white_strength = sum(piece_strength(i, board) for i, piece in enumerate(board) if piece == 'W')
     black_strength = sum(piece_strength(i, board) for i, piece in enumerate(board) if piece == 'B')
@@ -822,12 +709,9 @@ def static_estimation_midgame_endgame_improved(board):
     - int: The estimated value of the board configuration.
     """
 
-    # Increment the counter for positions evaluated
-    increment_positions_evaluated()
-
     num_white_pieces = board.count('W')
     num_black_pieces = board.count('B')
-    num_black_moves = len(generate_move_black(board))
+    num_black_moves = bitboard.count_black_moves(board_to_masks(board))
 
     white_mills = count_mills(board, 'W')
     black_mills = count_mills(board, 'B')
@@ -843,11 +727,13 @@ def static_estimation_midgame_endgame_improved(board):
     white_center_control = count_center_control(board, 'W')
     black_center_control = count_center_control(board, 'B')
 
-    white_safe_pieces = count_safe_pieces(board, 'W')
-    black_safe_pieces = count_safe_pieces(board, 'B')
+    # One pass over the mills gives the safe pieces and threats of both players
+    analysis = bitboard.mill_analysis(board_to_masks(board))
+    white_safe_pieces = count_safe_pieces(board, 'W', analysis)
+    black_safe_pieces = count_safe_pieces(board, 'B', analysis)
 
-    white_threats = count_threats(board, 'W')
-    black_threats = count_threats(board, 'B')
+    white_threats = count_threats(board, 'W', analysis)
+    black_threats = count_threats(board, 'B', analysis)
 
     white_vulnerability = sum(piece_vulnerability(i, board) for i, piece in enumerate(board) if piece == 'W')
     black_vulnerability = sum(piece_vulnerability(i, board) for i, piece in enumerate(board) if piece == 'B')
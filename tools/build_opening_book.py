@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import command_mapping
+from utils.opening_book import BOOK_DIR, book_path, build_opening_book
+
+# Classes that play the opening and so can have a book
+OPENING_COMMANDS = sorted(
+    name for name, game_class in command_mapping.items() if game_class.book_symmetries is not None
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the first placements offline and write an opening book.")
+    parser.add_argument("command", help=f"the opening class to build the book for: {', '.join(OPENING_COMMANDS)}")
+    parser.add_argument("--plies", type=int, default=3, help="placements from the empty board to cover (default: 3)")
+    parser.add_argument("--depth", type=int, default=5, help="search depth of every book position (default: 5)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPU cores)")
+    parser.add_argument("--output", default=None, help=f"book file to write (default: {BOOK_DIR}/<command>.book)")
+    args = parser.parse_args()
+    if args.command not in OPENING_COMMANDS:
+        kind = "does not play the opening" if args.command in command_mapping else "is not a command"
+        parser.error(f"{args.command} {kind}; books can be built for {', '.join(OPENING_COMMANDS)}")
+
+    output = args.output or book_path(args.command)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    start = perf_counter()
+    records = build_opening_book(command_mapping[args.command], args.plies, args.depth, output, args.workers,
+                                 lambda message: print(f"[{perf_counter() - start:8.1f}s] {message}", flush=True))
+    print(f"Wrote {records} positions to {output} in {perf_counter() - start:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.tablebase import DEFAULT_PATH, build_tablebase
+
+
+def parse_material(text):
+    """
+    Parse a material such as 3v4.
+
+    Parameters:
+    - text (str): The piece counts of the two sides separated by 'v'.
+
+    Returns:
+    - tuple: The two piece counts.
+
+    Raises:
+    - argparse.ArgumentTypeError: If the text is not two counts separated by 'v'.
+    """
+    try:
+        a, b = (int(count) for count in text.lower().split('v'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a material such as 3v4, got '{text}'")
+    return a, b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the endgame tablebase offline and write it to a file.")
+    parser.add_argument("--material", nargs='+', type=parse_material, default=[(3, 3), (3, 4)],
+                        help="materials to solve, such as 3v3 3v4 (default: 3v3 3v4)")
+    parser.add_argument("--output", default=DEFAULT_PATH, help=f"tablebase file to write (default: {DEFAULT_PATH})")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    try:
+        tables = build_tablebase(args.material, args.output,
+                                 lambda message: print(f"[{perf_counter() - start:8.1f}s] {message}", flush=True))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {len(tables)} tables to {args.output} in {perf_counter() - start:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
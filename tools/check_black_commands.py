@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.util import (
+    generate_add, generate_moves_midgame_endgame, static_estimation_opening, static_estimation_midgame_endgame,
+    invert_board, open_board
+)
+from modules.minimax_opening_black import MiniMaxOpeningBlack
+from modules.minimax_game_black import MiniMaxGameBlack
+
+
+def legacy_minimax_opening_black(board, depth, is_maximizing):
+    """
+    The original MiniMaxOpeningBlack search, inverting the board at every ply, kept here as the reference.
+
+    Parameters:
+    - board (list): The current board configuration.
+    - depth (int): The maximum depth of the game tree to explore.
+    - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+
+    Returns:
+    - tuple: A tuple containing the static evaluation and the best move board configuration.
+    """
+    board = invert_board(board)
+    if depth == 0:
+        return -static_estimation_opening(board), board
+
+    best_eval, best_move = float('-inf') if is_maximizing else float('inf'), None
+    for move in generate_add(board):
+        eval_value, _ = legacy_minimax_opening_black(move, depth - 1, not is_maximizing)
+        if eval_value > best_eval if is_maximizing else eval_value < best_eval:
+            best_eval, best_move = eval_value, move
+    return best_eval, invert_board(best_move)
+
+
+def legacy_minimax_game_black(board, depth, is_maximizing):
+    """
+    The original MiniMaxGameBlack search, inverting the board at every ply, kept here as the reference.
+
+    Parameters:
+    - board (list): The current board configuration.
+    - depth (int): The maximum depth of the game tree to explore.
+    - is_maximizing (bool): True if the current move is maximizing; False if minimizing.
+
+    Returns:
+    - tuple: A tuple containing the static evaluation and the best move board configuration.
+    """
+    board = invert_board(board)
+    if depth == 0:
+        if board.count('W') > 3:
+            return -static_estimation_midgame_endgame(board), board
+        return -static_estimation_opening(board), board
+
+    best_eval, best_move = float('-inf') if is_maximizing else float('inf'), None
+    for move in generate_moves_midgame_endgame(board):
+        eval_value, _ = legacy_minimax_game_black(move, depth - 1, not is_maximizing)
+        if eval_value > best_eval if is_maximizing else eval_value < best_eval:
+            best_eval, best_move = eval_value, move
+    return best_eval, invert_board(best_move)
+
+
+# Each Black command with its original search and the piece counts of its random boards
+COMMANDS = (
+    (MiniMaxOpeningBlack, legacy_minimax_opening_black, (0, 6)),
+    (MiniMaxGameBlack, legacy_minimax_game_black, (3, 9)),
+)
+
+
+def random_boards(count, pieces, rng):
+    """
+    Generate random boards.
+
+    Parameters:
+    - count (int): The number of boards.
+    - pieces (tuple): The least and most pieces of each colour.
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - list: The board configurations.
+    """
+    boards = []
+    for _ in range(count):
+        white, black = rng.randint(*pieces), rng.randint(*pieces)
+        points = rng.sample(range(23), white + black)
+        board = ['x'] * 23
+        for point in points[:white]:
+            board[point] = 'W'
+        for point in points[white:]:
+            board[point] = 'B'
+        boards.append(board)
+    return boards
+
+
+def check(game_class, legacy, board, depth):
+    """
+    Search a board with a Black command and with its original search, and compare the results.
+
+    Parameters:
+    - game_class (Callable[..., Any]): The Black command class.
+    - legacy (Callable): Its original search.
+    - board (list): The board configuration.
+    - depth (int): The search depth.
+
+    Returns:
+    - str: 'same' if both return the same score and move, 'tie' if the moves differ but the original search
+      scores the command's move as highly as its own, or 'none' if black has no move, where the original
+      search fails.
+
+    Raises:
+    - AssertionError: If the scores differ, or the command's move is not one of the original's best moves.
+    """
+    game = game_class()
+    # Compare the searches themselves, not the tablebase or book answers
+    game.probes_tablebase = False
+    game.use_book = False
+    estimate, best_move = game.play_game(list(board), depth)
+    if best_move is None:
+        return 'none'
+    expected_estimate, expected_move = legacy(list(board), depth, True)
+    found = f"{estimate} {''.join(best_move)}, originally {expected_estimate} {''.join(expected_move)}"
+    if estimate != expected_estimate:
+        raise AssertionError(f"{game_class.__name__} at depth {depth} on {''.join(board)}: {found}")
+    if list(best_move) == expected_move:
+        return 'same'
+    # The original search breaks ties by generation order, the engine by its move ordering; the other move
+    # must be a child the original search scores as highly
+    child = invert_board(best_move)
+    children = generate_add(invert_board(board)) if legacy is legacy_minimax_opening_black else \
+        generate_moves_midgame_endgame(invert_board(board))
+    if child not in children or legacy(child, depth - 1, False)[0] != expected_estimate:
+        raise AssertionError(f"{game_class.__name__} at depth {depth} on {''.join(board)}: {found}, and the "
+                             f"original search does not score the move as a best one")
+    return 'tie'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the Black commands against their original board-inverting searches."
+    )
+    parser.add_argument("--depths", default="1,2,3", help="comma-separated search depths (default: 1,2,3)")
+    parser.add_argument("--boards", type=int, default=30, help="random boards per command (default: 30)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random boards")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    test_files_dir = os.path.join(os.path.dirname(__file__), '..', 'test_files')
+    files = [open_board(os.path.basename(path)) for path in
+             sorted(glob.glob(os.path.join(test_files_dir, 'board*.txt')))]
+    depths = [int(depth) for depth in args.depths.split(',')]
+    for game_class, legacy, pieces in COMMANDS:
+        outcomes = {'same': 0, 'tie': 0, 'none': 0}
+        for board in files + random_boards(args.boards, pieces, rng):
+            for depth in depths:
+                outcomes[check(game_class, legacy, board, depth)] += 1
+        print(f"{game_class.__name__}: {outcomes['same'] + outcomes['tie']} searches match the original scores, "
+              f"{outcomes['same']} with the same move and {outcomes['tie']} with another best move; "
+              f"{outcomes['none']} without a move skipped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
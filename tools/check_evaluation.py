@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.bitboard import masks_to_board
+from utils.evaluation import EvaluatedPosition
+from utils.position import iter_add, iter_moves_midgame_endgame
+from utils.util import static_estimation_opening_improved, static_estimation_midgame_endgame_improved
+
+# The evaluation state compared against a position rebuilt from its masks
+STATE = ('white', 'black', 'colour', 'key') + EvaluatedPosition.__slots__
+
+
+def random_position(rng):
+    """
+    Generate a random position with up to nine pieces a side.
+
+    Parameters:
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - EvaluatedPosition: The position, with a random side to move.
+    """
+    white, black = rng.randint(0, 9), rng.randint(0, 9)
+    points = rng.sample(range(23), white + black)
+    return EvaluatedPosition(sum(1 << point for point in points[:white]),
+                             sum(1 << point for point in points[white:]), rng.choice('WB'))
+
+
+def check(position, context):
+    """
+    Check the incremental estimations and state of a position against a full recomputation.
+
+    Parameters:
+    - position (EvaluatedPosition): The position to check.
+    - context (str): A description of how the position was reached, for the error message.
+
+    Returns:
+    - None
+
+    Raises:
+    - AssertionError: If an estimation or part of the state differs.
+    """
+    board = masks_to_board(position.masks())
+    expected = (static_estimation_opening_improved(board), static_estimation_midgame_endgame_improved(board))
+    found = (position.static_estimation_opening_improved(), position.static_estimation_midgame_endgame_improved())
+    if found != expected:
+        raise AssertionError(f"{''.join(board)} {context}: incremental {found}, full recomputation {expected}")
+    rebuilt = EvaluatedPosition(position.white, position.black, position.colour)
+    for name in STATE:
+        if getattr(position, name) != getattr(rebuilt, name):
+            raise AssertionError(f"{''.join(board)} {context}: {name} differs from a rebuilt position")
+
+
+def walk(position, plies, opening, rng):
+    """
+    Play random moves from a position, then take them all back, checking the position after every step.
+
+    Parameters:
+    - position (EvaluatedPosition): The starting position; it is left unchanged.
+    - plies (int): The number of moves to play, fewer if the side to move has none.
+    - opening (bool): True to add pieces, False to play midgame and endgame moves.
+    - rng (random.Random): The random number generator.
+
+    Returns:
+    - None
+    """
+    start = masks_to_board(position.masks())
+    generate = iter_add if opening else iter_moves_midgame_endgame
+    played = []
+    for _ in range(plies):
+        moves = list(generate(position))
+        if not moves:
+            break
+        move = rng.choice(moves)
+        position.make_move(move)
+        played.append(move)
+        check(position, f"after making {played} from {''.join(start)}")
+    while played:
+        position.unmake_move(played[-1])
+        played.pop()
+        check(position, f"after unmaking back to {played} from {''.join(start)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the incremental improved evaluation against the full recomputation in utils.util."
+    )
+    parser.add_argument("--positions", type=int, default=2000, help="random positions checked (default: 2000)")
+    parser.add_argument("--plies", type=int, default=12, help="moves made and unmade per walk (default: 12)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random positions")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for _ in range(args.positions):
+        position = random_position(rng)
+        check(position, "as built")
+        for opening in (True, False):
+            walk(position, args.plies, opening, rng)
+    print(f"Checked {args.positions} positions and {2 * args.positions} make/unmake walks; every estimation "
+          f"matched.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())